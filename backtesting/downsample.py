@@ -0,0 +1,133 @@
+"""
+Downsampling of bar series for charts of long histories.
+
+A view of ``n`` bars is cut into buckets once (``bucket_starts``) and every trace of
+the chart reuses those buckets: candles and volume become one aggregated bar per
+bucket (``ohlc_buckets``) and each line keeps a few points per bucket, either its
+lowest and highest (``minmax_indices``) or the Largest-Triangle-Three-Buckets point
+(``lttb_indices``). Positions passed as ``keep`` (e.g. the bars of trade markers) get
+a bucket of their own, so they are drawn exactly.
+"""
+
+import numpy as np
+
+
+def bucket_starts(n, n_buckets, keep=()):
+    """
+    Start positions of about ``n_buckets`` equal buckets over ``n`` points.
+
+    Args:
+        n (int): Number of points.
+        n_buckets (int): Number of equal buckets to cut ``n`` into.
+        keep (array-like, optional): Positions that must be a bucket of their own.
+            Each adds up to two buckets. Defaults to none.
+
+    Returns:
+        np.ndarray: Ascending, unique int64 start positions; the first is 0 when
+            ``n`` > 0.
+    """
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.linspace(0, n, max(min(n_buckets, n), 1) + 1)[:-1].astype(np.int64)
+    keep = np.asarray(keep, dtype=np.int64)
+    starts = np.union1d(starts, np.r_[keep, keep + 1])
+    return starts[(starts >= 0) & (starts < n)]
+
+
+def _bucket_ids(n, starts):
+    return np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+
+
+def minmax_indices(y, starts):
+    """
+    Positions of the lowest and highest value of ``y`` in every bucket.
+
+    NaN is ignored unless a bucket holds nothing else.
+
+    Args:
+        y (np.ndarray): Values, float.
+        starts (np.ndarray): Bucket starts from ``bucket_starts``.
+
+    Returns:
+        np.ndarray: Ascending positions, one or two per bucket.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if not len(starts):
+        return np.zeros(0, dtype=np.int64)
+    bucket = _bucket_ids(len(y), starts)
+    missing = np.isnan(y)
+    # Sorting by bucket then value puts each bucket's extreme at its start position
+    lowest = np.lexsort((np.where(missing, np.inf, y), bucket))[starts]
+    highest = np.lexsort((np.where(missing, np.inf, -y), bucket))[starts]
+    return np.union1d(lowest, highest)
+
+
+def lttb_indices(x, y, starts):
+    """
+    Largest-Triangle-Three-Buckets selection of one point per bucket.
+
+    The first bucket keeps its first point and the last bucket its last. Every
+    bucket in between keeps the point forming the largest triangle with the point
+    kept before it and the mean of the next bucket. Each bucket depends on the
+    previous choice, so this loops over buckets (not points) in Python.
+
+    Args:
+        x (np.ndarray): Ascending positions of the points, e.g. datetime64 bar times.
+        y (np.ndarray): Values, float; NaN points are only kept when a bucket holds
+            nothing else.
+        starts (np.ndarray): Bucket starts from ``bucket_starts``.
+
+    Returns:
+        np.ndarray: Ascending positions, one per bucket.
+    """
+    n = len(y)
+    if len(starts) < 3:
+        return np.unique(np.r_[0, n - 1])[: len(starts)]
+    x = np.asarray(x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ends = np.r_[starts[1:], n]
+    counts = ends - starts
+    present = ~np.isnan(y)
+    mean_x = np.add.reduceat(x, starts) / counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_y = np.add.reduceat(np.where(present, y, 0.0), starts) / np.add.reduceat(
+            present, starts
+        )
+
+    kept = np.empty(len(starts), dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    for b in range(1, len(starts) - 1):
+        lo, hi = starts[b], ends[b]
+        ax, ay = x[kept[b - 1]], y[kept[b - 1]]
+        area = np.abs(
+            (ax - mean_x[b + 1]) * (y[lo:hi] - ay)
+            - (ax - x[lo:hi]) * (mean_y[b + 1] - ay)
+        )
+        finite = ~np.isnan(area)
+        kept[b] = lo + (np.argmax(np.where(finite, area, -1.0)) if finite.any() else 0)
+    return kept
+
+
+def ohlc_buckets(open_, high, low, close, volume, starts):
+    """
+    One OHLCV bar per bucket.
+
+    Args:
+        open_, high, low, close, volume (np.ndarray): Bar columns, float.
+        starts (np.ndarray): Bucket starts from ``bucket_starts``.
+
+    Returns:
+        tuple: The buckets' first open, highest high, lowest low, last close and
+            total volume (NaN volume counts as 0), as float arrays.
+    """
+    if not len(starts):
+        empty = np.zeros(0)
+        return empty, empty, empty, empty, empty
+    last = np.r_[starts[1:], len(close)] - 1
+    return (
+        np.asarray(open_, dtype=np.float64)[starts],
+        np.fmax.reduceat(np.asarray(high, dtype=np.float64), starts),
+        np.fmin.reduceat(np.asarray(low, dtype=np.float64), starts),
+        np.asarray(close, dtype=np.float64)[last],
+        np.add.reduceat(np.nan_to_num(np.asarray(volume, dtype=np.float64)), starts),
+    )
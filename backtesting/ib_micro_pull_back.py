@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import threading
@@ -11,7 +12,10 @@ from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
 from trade_analyzer import TradeAnalyzer
 
-from strategies.micro_pullback_momentum import backtest
+from backtesting.runner import run_backtest
+from data.async_fetcher import AsyncHistClient
+from data.bar_accumulator import BarAccumulator
+from data.bar_cache import BarCache
 
 # Define selected stocks for backtesting
 selected_stocks = {
@@ -23,100 +27,105 @@ class TradeApp(EWrapper, EClient):
     def __init__(self):
         EClient.__init__(self, self)
         self.data = {}
+        self.bars = {}
+        self.hist_listener = None
         self.skip = False
 
     def historicalData(self, reqId, bar):
-        if reqId not in self.data:
-            self.data[reqId] = pd.DataFrame(
-                [
-                    {
-                        "Date": bar.date,
-                        "Open": bar.open,
-                        "High": bar.high,
-                        "Low": bar.low,
-                        "Close": bar.close,
-                        "Volume": bar.volume,
-                    }
-                ]
-            )
-        else:
-            self.data[reqId] = pd.concat(
-                (
-                    self.data[reqId],
-                    pd.DataFrame(
-                        [
-                            {
-                                "Date": bar.date,
-                                "Open": bar.open,
-                                "High": bar.high,
-                                "Low": bar.low,
-                                "Close": bar.close,
-                                "Volume": bar.volume,
-                            }
-                        ]
-                    ),
-                )
-            )
+        if reqId not in self.bars:
+            self.bars[reqId] = BarAccumulator()
+        self.bars[reqId].append(bar)
 
     def historicalDataEnd(self, reqId, start, end):
         super().historicalDataEnd(reqId, start, end)
+        if reqId in self.bars:
+            self.data[reqId] = self.bars.pop(reqId).to_frame()
         print("HistoricalDataEnd. ReqId:", reqId, "from", start, "to", end)
         self.skip = False
+        if self.hist_listener is not None:
+            self.hist_listener.notify_end(reqId)
         ticker_event.set()  # Signal that the data for the ticker has been retrieved
 
+    def error(self, reqId, errorCode, errorString, *args):
+        super().error(reqId, errorCode, errorString, *args)
+        if self.hist_listener is not None:
+            self.hist_listener.notify_error(reqId, errorCode, errorString)
+
 
 # establish connection to IBKR
 def connection():
     app.run()
 
 
-# Initialize API connection
-ticker_event = threading.Event()
-app = TradeApp()
-app.connect(host="127.0.0.1", port=7497, clientId=23)
-con_thread = threading.Thread(target=connection, daemon=True)
-con_thread.start()
-time.sleep(1)
-
-
-date_stats, transactions = backtest(selected_stocks, app, ticker_event)
-
-# Print transactions
-for reqID, transaction_list in transactions.items():
-    print(f"Ticker: {reqID}")
-    for trans in transaction_list:
-        print(
-            f"Date: {trans[0]} | Action: {trans[1]} | Ticker: {trans[2]} |Price: {trans[3]:.2f} | Entry Type: {trans[4]}"
-        )
+if __name__ == "__main__":
+    # Initialize API connection
+    ticker_event = threading.Event()
+    app = TradeApp()
+    app.connect(host="127.0.0.1", port=7497, clientId=23)
+    con_thread = threading.Thread(target=connection, daemon=True)
+    con_thread.start()
+    time.sleep(1)
+
+    # Fetch each date's tickers concurrently instead of one blocking request at a time
+    hist_client = AsyncHistClient(app)
+    app.hist_listener = hist_client
+    # Serve previously downloaded trading days from disk and only request missing ones
+    bar_cache = BarCache(
+        hist_client,
+        root=os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache"
+        ),
+    )
+
+    # Backtest the (date, ticker) units in parallel on a process pool. The workers are
+    # spawned, not forked: this process already runs the IB reader thread on a live
+    # TWS socket and the fetcher's event loop thread, which a fork would copy mid-use.
+    # Spawned workers re-import this module as __mp_main__, and everything that talks
+    # to TWS runs under the __main__ guard, so they do not connect again
+    date_stats, transactions, indicator_data = run_backtest(
+        selected_stocks,
+        bar_cache,
+        keep_frames=True,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    print("Bar cache:", bar_cache.stats)
+
+    # Print transactions
+    for reqID, transaction_list in transactions.items():
+        print(f"Ticker: {reqID}")
+        for trans in transaction_list:
+            print(
+                f"Date: {trans[0]} | Action: {trans[1]} | Ticker: {trans[2]} |Price: {trans[3]:.2f} | Entry Type: {trans[4]}"
+            )
 
-# Initialize TradeAnalyzer
-trade_analyzer = TradeAnalyzer(transactions, data=app.data)
+    # Initialize TradeAnalyzer
+    trade_analyzer = TradeAnalyzer(transactions, data=indicator_data)
 
-# Calculate and print win rates
-win_rate_results = trade_analyzer.calculate_win_rate()
+    # Calculate and print win rates
+    win_rate_results = trade_analyzer.calculate_win_rate()
 
-# Extract strategy-specific and overall win rates
-strategy_win_rates = win_rate_results["strategy_win_rates"]
-overall_win_rate = win_rate_results["overall_win_rate"]
+    # Extract strategy-specific and overall win rates
+    strategy_win_rates = win_rate_results["strategy_win_rates"]
+    overall_win_rate = win_rate_results["overall_win_rate"]
 
-# Print win rates
-print("Win Rate by Strategy:")
-for strategy, rate in strategy_win_rates.items():
-    print(f"Strategy: {strategy} | Win Rate: {rate:.2f}%")
+    # Print win rates
+    print("Win Rate by Strategy:")
+    for strategy, rate in strategy_win_rates.items():
+        print(f"Strategy: {strategy} | Win Rate: {rate:.2f}%")
 
-print(f"Overall Win Rate: {overall_win_rate:.2f}%")
+    print(f"Overall Win Rate: {overall_win_rate:.2f}%")
 
-# Calculate and print total profit and average trade return
-total_profit = trade_analyzer.calculate_total_profit()
-average_trade_return, total_trades = trade_analyzer.calculate_average_trade_return()
-profit_by_entry_type = trade_analyzer.calculate_profit_by_entry_type()
+    # Calculate and print total profit and average trade return
+    total_profit = trade_analyzer.calculate_total_profit()
+    average_trade_return, total_trades = trade_analyzer.calculate_average_trade_return()
+    profit_by_entry_type = trade_analyzer.calculate_profit_by_entry_type()
 
-# print(f"Total Profit: {total_profit:.2f}")
-# print(f"Average Trade Return: {average_trade_return:.2f}% | Total Trades: {total_trades}")
+    # print(f"Total Profit: {total_profit:.2f}")
+    # print(f"Average Trade Return: {average_trade_return:.2f}% | Total Trades: {total_trades}")
 
-print("Profit by Entry Type:")
-for entry_type, profit in profit_by_entry_type.items():
-    print(f"Entry Type: {entry_type} | Profit: {profit:.2f}")
+    print("Profit by Entry Type:")
+    for entry_type, profit in profit_by_entry_type.items():
+        print(f"Entry Type: {entry_type} | Profit: {profit:.2f}")
 
-# Plot trades after backtest is completed
-trade_analyzer.plot_trades()
+    # Plot trades after backtest is completed
+    trade_analyzer.plot_trades()
@@ -0,0 +1,216 @@
+"""
+Event-driven portfolio simulation across many tickers with shared capital.
+
+Each ticker's bars are reduced up front to its candidate trades: every entry-signal
+bar with the exit bar its stop/target rule would give it (``simulate_candidates``).
+The portfolio then walks those candidates in timestamp order through a ``heapq``
+k-way merge of the per-ticker streams, closing positions from a heap keyed by exit
+time before every entry, and takes an entry only if the ticker is flat and the
+capital, position-count and risk limits allow it.
+
+Only candidate entries and exits become events, so the Python work scales with the
+number of signals rather than the number of bars, and no combined DataFrame of all
+tickers is ever built: per ticker the engine keeps just its timestamps and closes
+(for marking open positions to market) and its candidate trades.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from backtesting.simulator import simulate_candidates
+from data.schema import unpack_flags
+from strategies.micro_pullback_momentum import COMPACT_FLAGS, ENTRY_SIGNALS, EXIT_RULES
+
+
+class Portfolio:
+    """
+    Shared-capital, position-limited simulation of one strategy over many tickers.
+
+    After ``run``, the results are available as:
+
+    * ``fills``: DataFrame of executed orders (time, ticker, action, price, shares,
+      entry type, cash after the fill);
+    * ``equity``: DataFrame indexed by fill time with cash, market value, equity and
+      the number of open positions, marked to market after every fill;
+    * ``transactions``: ticker to ``(time, action, ticker, price, entry_type)`` tuples,
+      the layout ``TradeAnalyzer`` consumes (keyed by ticker, not by reqID);
+    * ``rejected``: entry type to the number of signals skipped for lack of cash, a
+      free position slot or risk budget.
+    """
+
+    def __init__(
+        self,
+        initial_capital=100_000.0,
+        max_positions=5,
+        position_pct=0.2,
+        risk_pct=0.01,
+        signals=ENTRY_SIGNALS,
+        exits=EXIT_RULES,
+        flags=COMPACT_FLAGS,
+    ):
+        """
+        Args:
+            initial_capital (float, optional): Starting cash. Defaults to 100,000.
+            max_positions (int, optional): Open positions allowed at once. Defaults to 5.
+            position_pct (float, optional): Largest position as a fraction of current
+                equity. Defaults to 0.2.
+            risk_pct (float, optional): Most equity a position may lose at its stop.
+                Defaults to 0.01. None disables the risk limit.
+            signals (dict, optional): Entry type to signal column, in priority order.
+                Defaults to the momentum strategy's ``ENTRY_SIGNALS``.
+            exits (dict, optional): Entry type to ``(stop_loss_pct, target_pct)``.
+                Defaults to the momentum strategy's ``EXIT_RULES``.
+            flags (tuple, optional): Signal columns packed in the 'Flags' column of
+                compact frames, in bit order. Defaults to the momentum strategy's
+                ``COMPACT_FLAGS``.
+        """
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.position_pct = position_pct
+        self.risk_pct = risk_pct
+        self.signals = signals
+        self.exits = exits
+        self.flags = flags
+
+    def _signal_columns(self, ticker, df):
+        """Entry type -> signal values, unpacked from 'Flags' for compact frames."""
+        columns = self.signals.values()
+        packed = {}
+        if "Flags" in df.columns and any(c not in df.columns for c in columns):
+            packed = unpack_flags(df["Flags"].to_numpy(), self.flags)
+        signals = {}
+        for name, column in self.signals.items():
+            if column in df.columns:
+                signals[name] = df[column]
+            elif column in packed:
+                signals[name] = packed[column]
+            else:
+                raise ValueError(f"{ticker}: no {column!r} column or packed flag")
+        return signals
+
+    def _stream(self, rank, ticker, df):
+        """Candidate trades of one ticker as (entry time, rank, ...) events, in order."""
+        stamps = df["DateTime"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        close = df["Close"].to_numpy(dtype=np.float64)
+        self._prices[ticker] = (stamps, close)
+        trades = simulate_candidates(
+            close,
+            self._signal_columns(ticker, df),
+            self.exits,
+        )
+        for entry, exit, kind, entry_price, exit_price in trades.rows():
+            entry_time = int(stamps[entry])
+            exit_time = None if exit is None else int(stamps[exit])
+            yield entry_time, rank, ticker, kind, entry_price, exit_time, exit_price
+
+    def _shares(self, equity, price, kind):
+        budget = min(self.position_pct * equity, self.cash)
+        if self.risk_pct is not None:
+            budget = min(budget, self.risk_pct * equity / self.exits[kind][0])
+        return int(budget // price)
+
+    def _market_value(self, now):
+        value = 0.0
+        for ticker, (shares, _, entry_price) in self.positions.items():
+            stamps, close = self._prices[ticker]
+            last = np.searchsorted(stamps, now, side="right") - 1
+            price = (
+                close[last] if last >= 0 and not np.isnan(close[last]) else entry_price
+            )
+            value += shares * price
+        return value
+
+    def _fill(self, now, ticker, action, price, shares, kind):
+        self._fills.append((now, ticker, action, price, shares, kind, self.cash))
+        self.transactions.setdefault(ticker, []).append(
+            (pd.Timestamp(now), action, ticker, price, kind)
+        )
+        market_value = self._market_value(now)
+        self._equity.append(
+            (
+                now,
+                self.cash,
+                market_value,
+                self.cash + market_value,
+                len(self.positions),
+            )
+        )
+
+    def _close_until(self, now):
+        """Exit every position whose exit bar is at or before ``now``."""
+        while self._exits and self._exits[0][0] <= now:
+            exit_time, _, ticker, exit_price = heapq.heappop(self._exits)
+            shares, kind, _ = self.positions.pop(ticker)
+            self.cash += shares * exit_price
+            self._fill(exit_time, ticker, "SELL", exit_price, shares, kind)
+
+    def run(self, frames):
+        """
+        Simulate the portfolio.
+
+        Args:
+            frames (dict): Ticker to a signal frame with 'DateTime', 'Close' and the
+                ``signals`` columns (e.g. the frames ``backtest_ticker`` or
+                ``run_backtest(..., keep_frames=True)`` return). Compact frames
+                (``compact=True``) are read through their packed 'Flags' and trade
+                at their float32 prices. Bars of one ticker must be in time order;
+                tickers are merged by time, ties in dict order.
+
+        Raises:
+            ValueError: If a frame has neither a signal column nor its packed flag.
+
+        Returns:
+            Portfolio: ``self``, with ``fills``, ``equity``, ``transactions`` and
+                ``rejected`` set.
+        """
+        self.cash = float(self.initial_capital)
+        self.positions = {}  # ticker -> (shares, entry type, entry price)
+        self.transactions = {}
+        self.rejected = {}
+        self._prices = {}
+        self._fills = []
+        self._equity = []
+        self._exits = []  # heap of (exit time, rank, ticker, exit price)
+        busy_until = {}  # ticker -> exit time of its last taken trade
+
+        streams = [
+            self._stream(rank, ticker, df)
+            for rank, (ticker, df) in enumerate(frames.items())
+        ]
+        for now, rank, ticker, kind, price, exit_time, exit_price in heapq.merge(
+            *streams
+        ):
+            self._close_until(now)
+            if ticker in busy_until and (
+                busy_until[ticker] is None or now <= busy_until[ticker]
+            ):
+                continue  # already in this ticker (or it exited on this bar)
+
+            equity = self.cash + self._market_value(now)
+            shares = self._shares(equity, price, kind)
+            if len(self.positions) >= self.max_positions or shares <= 0:
+                self.rejected[kind] = self.rejected.get(kind, 0) + 1
+                continue
+
+            self.cash -= shares * price
+            self.positions[ticker] = (shares, kind, price)
+            busy_until[ticker] = exit_time
+            if exit_time is not None:
+                heapq.heappush(self._exits, (exit_time, rank, ticker, exit_price))
+            self._fill(now, ticker, "BUY", price, shares, kind)
+        self._close_until(np.iinfo(np.int64).max)
+
+        self.fills = pd.DataFrame(
+            self._fills,
+            columns=["time", "ticker", "action", "price", "shares", "type", "cash"],
+        )
+        self.fills["time"] = pd.to_datetime(self.fills["time"])
+        self.equity = pd.DataFrame(
+            self._equity,
+            columns=["time", "cash", "market_value", "equity", "positions"],
+        )
+        self.equity["time"] = pd.to_datetime(self.equity["time"])
+        self.equity = self.equity.set_index("time")
+        return self
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trade_analyzer import TradeAnalyzer
+
+from data.replay import ReplayApp, ReplaySource
+from strategies.micro_pullback_momentum import backtest
+
+# Offline counterpart of ib_micro_pull_back.py: runs the momentum backtest against
+# recorded bars instead of a live TWS session.
+#
+#   python backtesting/replay_micro_pull_back.py --bars data/cache
+#   python backtesting/replay_micro_pull_back.py --bars recordings/ --files
+
+parser = argparse.ArgumentParser(description="Replay recorded bars through backtest()")
+parser.add_argument("--bars", default="data/cache", help="BarCache root or bar files")
+parser.add_argument(
+    "--files", action="store_true", help="--bars holds one Parquet/CSV file per symbol"
+)
+parser.add_argument(
+    "--books", action="store_true", help="Also report each entry signal's own book"
+)
+parser.add_argument("--date", default="20250416", help="Backtest date (YYYYMMDD)")
+parser.add_argument("tickers", nargs="*", help="Tickers to backtest (default: all)")
+args = parser.parse_args()
+
+if args.files:
+    source = ReplaySource.from_files(args.bars)
+else:
+    source = ReplaySource.from_cache(args.bars)
+selected_stocks = {args.date: args.tickers or sorted(source.frames)}
+
+app = ReplayApp(source)
+date_stats, transactions = backtest(
+    selected_stocks, app, app.ticker_event, multi_book=args.books
+)
+books = transactions if args.books else {"Combined": transactions}
+
+for book, book_transactions in books.items():
+    if args.books:
+        print(f"--- Book: {book}")
+    trade_analyzer = TradeAnalyzer(book_transactions, data=app.data)
+    win_rate_results = trade_analyzer.calculate_win_rate()
+    for strategy, rate in win_rate_results["strategy_win_rates"].items():
+        print(f"Strategy: {strategy} | Win Rate: {rate:.2f}%")
+    print(f"Overall Win Rate: {win_rate_results['overall_win_rate']:.2f}%")
+
+    for entry_type, profit in trade_analyzer.calculate_profit_by_entry_type().items():
+        print(f"Entry Type: {entry_type} | Profit: {profit:.2f}")
@@ -0,0 +1,123 @@
+"""
+Parallel runner for the momentum backtest over many (date, ticker) units.
+
+Once bars are available (typically from a ``BarCache``), every (date, ticker) unit of
+``selected_stocks`` is independent: ``backtest_ticker`` needs nothing but that unit's
+bars. ``run_backtest`` fetches one date at a time, submits its units to a process pool
+(or a thread pool) and keeps at most ``max_pending`` units in flight, so memory stays
+bounded by a few dates of bars however large the dataset is. Results are consumed in
+submission order, so ``date_stats``, ``transactions`` and the request IDs are exactly
+what the sequential ``backtest(..., client=...)`` returns.
+"""
+
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from strategies.micro_pullback_momentum import (
+    COMBINED_BOOK,
+    ENTRY_SIGNALS,
+    backtest_ticker,
+)
+
+EXECUTORS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+
+def iter_units(selected_stocks, client, duration="5 D", candle_size="1 min"):
+    """
+    Yield ``(date, ticker, bars)`` in ``selected_stocks`` order, fetching a date at a time.
+
+    Units without bars are reported and skipped, like ``backtest()`` does.
+    """
+    for date, tickers in selected_stocks.items():
+        frames = client.fetch_frames(
+            tickers, date + " 22:05:00 US/Eastern", duration, candle_size
+        )
+        for ticker in tickers:
+            bars = frames.get(ticker)
+            if bars is None or bars.empty:
+                print(f"Warning: No data for {ticker} on {date}")
+                continue
+            yield date, ticker, bars
+
+
+def _run_unit(task):
+    bars, ticker, multi_book, keep_frames, compact = task
+    df, records = backtest_ticker(bars, ticker, multi_book, compact)
+    return (df if keep_frames else None), records
+
+
+def run_backtest(
+    selected_stocks,
+    client,
+    processes=None,
+    executor="process",
+    multi_book=False,
+    keep_frames=False,
+    max_pending=None,
+    compact=False,
+    mp_context=None,
+):
+    """
+    Run the momentum backtest with (date, ticker) units spread over a worker pool.
+
+    Args:
+        selected_stocks (dict): Date (YYYYMMDD) to tickers, as passed to ``backtest()``.
+        client: Object with ``fetch_frames``, e.g. ``BarCache``.
+        processes (int, optional): Workers. Defaults to the CPU count.
+        executor (str, optional): "process", or "thread" for a thread pool (the heavy
+            NumPy/pandas kernels release the GIL). Defaults to "process".
+        multi_book (bool, optional): Same as in ``backtest()``. Defaults to False.
+        keep_frames (bool, optional): Also return every unit's indicator frame (what
+            ``backtest()`` leaves in ``app.data``). Defaults to False to bound memory.
+        max_pending (int, optional): Units submitted but not yet merged. Defaults to
+            four per worker.
+        compact (bool, optional): Keep the indicator frames in the compact schema of
+            ``backtest_ticker(..., compact=True)``. Defaults to False.
+        mp_context (optional): ``multiprocessing`` context the process pool starts its
+            workers with, e.g. ``multiprocessing.get_context("spawn")`` when this
+            process already runs threads or holds sockets that a forked worker must not
+            inherit. Ignored by the thread pool. Defaults to the platform's start method.
+
+    Returns:
+        tuple: ``(date_stats, transactions, data)``. The first two are identical to
+            ``backtest()``'s; ``data`` maps request ID to indicator frame when
+            ``keep_frames`` is set and is empty otherwise.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor {executor!r}")
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 4 * processes
+
+    books = [COMBINED_BOOK] + list(ENTRY_SIGNALS) if multi_book else [COMBINED_BOOK]
+    book_stats = {book: {date: {} for date in selected_stocks} for book in books}
+    book_transactions = {book: collections.defaultdict(list) for book in books}
+    data = {}
+
+    def merge(reqID, date, ticker, result):
+        df, records = result
+        for book, (rows, stats) in records.items():
+            if rows:
+                book_transactions[book][reqID].extend(rows)
+            if stats is not None:
+                book_stats[book][date][ticker] = stats
+        if df is not None:
+            data[reqID] = df
+
+    options = {"mp_context": mp_context} if executor == "process" else {}
+    pending = collections.deque()
+    with EXECUTORS[executor](max_workers=processes, **options) as pool:
+        units = iter_units(selected_stocks, client)
+        for reqID, (date, ticker, bars) in enumerate(units, start=1000):
+            task = (bars, ticker, multi_book, keep_frames, compact)
+            pending.append((reqID, date, ticker, pool.submit(_run_unit, task)))
+            if len(pending) >= max_pending:
+                reqID, date, ticker, future = pending.popleft()
+                merge(reqID, date, ticker, future.result())
+        while pending:
+            reqID, date, ticker, future = pending.popleft()
+            merge(reqID, date, ticker, future.result())
+
+    if multi_book:
+        return book_stats, book_transactions, data
+    return book_stats[COMBINED_BOOK], book_transactions[COMBINED_BOOK], data
@@ -0,0 +1,242 @@
+"""
+Adaptive parameter search: successive halving, and a TPE sampler when optuna is
+installed.
+
+Both run on the ``backtesting.sweep`` worker pool and score combos with a pluggable
+objective: any callable mapping the ``score_transactions`` metrics of a combo
+('trades', 'win_rate', 'avg_return', 'total_profit') to a float, higher being better.
+
+Successive halving scores a random sample of the grid on a small random subset of the
+ticker-days, keeps the best ``1 / eta`` of the candidates, multiplies the subset by
+``eta`` and repeats, so only the last few survivors are traded on the full universe.
+"""
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtesting.sweep import check_params, run_combo, worker_pool
+
+try:
+    import optuna
+except ImportError:  # only tpe_search needs it
+    optuna = None
+
+
+def metric_objective(metric="avg_return", min_trades=1):
+    """
+    Objective scoring a combo by one metric.
+
+    Args:
+        metric (str, optional): Metric to maximize. Defaults to "avg_return".
+        min_trades (int, optional): Combos with fewer closed trades score -inf.
+            Defaults to 1.
+
+    Returns:
+        callable: ``objective(metrics) -> float``.
+    """
+
+    def objective(metrics):
+        if metrics["trades"] < min_trades:
+            return -math.inf
+        return float(metrics[metric])
+
+    return objective
+
+
+def sample_grid(grid, n, seed=0):
+    """
+    Up to ``n`` distinct combos drawn uniformly from a parameter grid.
+
+    The grid is never expanded, so very large grids are cheap to sample.
+
+    Args:
+        grid (dict): Parameter name to a list of values.
+        n (int): Number of combos.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: Combo dicts (the whole grid, in grid order, if it has at most ``n``).
+    """
+    names = list(grid)
+    sizes = [len(grid[name]) for name in names]
+    total = math.prod(sizes)
+    if total <= n:
+        picks = range(total)
+    else:
+        picks = sorted(np.random.default_rng(seed).choice(total, n, replace=False))
+    combos = []
+    for pick in picks:
+        combo = {}
+        for name, size in zip(reversed(names), reversed(sizes)):
+            pick, index = divmod(int(pick), size)
+            combo[name] = grid[name][index]
+        combos.append({name: combo[name] for name in names})
+    return combos
+
+
+def _score_task(task):
+    params, unit_ids = task
+    return run_combo(params, unit_ids)
+
+
+def _history_rows(step, results, scores):
+    return [
+        {**step, **metrics, "score": score} for metrics, score in zip(results, scores)
+    ]
+
+
+def successive_halving(
+    strategy,
+    grid,
+    units,
+    n_candidates=81,
+    eta=3,
+    min_units=None,
+    objective=None,
+    processes=None,
+    seed=0,
+):
+    """
+    Search a parameter grid by successive halving.
+
+    Args:
+        strategy (str): Key of ``backtesting.sweep.STRATEGIES``.
+        grid (dict): Parameter name to candidate values, as for ``sweep``.
+        units (dict): (date, ticker) to prepared bars, e.g. from ``load_units``.
+        n_candidates (int, optional): Combos sampled from the grid for the first rung.
+            Defaults to 81.
+        eta (int, optional): Fraction of candidates dropped per rung (1 - 1/eta) and
+            growth factor of the unit subset, at least 2. Defaults to 3.
+        min_units (int, optional): Ticker-days in the first rung. Defaults to the
+            number that reaches the full universe when one candidate is left.
+        objective (callable, optional): ``objective(metrics) -> float``. Defaults to
+            ``metric_objective()``.
+        processes (int, optional): Worker processes. Defaults to the CPU count.
+        seed (int, optional): Seed for the grid sample and the unit subsets. Defaults to 0.
+
+    Raises:
+        ValueError: If ``eta`` is not an integer of at least 2, or
+            ``backtesting.sweep.check_params`` rejects the grid.
+
+    Returns:
+        dict: 'best', the winning parameters; 'history', a DataFrame with one row per
+            evaluation (rung, number of units, parameters, metrics, score), whose
+            'units' column summed is the cost in ticker-day backtests.
+    """
+    if not eta >= 2 or eta != int(eta):
+        raise ValueError(f"eta must be an integer of at least 2, got {eta}")
+    objective = objective or metric_objective()
+    check_params(strategy, grid)
+    candidates = sample_grid(grid, n_candidates, seed)
+    total = len(units)
+    order = np.random.default_rng(seed).permutation(total).tolist()
+    if min_units is None:
+        rungs = max(1, math.ceil(math.log(len(candidates), eta)))
+        min_units = math.ceil(total / eta**rungs)
+    n_units = max(1, min(min_units, total))
+
+    history = []
+    with worker_pool(units, strategy, processes) as map_tasks:
+        rung = 0
+        while True:
+            unit_ids = order[:n_units]
+            results = map_tasks(_score_task, [(c, unit_ids) for c in candidates])
+            scores = [objective(metrics) for metrics in results]
+            history += _history_rows({"rung": rung, "units": n_units}, results, scores)
+            if n_units == total:
+                break
+            ranked = sorted(range(len(candidates)), key=lambda k: -scores[k])
+            candidates = [
+                candidates[k] for k in ranked[: math.ceil(len(candidates) / eta)]
+            ]
+            n_units = total if len(candidates) == 1 else min(total, n_units * eta)
+            rung += 1
+
+    best = candidates[int(np.argmax(scores))]
+    return {"best": best, "history": pd.DataFrame(history)}
+
+
+def _suggest(trial, space):
+    params = {}
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                params[name] = trial.suggest_int(name, low, high)
+            else:
+                params[name] = trial.suggest_float(name, low, high)
+        else:
+            params[name] = trial.suggest_categorical(name, list(values))
+    return params
+
+
+def tpe_search(
+    strategy,
+    space,
+    units,
+    n_trials=100,
+    objective=None,
+    processes=None,
+    batch_size=None,
+    seed=0,
+):
+    """
+    Search parameters with optuna's TPE sampler on the full universe.
+
+    Trials are asked for in batches and a batch is backtested in parallel before its
+    scores are told to the sampler.
+
+    Args:
+        strategy (str): Key of ``backtesting.sweep.STRATEGIES``.
+        space (dict): Parameter name to a list of choices, or a ``(low, high)`` tuple
+            for an int (both bounds int) or float range.
+        units (dict): (date, ticker) to prepared bars, e.g. from ``load_units``.
+        n_trials (int, optional): Combos to evaluate. Defaults to 100.
+        objective (callable, optional): ``objective(metrics) -> float``. Defaults to
+            ``metric_objective()``.
+        processes (int, optional): Worker processes. Defaults to the CPU count.
+        batch_size (int, optional): Trials per batch. Defaults to ``processes``.
+        seed (int, optional): Sampler seed. Defaults to 0.
+
+    Raises:
+        ImportError: If optuna is not installed.
+        ValueError: If ``backtesting.sweep.check_params`` rejects the space.
+
+    Returns:
+        dict: 'best', the best parameters, and 'history', one row per trial (batch,
+            number of units, parameters, metrics, score).
+    """
+    if optuna is None:
+        raise ImportError(
+            "tpe_search requires optuna (pip install -r requirements-optional.txt)"
+        )
+    check_params(strategy, space)
+    objective = objective or metric_objective()
+    study = optuna.create_study(
+        direction="maximize", sampler=optuna.samplers.TPESampler(seed=seed)
+    )
+    unit_ids = list(range(len(units)))
+
+    history = []
+    best, best_score = None, -math.inf
+    with worker_pool(units, strategy, processes) as map_tasks:
+        batch_size = batch_size or processes or os.cpu_count() or 1
+        for start in range(0, n_trials, batch_size):
+            trials = [study.ask() for _ in range(min(batch_size, n_trials - start))]
+            candidates = [_suggest(trial, space) for trial in trials]
+            results = map_tasks(_score_task, [(c, unit_ids) for c in candidates])
+            scores = [objective(metrics) for metrics in results]
+            for trial, params, score in zip(trials, candidates, scores):
+                if math.isfinite(score):
+                    study.tell(trial, score)
+                else:
+                    study.tell(trial, state=optuna.trial.TrialState.FAIL)
+                if best is None or score > best_score:
+                    best, best_score = params, score
+            history += _history_rows(
+                {"batch": start // batch_size, "units": len(units)}, results, scores
+            )
+    return {"best": best, "history": pd.DataFrame(history)}
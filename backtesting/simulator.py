@@ -0,0 +1,233 @@
+"""
+Vectorized single-position trade simulator.
+
+All the ``backtest()`` functions trade one position at a time with the same rules:
+enter at the close of a bar with an entry signal while flat, then exit at the close
+of the first later bar that reaches the entry's target or stop. ``simulate`` applies
+those rules without a per-bar Python loop:
+
+* the exit bar of every *candidate* entry is found at once by binary lifting over
+  sparse tables of running maxima/minima of the close, O(log n) NumPy steps in total;
+* the actual trades are then chained candidate -> exit -> next candidate with
+  ``searchsorted``, one Python step per trade instead of one per bar.
+
+``simulate_books`` reuses the same search tables to trade each entry signal in its own
+book alongside the priority-resolved one.
+"""
+
+import numpy as np
+
+
+class Trades:
+    """
+    Round trips produced by ``simulate``.
+
+    Attributes:
+        entry (np.ndarray): Bar index of each entry.
+        exit (np.ndarray): Bar index of each exit, -1 for a position still open at the
+            end of the data (only the last trade can be open).
+        kind (np.ndarray): Index into ``names`` of the signal that opened each trade.
+        names (list): Signal names in priority order.
+        entry_price, exit_price (np.ndarray): Close at entry and exit (NaN if open).
+    """
+
+    def __init__(self, entry, exit, kind, names, close):
+        self.entry = entry
+        self.exit = exit
+        self.kind = kind
+        self.names = names
+        self.entry_price = close[entry]
+        self.exit_price = np.where(exit >= 0, close[np.maximum(exit, 0)], np.nan)
+
+    def __len__(self):
+        return len(self.entry)
+
+    @property
+    def closed(self):
+        """np.ndarray: True for trades that were exited."""
+        return self.exit >= 0
+
+    @property
+    def returns(self):
+        """np.ndarray: Fractional return of each trade (NaN if open)."""
+        return (self.exit_price - self.entry_price) / self.entry_price
+
+    def rows(self):
+        """
+        Iterate over trades in order.
+
+        Yields:
+            tuple: (entry index, exit index or None, signal name, entry price,
+                exit price or None) with Python scalars.
+        """
+        for entry, exit, kind, entry_price, exit_price in zip(
+            self.entry.tolist(),
+            self.exit.tolist(),
+            self.kind.tolist(),
+            self.entry_price.tolist(),
+            self.exit_price.tolist(),
+        ):
+            if exit < 0:
+                yield entry, None, self.names[kind], entry_price, None
+            else:
+                yield entry, exit, self.names[kind], entry_price, exit_price
+
+
+def _sparse_table(values, op):
+    """Level k holds ``op`` over every window of 2**k consecutive values."""
+    table = [values]
+    size = 1
+    while 2 * size <= len(values):
+        prev = table[-1]
+        table.append(op(prev[:-size], prev[size:]))
+        size *= 2
+    return table
+
+
+def _first_hit(table, start, threshold, no_hit):
+    """
+    First index >= ``start`` whose value hits ``threshold``, for every query at once.
+
+    ``no_hit(block, threshold)`` must be True when a whole block (summarized by the
+    table) contains no hit. Returns len(values) where there is none.
+    """
+    n = len(table[0])
+    pos = start.copy()
+    for k in range(len(table) - 1, -1, -1):
+        size = 1 << k
+        inside = pos <= n - size
+        summary = table[k][np.where(inside, pos, 0)]
+        pos = np.where(inside & no_hit(summary, threshold), pos + size, pos)
+    return pos
+
+
+def _exit_tables(close):
+    """Sparse max/min tables of the close, shared by every book on the same bars."""
+    return _sparse_table(close, np.fmax), _sparse_table(close, np.fmin)
+
+
+def _candidates(close, tables, names, stacked, exits):
+    """Every bar with an entry signal, its winning signal and its own exit bar."""
+    candidates = np.flatnonzero(stacked.any(axis=0))
+    kind = np.argmax(stacked[:, candidates], axis=0)
+
+    stop_pct = np.array([exits[name][0] for name in names], dtype=np.float64)
+    target_pct = np.array([exits[name][1] for name in names], dtype=np.float64)
+    price = close[candidates]
+    stop = price * (1 - stop_pct[kind])
+    target = price * (1 + target_pct[kind])
+
+    # fmax/fmin so a missing close never hides a later hit; the negated comparisons
+    # treat NaN like the bar loop did (never an exit)
+    start = candidates + 1
+    up = _first_hit(tables[0], start, target, lambda block, t: ~(block >= t))
+    down = _first_hit(tables[1], start, stop, lambda block, t: ~(block <= t))
+    return candidates, kind, np.minimum(up, down)
+
+
+def _simulate(close, tables, names, stacked, exits):
+    n = len(close)
+    candidates, kind, exit_at = _candidates(close, tables, names, stacked, exits)
+
+    # Chain the trades: the next entry is the first candidate after the last exit
+    chosen = []
+    i = 0
+    while i < len(candidates):
+        chosen.append(i)
+        if exit_at[i] >= n:
+            break
+        i = np.searchsorted(candidates, exit_at[i], side="right")
+    chosen = np.asarray(chosen, dtype=np.int64)
+    exit_idx = exit_at[chosen]
+    return Trades(
+        candidates[chosen],
+        np.where(exit_idx < n, exit_idx, -1),
+        kind[chosen],
+        names,
+        close,
+    )
+
+
+def simulate(close, signals, exits):
+    """
+    Simulate single-position trading on one ticker's bars.
+
+    Args:
+        close (array-like): Close prices.
+        signals (dict): Entry signal name to boolean array. When several signals fire on
+            the same bar the first one in the dict opens the trade.
+        exits (dict): Signal name to ``(stop_loss_pct, target_pct)``; the stop is
+            ``entry * (1 - stop_loss_pct)`` and the target ``entry * (1 + target_pct)``.
+
+    Returns:
+        Trades: The round trips, in order.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    names = list(signals)
+    if len(close) == 0 or not names:
+        empty = np.empty(0, dtype=np.int64)
+        return Trades(empty, empty, empty, names, close)
+
+    stacked = np.vstack([np.asarray(signals[name], dtype=bool) for name in names])
+    return _simulate(close, _exit_tables(close), names, stacked, exits)
+
+
+def simulate_books(close, signals, exits, combined="Combined"):
+    """
+    Simulate every signal in its own position book, plus the priority book.
+
+    Each signal trades independently of the others (its own position, so a trade in
+    one book never blocks an entry in another), while the ``combined`` book resolves
+    simultaneous signals by priority exactly like ``simulate``. The exit search tables
+    are built once and shared by all books.
+
+    Args:
+        close (array-like): Close prices.
+        signals (dict): Entry signal name to boolean array, in priority order.
+        exits (dict): Signal name to ``(stop_loss_pct, target_pct)``.
+        combined (str, optional): Name of the priority book. Defaults to "Combined".
+
+    Returns:
+        dict: Book name to ``Trades``; the combined book first, then one per signal.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    names = list(signals)
+    if len(close) == 0 or not names:
+        return {book: simulate(close, {}, exits) for book in [combined] + names}
+
+    stacked = np.vstack([np.asarray(signals[name], dtype=bool) for name in names])
+    tables = _exit_tables(close)
+    books = {combined: _simulate(close, tables, names, stacked, exits)}
+    for k, name in enumerate(names):
+        books[name] = _simulate(close, tables, [name], stacked[k : k + 1], exits)
+    return books
+
+
+def simulate_candidates(close, signals, exits):
+    """
+    Every potential trade on one ticker's bars, ignoring the one-position rule.
+
+    Each bar with an entry signal opens a trade that exits at its own stop or target,
+    even if an earlier trade would still be open. Callers that decide which entries
+    are actually taken (e.g. a portfolio with limited capital) pick from these.
+
+    Args:
+        close (array-like): Close prices.
+        signals (dict): Entry signal name to boolean array, in priority order.
+        exits (dict): Signal name to ``(stop_loss_pct, target_pct)``.
+
+    Returns:
+        Trades: One (possibly overlapping) trade per entry-signal bar, in bar order.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    names = list(signals)
+    if len(close) == 0 or not names:
+        return simulate(close, {}, exits)
+
+    stacked = np.vstack([np.asarray(signals[name], dtype=bool) for name in names])
+    candidates, kind, exit_at = _candidates(
+        close, _exit_tables(close), names, stacked, exits
+    )
+    return Trades(
+        candidates, np.where(exit_at < len(close), exit_at, -1), kind, names, close
+    )
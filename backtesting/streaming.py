@@ -0,0 +1,347 @@
+"""
+Constant-memory backtest of one ticker over long histories, a few sessions at a time.
+
+Bars are read in chunks of whole trading days (from a ``BarCache`` directory or an
+in-memory frame) and each chunk is evaluated together with the last ``warmup`` bars
+of the previous one, where ``warmup`` is the longest lookback of the signal function.
+Only the chunk's own rows are traded; an open position (entry, stop and target) is
+carried into the next chunk, one per book, and exited there exactly where the bar
+loop would have.
+
+Rolling windows and shifts only need the warm-up rows. The recursive indicators of
+the momentum strategy (the EMA ribbon and T3 of Close, Wilder RSI, ATR and ADX) depend
+on every earlier bar instead, so ``MomentumSignals`` carries their state from chunk to
+chunk: EMAs continue their ``lfilter`` pass from the last value, and RSI/ATR/ADX are
+advanced bar by bar with the ``indicators.online`` objects, which reproduce the batch
+``ta`` series. The carried values are handed to the strategies through their
+``FeatureStore``, and the momentum frame's rows with missing values are dropped before
+trading, as ``backtest_ticker`` does. A chunked run then produces the same per-book
+transactions as ``backtest_ticker(bars, ticker, multi_book=True)`` on the whole
+history.
+
+One input is not streamable: the breakout's volatility filter compares the 10-bar
+mean range with its median over the *whole* history, future bars included, so no
+amount of carried state reproduces it from the bars seen so far. It is passed in as
+``atr_median`` instead; ``history_atr_median`` computes it in a first pass over the
+chunks, keeping one float per bar (the only state that grows with the history).
+"""
+
+import glob
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from backtesting.simulator import simulate
+from backtesting.sweep import prepare_bars
+from indicators.ema import ema_alpha, t3_weights
+from indicators.feature_store import FeatureStore
+from indicators.online import ADX, ATR, RSI
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.micro_pullback_momentum import (
+    COMBINED_BOOK,
+    ENTRY_SIGNALS,
+    EXIT_RULES,
+    compute_momentum_signals,
+)
+
+# Micro pullback as micro_pullback_momentum.compute_momentum_signals configures it
+MICRO_PULLBACK_PARAMS = {
+    "atr_window": 15,
+    "volume_window": 80,
+    "rel_volume_thresh": 5,
+    "vol_thresh": 15000,
+    "max_pullback_pct": 0.02,
+}
+# Longest rolling window plus the three bars of the momentum pattern
+MICRO_PULLBACK_WARMUP = (
+    max(MICRO_PULLBACK_PARAMS["atr_window"], MICRO_PULLBACK_PARAMS["volume_window"]) + 3
+)
+MICRO_PULLBACK_EXITS = {"MicroPullback": (0.03, 0.04)}
+# The micro pullback's 80-bar volume window and 3-bar pattern are the longest
+# window-local lookback of the momentum strategy; everything else is carried
+MOMENTUM_WARMUP = MICRO_PULLBACK_WARMUP
+
+# EMA spans and T3 lengths of Close read by the momentum strategies
+MOMENTUM_EMA_SPANS = (4, 7, 15)
+MOMENTUM_T3_LENGTHS = (5, 8)
+
+_Bar = namedtuple("_Bar", "high low close")
+
+
+def micro_pullback_signals(frame, offset=0):
+    """
+    Window-local micro pullback signal of prepared bars.
+
+    Args:
+        frame (pd.DataFrame): Prepared bars, the warm-up rows first.
+        offset (int, optional): Number of warm-up rows. Defaults to 0.
+
+    Returns:
+        tuple: ``(bars, signals)``: the rows to trade and {'MicroPullback': bool array}.
+    """
+    flags = compute_micro_pullback(frame, **MICRO_PULLBACK_PARAMS)["MicroPullback"]
+    return frame.iloc[offset:], {"MicroPullback": flags.to_numpy(dtype=bool)[offset:]}
+
+
+def _continue_ema(values, alpha, last=None):
+    """
+    ``ema_bank``'s adjust=False recurrence over ``values``, continued from ``last``
+    (the EMA of the bar before ``values[0]``) or seeded with ``values[0]`` when None.
+    """
+    beta = 1.0 - alpha
+    seed = values[0] if last is None else last
+    return lfilter([alpha], [1.0, -beta], values, zi=[beta * seed])[0]
+
+
+class MomentumSignals:
+    """
+    Entry signals of the momentum strategy for ``stream_backtest``.
+
+    Each call computes ``compute_momentum_signals`` on a chunk frame whose recursive
+    indicators continue from the previous call, and returns the frame's new rows that
+    survive its ``dropna``. Build one instance per ticker and stream.
+    """
+
+    def __init__(self, atr_median):
+        """
+        Args:
+            atr_median (float): Median of the 10-bar mean range over the whole history,
+                e.g. from ``history_atr_median``.
+        """
+        self.atr_median = atr_median
+        self._ema_last = {}  # (length, stage) -> EMA of the last bar seen
+        self._rsi = RSI(14)
+        self._atr = ATR(14)
+        self._adx = {window: ADX(window) for window in (14, 15)}
+        self._carried = {}  # FeatureStore key -> values over the last frame
+
+    def _advance(self, bars):
+        """Recursive indicators over the new bars, updating the carried state."""
+        close = bars["Close"].to_numpy(dtype=np.float64)
+        features = {}
+        for span in MOMENTUM_EMA_SPANS:
+            values = _continue_ema(close, ema_alpha(span), self._ema_last.get(span))
+            self._ema_last[span] = values[-1]
+            features[("ema", ("Close",), (span, False))] = values
+        c1, c2, c3, c4 = t3_weights(0.7)
+        for length in MOMENTUM_T3_LENGTHS:
+            stages = []
+            stage = close
+            for k in range(6):
+                stage = _continue_ema(
+                    stage, ema_alpha(length), self._ema_last.get((length, k))
+                )
+                self._ema_last[(length, k)] = stage[-1]
+                stages.append(stage)
+            t3 = c1 * stages[5] + c2 * stages[4] + c3 * stages[3] + c4 * stages[2]
+            features[("t3", ("Close",), (length, 0.7))] = t3
+
+        high = bars["High"].to_numpy(dtype=np.float64).tolist()
+        low = bars["Low"].to_numpy(dtype=np.float64).tolist()
+        rsi, atr = np.empty(len(close)), np.empty(len(close))
+        adx = {window: np.empty(len(close)) for window in self._adx}
+        for i, bar in enumerate(map(_Bar, high, low, close.tolist())):
+            rsi[i] = self._rsi.update(bar.close)
+            atr[i] = self._atr.update(bar)
+            for window, indicator in self._adx.items():
+                adx[window][i] = indicator.update(bar)
+        features[("rsi", ("Close",), (14,))] = rsi
+        features[("atr", ("High", "Low", "Close"), (14,))] = atr
+        for window, values in adx.items():
+            features[("adx", ("High", "Low", "Close"), (window,))] = values
+        return features
+
+    def __call__(self, frame, offset=0):
+        """
+        Args:
+            frame (pd.DataFrame): Prepared bars: the last rows of the previous call's
+                frame, then new bars.
+            offset (int, optional): Number of rows carried over from the previous
+                frame. Defaults to 0.
+
+        Returns:
+            tuple: ``(bars, signals)``: the new rows kept by the momentum frame's
+                ``dropna`` and entry type -> bool array, in ``ENTRY_SIGNALS`` order.
+        """
+        advanced = self._advance(frame.iloc[offset:])
+        features = FeatureStore(frame)
+        for key, values in advanced.items():
+            if offset:
+                values = np.r_[self._carried[key][-offset:], values]
+            self._carried[key] = values
+            series = pd.Series(values, index=frame.index)
+            name, sources, params = key
+            features.get(name, sources, params, lambda *_: series)
+        atr = features.rolling(features.range(), 10)
+        features.get("median", (atr,), (), lambda _: self.atr_median)
+
+        df = compute_momentum_signals(frame, features)
+        bars = df[df.index.isin(frame.index[offset:])]
+        signals = {
+            name: bars[column].to_numpy(dtype=bool)
+            for name, column in ENTRY_SIGNALS.items()
+        }
+        return bars, signals
+
+
+def history_atr_median(chunks):
+    """
+    Median of the 10-bar mean range over a ticker's whole history, as the momentum
+    strategy's volatility filter computes it.
+
+    Args:
+        chunks (iterable): Raw bar frames of consecutive trading days.
+
+    Returns:
+        float: The median, for ``MomentumSignals``.
+    """
+    ranges = [
+        (chunk["High"] - chunk["Low"]).to_numpy(dtype=np.float64) for chunk in chunks
+    ]
+    return pd.Series(np.concatenate(ranges)).rolling(10).mean().median()
+
+
+def cached_days(root, ticker, candle_size="1 min"):
+    """Yield a ticker's non-empty day partitions from a ``BarCache`` root, oldest first."""
+    pattern = os.path.join(root, ticker, candle_size.replace(" ", "_"), "*.parquet")
+    for path in sorted(glob.glob(pattern)):
+        bars = pd.read_parquet(path)
+        if not bars.empty:
+            yield bars
+
+
+def frame_days(bars):
+    """Yield the per-day slices of an in-memory bar frame (e.g. a ``ReplaySource`` frame)."""
+    days = bars["Date"].astype(str).str[:8].to_numpy()
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    for start, stop in zip(starts, np.r_[starts[1:], len(days)]):
+        yield bars.iloc[start:stop]
+
+
+def day_chunks(days, chunk_days):
+    """Group an iterable of day frames into frames of ``chunk_days`` days."""
+    chunk = []
+    for day in days:
+        chunk.append(day)
+        if len(chunk) == chunk_days:
+            yield pd.concat(chunk, ignore_index=True)
+            chunk = []
+    if chunk:
+        yield pd.concat(chunk, ignore_index=True)
+
+
+def _trade_chunk(close, dates, ticker, signals, exits, position):
+    """
+    Trade one chunk's bars, starting with ``position`` (or flat when None).
+
+    Returns:
+        tuple: (transactions, position still open at the end of the chunk or None).
+    """
+    transactions = []
+    start = 0
+    if position is not None:
+        kind, entry_price, stop, target = position
+        hits = np.flatnonzero((close >= target) | (close <= stop))
+        if len(hits) == 0:
+            return transactions, position
+        exit = hits[0]
+        transactions.append((dates[exit], "SELL", ticker, float(close[exit]), kind))
+        start = exit + 1
+        position = None
+
+    trades = simulate(
+        close[start:], {name: flags[start:] for name, flags in signals.items()}, exits
+    )
+    for entry, exit, kind, entry_price, exit_price in trades.rows():
+        transactions.append((dates[start + entry], "BUY", ticker, entry_price, kind))
+        if exit is None:
+            stop_pct, target_pct = exits[kind]
+            stop = np.float64(entry_price) * (1 - stop_pct)
+            target = np.float64(entry_price) * (1 + target_pct)
+            position = (kind, entry_price, stop, target)
+        else:
+            transactions.append((dates[start + exit], "SELL", ticker, exit_price, kind))
+    return transactions, position
+
+
+def stream_backtest(
+    chunks,
+    ticker,
+    signal_fn=micro_pullback_signals,
+    warmup=MICRO_PULLBACK_WARMUP,
+    exits=MICRO_PULLBACK_EXITS,
+    multi_book=False,
+):
+    """
+    Backtest one ticker chunk by chunk.
+
+    Args:
+        chunks (iterable): Raw IB bar frames of consecutive whole trading days, e.g.
+            ``day_chunks(cached_days(root, ticker), 20)``.
+        ticker (str): Ticker recorded in the transactions.
+        signal_fn (callable, optional): ``signal_fn(frame, offset)`` of prepared bars
+            whose first ``offset`` rows are warm-up, returning ``(bars, signals)``:
+            the rows after the warm-up to trade and signal name -> bool array over
+            them, in priority order. Defaults to ``micro_pullback_signals``; use a
+            ``MomentumSignals`` for the momentum strategy.
+        warmup (int, optional): Longest window-local lookback of ``signal_fn`` in bars.
+            Defaults to ``MICRO_PULLBACK_WARMUP``.
+        exits (dict, optional): Signal name to ``(stop_loss_pct, target_pct)``.
+            Defaults to ``MICRO_PULLBACK_EXITS``.
+        multi_book (bool, optional): Also trade each signal in its own book, as
+            ``simulate_books`` does. Defaults to False.
+
+    Returns:
+        tuple: ``(transactions, open_position)``. ``transactions`` are
+            ``(date, action, ticker, price, entry_type)`` tuples as in the momentum
+            backtest; ``open_position`` is ``(entry_type, entry_price, stop, target)``
+            for a trade still open at the end of the data, else None. With
+            ``multi_book`` both are dicts from book name (``COMBINED_BOOK``, then each
+            signal name) to that book's value.
+    """
+    transactions, positions = {COMBINED_BOOK: []}, {COMBINED_BOOK: None}
+    tail = None
+    for chunk in chunks:
+        bars = prepare_bars(chunk)
+        frame = bars if tail is None else pd.concat([tail, bars], ignore_index=True)
+        offset = len(frame) - len(bars)
+        rows, signals = signal_fn(frame, offset)
+
+        close = rows["Close"].to_numpy(dtype=np.float64)
+        dates = rows["Date"].to_numpy()
+        books = {COMBINED_BOOK: signals}
+        if multi_book:
+            books.update((name, {name: flags}) for name, flags in signals.items())
+        for book, book_signals in books.items():
+            traded, positions[book] = _trade_chunk(
+                close, dates, ticker, book_signals, exits, positions.get(book)
+            )
+            transactions.setdefault(book, []).extend(traded)
+        tail = frame.iloc[-warmup:] if warmup else None
+    if multi_book:
+        return transactions, positions
+    return transactions[COMBINED_BOOK], positions[COMBINED_BOOK]
+
+
+def stream_momentum_backtest(open_chunks, ticker, multi_book=True):
+    """
+    Momentum strategy backtest of one ticker chunk by chunk.
+
+    Args:
+        open_chunks (callable): Returns a fresh iterable of the ticker's raw bar chunks
+            (consecutive whole trading days); called twice, once for
+            ``history_atr_median`` and once to trade.
+        ticker (str): Ticker recorded in the transactions.
+        multi_book (bool, optional): Also trade each entry signal in its own book.
+            Defaults to True.
+
+    Returns:
+        tuple: ``(transactions, open_positions)`` as returned by ``stream_backtest``.
+    """
+    signals = MomentumSignals(history_atr_median(open_chunks()))
+    return stream_backtest(
+        open_chunks(), ticker, signals, MOMENTUM_WARMUP, EXIT_RULES, multi_book
+    )
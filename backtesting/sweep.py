@@ -0,0 +1,463 @@
+"""
+Parameter sweeps of a strategy's entry signal over a process pool.
+
+The bars of every (date, ticker) unit are prepared once in the parent (float volume,
+``DateTime``, session VWAP) and packed into one ``multiprocessing.shared_memory``
+block, together with the strategy's parameter-independent features (``SHARED_FEATURES``:
+fixed-window indicators such as the EMA ribbon or the Wilder RSI/ATR/ADX), which are
+computed once per unit. Workers attach to that block when the pool starts and rebuild
+each unit's frame from views into it, so a task only pickles its parameter dicts.
+Every combo gets a fresh ``FeatureStore`` per unit seeded with the shared features;
+the features that depend on the combo's parameters are computed into it and dropped
+with it, so a worker's memory does not grow with the number of combos it runs.
+A pool started with ``keep_features`` instead keeps one store per unit for the life
+of the worker, so a unit traded again with a combo it has seen (walk-forward folds
+overlap) reuses the parameter-dependent features too.
+
+Every combo is traded with ``backtesting.simulator.simulate`` and scored with the
+``TradeAnalyzer`` metrics; ``sweep`` returns one ranked row per combo.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtesting.simulator import simulate
+from backtesting.trade_analyzer import TradeAnalyzer
+from indicators.feature_store import FeatureStore
+from strategies.micro_pull_back_ema import compute_micro_pullback_ema_strategy
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_session_vwap
+
+# Strategy name -> (signal function, signal column it returns)
+STRATEGIES = {
+    "micro_pullback": (compute_micro_pullback, "MicroPullback"),
+    "ema": (compute_micro_pullback_ema_strategy, "EMABuySignal"),
+    "stochastic_bollinger": (compute_stochastic_bollinger_band, "StochBollingerEntry"),
+}
+# Grid keys that set the exit rule instead of being passed to the signal function
+EXIT_PARAMS = ("stop_loss_pct", "target_pct")
+DEFAULT_EXIT = {"stop_loss_pct": 0.03, "target_pct": 0.04}
+
+SHARED_COLUMNS = ("Open", "High", "Low", "Close", "Volume", "VWAP")
+
+
+def _ema_features(features):
+    features.emas("Close", (4, 7, 15))
+    features.adx(15)
+
+
+def _stochastic_bollinger_features(features):
+    features.rolling("High", 14, "max")
+    features.rolling("Low", 14, "min")
+    features.rolling("Close", 20)
+    features.rolling("Close", 20, "std")
+    features.rsi(14)
+    features.adx(14)
+    features.rolling(features.atr(14), 20)
+    features.rolling("Volume", 20)
+
+
+# Strategy -> function requesting, from a FeatureStore, the features its signal reads
+# whatever the parameters; they are computed in the parent and shared with the workers
+SHARED_FEATURES = {
+    "micro_pullback": None,  # every window it uses is a parameter
+    "ema": _ema_features,
+    "stochastic_bollinger": _stochastic_bollinger_features,
+}
+# Strategy -> parameters its signal function accepts but that do not change the signal
+IGNORED_PARAMS = {"micro_pullback": ("atr_window",)}
+
+
+def prepare_bars(bars):
+    """
+    Parameter-independent preprocessing the backtests apply to raw IB bars.
+
+    Returns:
+        pd.DataFrame: Copy of ``bars`` with float 'Volume', 'DateTime' and 'VWAP'.
+    """
+    df = bars.copy()
+    df["Volume"] = df["Volume"].astype(float)
+    df["DateTime"] = pd.to_datetime(
+        df["Date"].astype(str).str.replace(" US/Eastern", "", regex=False)
+    )
+    return compute_session_vwap(df)
+
+
+def check_params(strategy, names):
+    """
+    Validate the parameter names of a grid or search space for ``strategy``.
+
+    Args:
+        strategy (str): Key of ``STRATEGIES``.
+        names (iterable): Parameter names.
+
+    Raises:
+        ValueError: If the strategy is unknown or a parameter does not change its
+            signal (``IGNORED_PARAMS``); sweeping one only repeats the same combos.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    ignored = [name for name in names if name in IGNORED_PARAMS.get(strategy, ())]
+    if ignored:
+        raise ValueError(f"{strategy} ignores parameters {ignored}")
+
+
+def load_units(selected_stocks, client, duration="5 D", candle_size="1 min"):
+    """
+    Fetch and prepare the bars of every (date, ticker) in ``selected_stocks``.
+
+    Args:
+        selected_stocks (dict): Date (YYYYMMDD) to tickers, as passed to ``backtest()``.
+        client: Object with ``fetch_frames``, e.g. ``BarCache`` or ``AsyncHistClient``.
+        duration (str, optional): History requested per date. Defaults to "5 D".
+        candle_size (str, optional): Bar size. Defaults to "1 min".
+
+    Returns:
+        dict: (date, ticker) to prepared bars; units without data are left out.
+    """
+    units = {}
+    for date, tickers in selected_stocks.items():
+        frames = client.fetch_frames(
+            tickers, date + " 22:05:00 US/Eastern", duration, candle_size
+        )
+        for ticker in tickers:
+            bars = frames.get(ticker)
+            if bars is not None and not bars.empty:
+                units[date, ticker] = prepare_bars(bars)
+    return units
+
+
+class SharedBars:
+    """
+    Prepared bars of many units in one shared memory block.
+
+    The block holds a (columns x rows) float64 array of ``SHARED_COLUMNS`` and then of
+    the shared features for all units back to back, followed by the int64 'DateTime'
+    stamps; ``spec`` is the small picklable description another process needs to
+    attach to it, including the ``FeatureStore`` key of every shared feature.
+    """
+
+    def __init__(self, shm, spec, owner):
+        self._shm = shm
+        self.spec = spec
+        self._owner = owner
+        total = spec["offsets"][-1]
+        n_columns = len(SHARED_COLUMNS) + len(spec["features"])
+        self.values = np.ndarray((n_columns, total), dtype=np.float64, buffer=shm.buf)
+        self.stamps = np.ndarray(
+            (total,), dtype=np.int64, buffer=shm.buf, offset=self.values.nbytes
+        )
+
+    @classmethod
+    def create(cls, units, shared_features=None):
+        """
+        Copy prepared unit frames (see ``prepare_bars``) into a new shared block.
+
+        Args:
+            units (dict): Unit key to prepared bars.
+            shared_features (callable, optional): ``shared_features(store)`` requests
+                the features to share from a ``FeatureStore`` on a unit's bars, as in
+                ``SHARED_FEATURES``. Defaults to None, which shares the bars only.
+        """
+        keys = list(units)
+        offsets = np.cumsum([0] + [len(units[key]) for key in keys]).tolist()
+        computed = {}
+        if shared_features is not None and keys:
+            computed[0] = _feature_values(units[keys[0]], shared_features)
+        feature_keys = list(computed[0]) if computed else []
+        n_columns = len(SHARED_COLUMNS) + len(feature_keys)
+        size = max(offsets[-1] * (n_columns + 1) * 8, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        spec = {
+            "name": shm.name,
+            "keys": keys,
+            "offsets": offsets,
+            "features": feature_keys,
+        }
+        shared = cls(shm, spec, True)
+        for i, key in enumerate(keys):
+            df = units[key]
+            rows = slice(offsets[i], offsets[i + 1])
+            for j, column in enumerate(SHARED_COLUMNS):
+                shared.values[j, rows] = df[column].to_numpy(dtype=np.float64)
+            if feature_keys:
+                values = computed.pop(i, None) or _feature_values(df, shared_features)
+                for j, feature_key in enumerate(feature_keys, len(SHARED_COLUMNS)):
+                    shared.values[j, rows] = values[feature_key]
+            shared.stamps[rows] = (
+                df["DateTime"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            )
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        """Attach to a block created in another process."""
+        return cls(shared_memory.SharedMemory(name=spec["name"]), spec, False)
+
+    @property
+    def keys(self):
+        return self.spec["keys"]
+
+    def frame(self, i):
+        """Bars of unit ``i`` as a DataFrame built on views into the block."""
+        rows = slice(self.spec["offsets"][i], self.spec["offsets"][i + 1])
+        data = {column: self.values[j, rows] for j, column in enumerate(SHARED_COLUMNS)}
+        data["DateTime"] = self.stamps[rows].view("datetime64[ns]")
+        return pd.DataFrame(data, copy=False)
+
+    def feature_store(self, i, df):
+        """
+        A new ``FeatureStore`` on unit ``i``'s frame ``df`` (from ``frame``), seeded
+        with views of the unit's shared features.
+        """
+        rows = slice(self.spec["offsets"][i], self.spec["offsets"][i + 1])
+        features = FeatureStore(df)
+        for j, key in enumerate(self.spec["features"], len(SHARED_COLUMNS)):
+            features.seed(
+                key, pd.Series(self.values[j, rows], index=df.index, copy=False)
+            )
+        return features
+
+    def close(self):
+        """Detach, and free the block if this process created it."""
+        self.values = self.stamps = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _feature_values(df, shared_features):
+    """FeatureStore key -> float64 values of the features ``shared_features`` requests."""
+    features = FeatureStore(df)
+    shared_features(features)
+    return {
+        key: feature.to_numpy(dtype=np.float64)
+        for key, feature in features.entries().items()
+    }
+
+
+def expand_grid(grid):
+    """
+    Every combination of a parameter grid.
+
+    Args:
+        grid (dict): Parameter name to a list of values.
+
+    Returns:
+        list: One dict per combination, varying the last parameter fastest.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def score_transactions(transactions):
+    """
+    ``TradeAnalyzer`` metrics of one combo's transactions.
+
+    Returns:
+        dict: 'trades' (closed round trips), 'win_rate' and 'avg_return' (percent),
+            'total_profit'.
+    """
+    analyzer = TradeAnalyzer(transactions, data=None)
+    return {
+        "trades": len(analyzer.trades),
+        "win_rate": analyzer.calculate_win_rate()["overall_win_rate"],
+        "avg_return": analyzer.calculate_average_trade_return()["overall_avg_return"],
+        "total_profit": analyzer.calculate_total_profit(),
+    }
+
+
+# Per-worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(spec, strategy, keep_features=False):
+    _worker.update(
+        shared=SharedBars.attach(spec),
+        strategy=strategy,
+        frames={},
+        stores={} if keep_features else None,
+    )
+
+
+def _unit(i):
+    """
+    Frame of unit ``i``, built on the shared block once per worker, and its feature
+    store: a new one holding only the shared features, or with ``keep_features`` the
+    worker's store for the unit, holding every feature computed on it so far.
+    """
+    frames, stores = _worker["frames"], _worker["stores"]
+    if i not in frames:
+        frames[i] = _worker["shared"].frame(i)
+    if stores is None:
+        return frames[i], _worker["shared"].feature_store(i, frames[i])
+    if i not in stores:
+        stores[i] = _worker["shared"].feature_store(i, frames[i])
+    return frames[i], stores[i]
+
+
+def combo_transactions(params, unit_ids=None):
+    """
+    Trade one parameter combo in a worker.
+
+    Args:
+        params (dict): Signal parameters plus optional ``EXIT_PARAMS``.
+        unit_ids (list, optional): Indices of the units to use. Defaults to all units.
+
+    Returns:
+        dict: Unit index to its ``(timestamp, action, ticker, price, entry_type)``
+            transactions, the layout ``TradeAnalyzer`` consumes.
+    """
+    signal, column = STRATEGIES[_worker["strategy"]]
+    exit_rule = {**DEFAULT_EXIT, **{k: params[k] for k in EXIT_PARAMS if k in params}}
+    signal_params = {k: v for k, v in params.items() if k not in EXIT_PARAMS}
+    if unit_ids is None:
+        unit_ids = range(len(_worker["shared"].keys))
+
+    transactions = {}
+    for i in unit_ids:
+        df, features = _unit(i)
+        flags = signal(df, features=features, **signal_params)[column]
+        trades = simulate(
+            df["Close"],
+            {column: flags.reindex(df.index, fill_value=False)},
+            {column: (exit_rule["stop_loss_pct"], exit_rule["target_pct"])},
+        )
+        ticker = _worker["shared"].keys[i][1]
+        stamps = df["DateTime"].to_numpy()
+        transactions[i] = []
+        for entry, exit, kind, entry_price, exit_price in trades.rows():
+            transactions[i].append((stamps[entry], "BUY", ticker, entry_price, kind))
+            if exit is not None:
+                transactions[i].append((stamps[exit], "SELL", ticker, exit_price, kind))
+    return transactions
+
+
+def run_combo(params, unit_ids=None):
+    """
+    Trade one parameter combo in a worker and score it.
+
+    Returns:
+        dict: ``params`` followed by the ``score_transactions`` metrics.
+    """
+    return {**params, **score_transactions(combo_transactions(params, unit_ids))}
+
+
+def _run_chunk(combos):
+    return [run_combo(params) for params in combos]
+
+
+@contextmanager
+def worker_pool(units, strategy, processes=None, keep_features=False):
+    """
+    Workers attached to the shared bars of ``units``, for several rounds of tasks.
+
+    Yields a ``map(func, tasks)`` function returning a list. ``func`` runs in a worker,
+    so it can call ``combo_transactions`` / ``run_combo``; it must be a module-level
+    function so the pool can pickle it.
+
+    Args:
+        units (dict): (date, ticker) to prepared bars; worker unit indices follow its order.
+        strategy (str): Key of ``STRATEGIES``.
+        processes (int, optional): Worker processes; 1 runs in this process. Defaults to
+            the CPU count.
+        keep_features (bool, optional): Keep each unit's feature store in the worker
+            across tasks instead of starting every combo from the shared features.
+            Worth it when tasks repeat (unit, combo) pairs; memory grows with the
+            distinct parameter values run. Defaults to False.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}")
+    processes = processes or os.cpu_count() or 1
+    with SharedBars.create(units, SHARED_FEATURES[strategy]) as shared:
+        if processes == 1:
+            _init_worker(shared.spec, strategy, keep_features)
+            try:
+                yield lambda func, tasks: [func(task) for task in tasks]
+            finally:
+                attached = _worker.pop("shared")
+                _worker.clear()
+                attached.close()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_worker,
+                initargs=(shared.spec, strategy, keep_features),
+            ) as pool:
+                yield lambda func, tasks: list(pool.map(func, tasks))
+
+
+def run_pool(units, strategy, func, tasks, processes=None, keep_features=False):
+    """
+    Map ``func`` over ``tasks`` once in a ``worker_pool``.
+
+    Returns:
+        list: ``func(task)`` for every task, in order.
+    """
+    with worker_pool(units, strategy, processes, keep_features) as map_tasks:
+        return map_tasks(func, tasks)
+
+
+def rank(results, rank_by="avg_return", min_trades=1):
+    """Sort metric rows best first; rows with fewer than ``min_trades`` trades go last."""
+    results = pd.DataFrame(results)
+    eligible = results["trades"] >= min_trades
+    return (
+        results.assign(_eligible=eligible)
+        .sort_values(["_eligible", rank_by], ascending=False, kind="stable")
+        .drop(columns="_eligible")
+        .reset_index(drop=True)
+    )
+
+
+def sweep(
+    strategy,
+    grid,
+    units,
+    processes=None,
+    chunksize=None,
+    rank_by="avg_return",
+    min_trades=1,
+):
+    """
+    Evaluate every combination of ``grid`` for one strategy over a process pool.
+
+    Args:
+        strategy (str): Key of ``STRATEGIES``.
+        grid (dict): Parameter name to candidate values. Keys in ``EXIT_PARAMS`` set the
+            stop loss / target percentages; the rest are passed to the signal function.
+        units (dict): (date, ticker) to prepared bars, e.g. from ``load_units``.
+        processes (int, optional): Worker processes; 1 runs in this process. Defaults to
+            the CPU count.
+        chunksize (int, optional): Combos per task. Defaults to an even split into about
+            four tasks per worker.
+        rank_by (str, optional): Metric to sort by, descending. Defaults to "avg_return".
+        min_trades (int, optional): Combos with fewer closed trades rank last. Defaults to 1.
+
+    Raises:
+        ValueError: If ``check_params`` rejects the grid.
+
+    Returns:
+        pd.DataFrame: One row per combo (parameters, then metrics), best first.
+    """
+    check_params(strategy, grid)
+    combos = expand_grid(grid)
+    processes = processes or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, -(-len(combos) // (4 * processes)))
+    chunks = [combos[i : i + chunksize] for i in range(0, len(combos), chunksize)]
+    rows = run_pool(units, strategy, _run_chunk, chunks, processes)
+    return rank([row for chunk in rows for row in chunk], rank_by, min_trades)
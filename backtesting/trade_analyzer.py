@@ -1,15 +1,305 @@
-from collections import defaultdict
-from datetime import datetime
-
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from backtesting.downsample import (
+    bucket_starts,
+    lttb_indices,
+    minmax_indices,
+    ohlc_buckets,
+)
+from indicators.ema import ema_bank
+
+TRADE_COLUMNS = [
+    "reqId",
+    "ticker",
+    "entry_type",
+    "entry_date",
+    "exit_date",
+    "entry_time",
+    "exit_time",
+    "entry_price",
+    "exit_price",
+    "return",
+]
+
+# Price lines of plot_trades: (column, name, line style)
+CHART_LINES = (
+    ("VWAP", "VWAP", dict(color="blue")),
+    ("EMA_3", "EMA 3", dict(color="purple", dash="solid")),
+    ("EMA_5", "EMA 5", dict(color="green", dash="dot")),
+    ("EMA_10", "EMA 10", dict(color="orange", dash="dash")),
+)
+LINE_DOWNSAMPLING = {
+    "minmax": lambda x, y, starts: minmax_indices(y, starts),
+    "lttb": lttb_indices,
+}
+
+
+def _timestamps(dates):
+    """
+    Transaction dates (IB 'YYYYMMDD HH:MM:SS tz' strings or datetimes) as datetime64.
+
+    Each distinct date is parsed once; trades of many tickers share their bar times.
+    """
+    codes, uniques = pd.factorize(np.asarray(dates, dtype=object))
+    if len(uniques) and isinstance(uniques[0], str):
+        parsed = pd.to_datetime(
+            np.asarray(uniques, dtype="U17"), format="%Y%m%d %H:%M:%S", errors="coerce"
+        )
+    else:
+        parsed = pd.to_datetime(uniques)
+    stamps = parsed.to_numpy().astype("datetime64[ns]")[codes]
+    stamps[codes < 0] = np.datetime64("NaT")
+    return stamps
+
+
+def _bar_times(df):
+    """Bar times of a data frame as datetime64[ns], from 'DateTime' or the IB 'Date'."""
+    if "DateTime" in df.columns:
+        return df["DateTime"].to_numpy(dtype="datetime64[ns]")
+    return _timestamps(df["Date"].to_numpy())
+
+
+def _bar_index(df):
+    """
+    Sorted-time index of a data frame's bars.
+
+    Returns:
+        tuple: The bar times in ascending order (unparseable ones, NaT, last) and the
+            stable argsort that puts the frame's rows in that order.
+    """
+    stamps = _bar_times(df)
+    order = np.argsort(stamps, kind="stable")
+    return stamps[order], order
+
+
+def _find(stamps, times):
+    """
+    Exact lookup of ``times`` in sorted bar times.
+
+    Returns:
+        tuple: Each time's position in ``stamps`` (the first of equal bars) and
+            whether a bar at exactly that time exists.
+    """
+    positions = np.searchsorted(stamps, times)
+    last = len(stamps) - 1
+    if last < 0:
+        return positions, np.zeros(len(positions), dtype=bool)
+    found = (positions <= last) & (stamps[np.minimum(positions, last)] == times)
+    return positions, found
+
+
+def _nearest(stamps, times):
+    """
+    Position in sorted, non-empty bar times ``stamps`` of the bar nearest each time.
+
+    A time halfway between two bars goes to the earlier one.
+    """
+    right = np.minimum(np.searchsorted(stamps, times), len(stamps) - 1)
+    left = np.maximum(right - 1, 0)
+    earlier = np.abs(times - stamps[left]) <= np.abs(stamps[right] - times)
+    return np.where(earlier, left, right)
+
+
+def _failure_reasons(bars, buy_prices):
+    """
+    Comma-separated failed entry conditions of losing trades at their exit bars.
+
+    Conditions on columns ``bars`` does not have are skipped.
+
+    Args:
+        bars (pd.DataFrame): One exit bar per trade.
+        buy_prices (np.ndarray): The trades' entry prices.
+
+    Returns:
+        np.ndarray: One (possibly empty) reason string per trade.
+    """
+    columns = bars.columns
+    conditions = []
+    if "RelativeVolume" in columns:
+        failed = bars["RelativeVolume"].to_numpy(dtype=np.float64) < 1
+        conditions.append(("Low Relative Volume", failed))
+    if "Momentum" in columns:
+        conditions.append(("Weak Momentum", ~bars["Momentum"].to_numpy(dtype=bool)))
+    if "PullbackAboveVWAP" in columns:
+        failed = bars["PullbackAboveVWAP"].eq(False).to_numpy(dtype=bool)
+        conditions.append(("Pullback Below VWAP", failed))
+    if "Extended" in columns:
+        failed = bars["Extended"].to_numpy(dtype=bool)
+        conditions.append(("Stock Too Extended Above VWAP", failed))
+    if "VWAP" in columns:
+        failed = bars["VWAP"].to_numpy(dtype=np.float64) > buy_prices
+        conditions.append(("Entered Below VWAP", failed))
+
+    reasons = np.empty(len(bars), dtype=object)
+    reasons[:] = ""
+    for name, failed in conditions:
+        reasons[failed] += name + ", "
+    return pd.Series(reasons, dtype=object).str[:-2].to_numpy()
+
+
+def _price(df, column):
+    """A price column as float64 with gaps forward-filled; Close when it is missing."""
+    if column not in df.columns:
+        column = "Close"
+    return df[column].astype(np.float64).ffill().to_numpy()
+
+
+def _chart_view(df, keep, max_points, method, lo=0, hi=None):
+    """
+    Trace data of bars ``[lo, hi)`` of a time-sorted chart frame.
+
+    Args:
+        df (pd.DataFrame): Bars with 'Date' as datetime64, OHLCV, the ``CHART_LINES``
+            columns and 'RelativeVolume'.
+        keep (np.ndarray): Positions in ``df`` of bars never merged into a bucket.
+        max_points (int): Buckets in the view; None or a view that fits keeps every
+            bar.
+        method (str): Key of ``LINE_DOWNSAMPLING``.
+        lo (int, optional): First bar of the view. Defaults to 0.
+        hi (int, optional): End of the view. Defaults to the last bar.
+
+    Returns:
+        dict: 'x', 'open', 'high', 'low', 'close', 'volume' and 'colors' of the
+            candles and volume bars, and 'lines', column to (x, y) of every line.
+    """
+    frame = df.iloc[lo:hi]
+    x = frame["Date"].to_numpy()
+    bars = [
+        frame[column].to_numpy(dtype=np.float64)
+        for column in ("Open", "High", "Low", "Close", "Volume")
+    ]
+    columns = [column for column, _, _ in CHART_LINES] + ["RelativeVolume"]
+    if max_points is None or len(frame) <= max_points:
+        lines = {column: (x, frame[column].to_numpy()) for column in columns}
+    else:
+        keep = keep[(keep >= lo) & (keep < lo + len(frame))] - lo
+        starts = bucket_starts(len(frame), max_points, keep)
+        select = LINE_DOWNSAMPLING[method]
+        lines = {}
+        for column in columns:
+            y = frame[column].to_numpy(dtype=np.float64)
+            points = select(x, y, starts)
+            lines[column] = (x[points], y[points])
+        x, bars = x[starts], ohlc_buckets(*bars, starts)
+    open_, high, low, close, volume = bars
+    return {
+        "x": x,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+        "colors": np.where(open_ - close >= 0, "green", "red"),
+        "lines": lines,
+    }
+
+
+def _show_bars(fig, view):
+    """Set the bar traces of a ``plot_trades`` figure (all but the markers) to a view."""
+    candles, *price_lines, volume, relative_volume = fig.data[: len(CHART_LINES) + 3]
+    candles.update(
+        x=view["x"],
+        open=view["open"],
+        high=view["high"],
+        low=view["low"],
+        close=view["close"],
+    )
+    for trace, (column, _, _) in zip(price_lines, CHART_LINES):
+        trace.update(x=view["lines"][column][0], y=view["lines"][column][1])
+    volume.update(x=view["x"], y=view["volume"], marker_color=view["colors"])
+    x, y = view["lines"]["RelativeVolume"]
+    relative_volume.update(x=x, y=y)
+
+
+def _follow_zoom(fig, df, keep, max_points, method):
+    """Downsample the visible bars of a ``plot_trades`` widget again on every zoom."""
+    stamps = df["Date"].to_numpy()
+
+    def reload(xaxis, x_range):
+        lo, hi = 0, len(stamps)
+        if x_range is not None:
+            start, end = (pd.Timestamp(value).to_datetime64() for value in x_range)
+            # One bar beyond each edge so the lines run to the border
+            lo = max(np.searchsorted(stamps, start) - 1, 0)
+            hi = min(np.searchsorted(stamps, end, side="right") + 1, len(stamps))
+        with fig.batch_update():
+            _show_bars(fig, _chart_view(df, keep, max_points, method, lo, hi))
+
+    fig.layout.xaxis.on_change(reload, "range")
+
+
+def round_trips(transactions):
+    """
+    Columnar table of the round trips in a transactions dict.
+
+    Within each reqId, transactions ``i`` and ``i + 1`` for even ``i`` form a round
+    trip when they are a BUY followed by a SELL; anything else (e.g. a trailing BUY
+    still open) is ignored.
+
+    Args:
+        transactions (dict): reqId to lists of (date, action, ticker, price,
+            entry_type) tuples.
+
+    Returns:
+        pd.DataFrame: One row per round trip, in reqId then transaction order, with
+            the ``TRADE_COLUMNS``: the raw dates, their parsed times, the prices and
+            the return as a fraction of the entry price.
+    """
+    keys = list(transactions)
+    lengths = np.array([len(transactions[key]) for key in keys], dtype=np.int64)
+    columns = ([], [], [], [], [])  # date, action, ticker, price, entry type
+    for key in keys:
+        for column, values in zip(columns, zip(*transactions[key])):
+            column.extend(values)
+    if not columns[0]:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    dates, actions, tickers, prices, entry_types = (
+        np.array(column, dtype=object) for column in columns
+    )
+    ends = np.cumsum(lengths)
+    owner = np.repeat(np.arange(len(keys)), lengths)
+    position = np.arange(len(dates)) - (ends - lengths)[owner]
+    entries = np.flatnonzero(
+        (position % 2 == 0)
+        & (position + 1 < lengths[owner])
+        & (actions == "BUY")
+        & np.r_[actions[1:] == "SELL", False]
+    )
+    exits = entries + 1
+
+    prices = prices.astype(np.float64)
+    reqids = np.empty(len(keys), dtype=object)
+    reqids[:] = keys
+    times = _timestamps(np.r_[dates[entries], dates[exits]])
+    entry_price, exit_price = prices[entries], prices[exits]
+    return pd.DataFrame(
+        {
+            "reqId": reqids[owner[entries]],
+            "ticker": tickers[entries],
+            "entry_type": entry_types[entries],
+            "entry_date": dates[entries],
+            "exit_date": dates[exits],
+            "entry_time": times[: len(entries)],
+            "exit_time": times[len(entries) :],
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "return": (exit_price - entry_price) / entry_price,
+        },
+        columns=TRADE_COLUMNS,
+    )
+
 
 class TradeAnalyzer:
     """
     TradeAnalyzer class for analyzing trade performance and generating insights.
+
+    The transactions are paired into one round-trip table (``trades``, see
+    ``round_trips``) when the analyzer is built, and every metric is a vectorized
+    reduction or groupby over it.
     """
 
     def __init__(self, transactions, data):
@@ -24,6 +314,12 @@ class TradeAnalyzer:
         """
         self.transactions = transactions
         self.data = data
+        self.trades = round_trips(transactions)
+        self._indexes = {}
+        self._located = None
+
+    def _by_entry_type(self, values):
+        return values.groupby(self.trades["entry_type"], sort=False, dropna=False)
 
     def calculate_profit_by_entry_type(self):
         """
@@ -32,36 +328,8 @@ class TradeAnalyzer:
         Returns:
             dict: A dictionary where keys are entry types and values are the profit percentages.
         """
-        entry_type_profits = {}
-        entry_type_counts = {}
-
-        for reqId, transactions_list in self.transactions.items():
-            for i in range(
-                0, len(transactions_list), 2
-            ):  # Pair BUY and SELL transactions
-                if (
-                    i + 1 < len(transactions_list)
-                    and transactions_list[i][1] == "BUY"
-                    and transactions_list[i + 1][1] == "SELL"
-                ):
-                    buy_price = transactions_list[i][3]
-                    sell_price = transactions_list[i + 1][3]
-                    entry_type = transactions_list[i][4]
-
-                    profit_pct = ((sell_price - buy_price) / buy_price) * 100
-
-                    if entry_type not in entry_type_profits:
-                        entry_type_profits[entry_type] = 0
-                        entry_type_counts[entry_type] = 0
-
-                    entry_type_profits[entry_type] += profit_pct
-                    entry_type_counts[entry_type] += 1
-
-        # Calculate average profit percentage for each entry type
-        for entry_type in entry_type_profits:
-            entry_type_profits[entry_type] /= entry_type_counts[entry_type]
-
-        return entry_type_profits
+        profit_pct = self.trades["return"] * 100
+        return self._by_entry_type(profit_pct).mean().to_dict()
 
     def calculate_win_rate(self):
         """
@@ -70,44 +338,9 @@ class TradeAnalyzer:
         Returns:
             dict: A dictionary containing the win rate for each strategy and the overall win rate.
         """
-        strategy_wins = {}
-        strategy_total_trades = {}
-        overall_wins = 0
-        overall_total_trades = 0
-
-        for reqId, transactions_list in self.transactions.items():
-            for i in range(
-                0, len(transactions_list), 2
-            ):  # Pair BUY and SELL transactions
-                if (
-                    i + 1 < len(transactions_list)
-                    and transactions_list[i][1] == "BUY"
-                    and transactions_list[i + 1][1] == "SELL"
-                ):
-                    buy_price = transactions_list[i][3]
-                    sell_price = transactions_list[i + 1][3]
-                    strategy = transactions_list[i][4]
-                    overall_total_trades += 1
-
-                    if strategy not in strategy_wins:
-                        strategy_wins[strategy] = 0
-                        strategy_total_trades[strategy] = 0
-
-                    strategy_total_trades[strategy] += 1
-                    if sell_price > buy_price:  # Check if the trade was profitable
-                        strategy_wins[strategy] += 1
-                        overall_wins += 1
-
-        # Calculate win rates
-        strategy_win_rates = {
-            strategy: (strategy_wins[strategy] / strategy_total_trades[strategy]) * 100
-            for strategy in strategy_wins
-        }
-        overall_win_rate = (
-            (overall_wins / overall_total_trades) * 100
-            if overall_total_trades > 0
-            else 0
-        )
+        wins = self.trades["exit_price"] > self.trades["entry_price"]
+        strategy_win_rates = (self._by_entry_type(wins).mean() * 100).to_dict()
+        overall_win_rate = wins.mean() * 100 if len(wins) > 0 else 0
 
         return {
             "strategy_win_rates": strategy_win_rates,
@@ -121,20 +354,7 @@ class TradeAnalyzer:
         Returns:
             float: The total profit.
         """
-        total_profit = 0
-        for reqId, transactions_list in self.transactions.items():
-            for i in range(
-                0, len(transactions_list), 2
-            ):  # Pair BUY and SELL transactions
-                if (
-                    i + 1 < len(transactions_list)
-                    and transactions_list[i][1] == "BUY"
-                    and transactions_list[i + 1][1] == "SELL"
-                ):
-                    buy_price = transactions_list[i][3]
-                    sell_price = transactions_list[i + 1][3]
-                    total_profit += sell_price - buy_price
-        return total_profit
+        return float((self.trades["exit_price"] - self.trades["entry_price"]).sum())
 
     def calculate_average_trade_return(self):
         """
@@ -143,55 +363,198 @@ class TradeAnalyzer:
         Returns:
             dict: A dictionary containing the average return per trade for each strategy and overall.
         """
-        strategy_returns = {}
-        strategy_trade_counts = {}
-        overall_return = 0
-        overall_trades = 0
-
-        for reqId, transactions_list in self.transactions.items():
-            for i in range(
-                0, len(transactions_list), 2
-            ):  # Pair BUY and SELL transactions
-                if (
-                    i + 1 < len(transactions_list)
-                    and transactions_list[i][1] == "BUY"
-                    and transactions_list[i + 1][1] == "SELL"
-                ):
-                    buy_price = transactions_list[i][3]
-                    sell_price = transactions_list[i + 1][3]
-                    strategy = transactions_list[i][4]
-
-                    trade_return = (sell_price - buy_price) / buy_price
-
-                    if strategy not in strategy_returns:
-                        strategy_returns[strategy] = 0
-                        strategy_trade_counts[strategy] = 0
-
-                    strategy_returns[strategy] += trade_return
-                    strategy_trade_counts[strategy] += 1
-                    overall_return += trade_return
-                    overall_trades += 1
-
-        # Calculate average return per trade for each strategy
-        strategy_avg_returns = {
-            strategy: (strategy_returns[strategy] / strategy_trade_counts[strategy])
-            * 100
-            for strategy in strategy_returns
+        returns = self.trades["return"]
+        strategy_avg_returns = (self._by_entry_type(returns).mean() * 100).to_dict()
+        overall_avg_return = returns.mean() * 100 if len(returns) > 0 else 0
+
+        return {
+            "strategy_avg_returns": strategy_avg_returns,
+            "overall_avg_return": overall_avg_return,
         }
 
-        # Calculate overall average return per trade
-        overall_avg_return = (
-            (overall_return / overall_trades) * 100 if overall_trades > 0 else 0
+    def _bar_index(self, reqId):
+        """``_bar_index`` of the reqId's frame in ``data``, built once and shared."""
+        if reqId not in self._indexes:
+            self._indexes[reqId] = _bar_index(self.data[reqId])
+        return self._indexes[reqId]
+
+    def _located_trades(self):
+        """
+        Trades whose entry and exit times are bars of their reqId's frame in ``data``.
+
+        Both ends of all of a frame's trades are found in its shared bar index (see
+        ``_bar_index``) with one ``searchsorted`` each. Computed on first use.
+
+        Returns:
+            list: Per frame, a tuple of the trades' row positions in ``trades``, their
+                entry and exit bar positions, and the frame's sorted bar times, closes,
+                highs and lows.
+        """
+        if self._located is not None:
+            return self._located
+        self._located = []
+        if not self.data or self.trades.empty:
+            return self._located
+
+        entry_times = self.trades["entry_time"].to_numpy(dtype="datetime64[ns]")
+        exit_times = self.trades["exit_time"].to_numpy(dtype="datetime64[ns]")
+        groups = self.trades.groupby("reqId", sort=False).indices
+        for reqId, rows in groups.items():
+            df = self.data.get(reqId)
+            if df is None or df.empty:
+                continue
+            stamps, order = self._bar_index(reqId)
+            entry, entry_found = _find(stamps, entry_times[rows])
+            exit, exit_found = _find(stamps, exit_times[rows])
+            found = entry_found & exit_found
+            if found.any():
+                self._located.append(
+                    (
+                        rows[found],
+                        entry[found],
+                        exit[found],
+                        stamps,
+                        _price(df, "Close")[order],
+                        _price(df, "High")[order],
+                        _price(df, "Low")[order],
+                    )
+                )
+        return self._located
+
+    def calculate_excursions(self):
+        """
+        Maximum adverse and favorable excursion of every trade.
+
+        The excursions cover the bars after the entry bar up to and including the exit
+        bar. They use those bars' lows and highs, or their closes when a frame has no
+        'Low'/'High'.
+
+        Returns:
+            pd.DataFrame: ``trades`` with 'bars_held', 'mae' (lowest low over the entry
+                price minus 1, at most 0) and 'mfe' (highest high over the entry price
+                minus 1, at least 0). These are NaN for trades whose entry or exit is
+                not a bar of their reqId's frame in ``data``.
+        """
+        bars_held = np.full(len(self.trades), np.nan)
+        mae = np.full(len(self.trades), np.nan)
+        mfe = np.full(len(self.trades), np.nan)
+        entry_prices = self.trades["entry_price"].to_numpy()
+        for rows, entry, exit, _, _, high, low in self._located_trades():
+            # [entry + 1, exit + 1) of every trade as one interleaved reduceat; the
+            # trailing NaN lets a slice end at the last bar
+            bounds = np.column_stack([entry + 1, exit + 1]).ravel()
+            held = exit > entry
+            lowest = np.fmin.reduceat(np.r_[low, np.nan], bounds)[::2]
+            highest = np.fmax.reduceat(np.r_[high, np.nan], bounds)[::2]
+            price = entry_prices[rows]
+            bars_held[rows] = exit - entry
+            mae[rows] = np.where(held, np.minimum(lowest / price - 1, 0), 0.0)
+            mfe[rows] = np.where(held, np.maximum(highest / price - 1, 0), 0.0)
+        return self.trades.assign(bars_held=bars_held, mae=mae, mfe=mfe)
+
+    def calculate_equity_curve(self, capital=100_000.0, position_size=10_000.0):
+        """
+        Equity with every open position marked to market on each bar.
+
+        Each trade buys ``position_size`` worth of shares at its entry price. Trades
+        whose bars are found in ``data`` are marked at every close between entry and
+        exit. The others only add their realized profit at the exit time.
+
+        Args:
+            capital (float, optional): Starting equity. Defaults to 100,000.
+            position_size (float, optional): Amount invested per trade. Defaults to
+                10,000.
+
+        Returns:
+            pd.Series: Equity indexed by bar time, ascending.
+        """
+        entry_prices = self.trades["entry_price"].to_numpy()
+        exit_prices = self.trades["exit_price"].to_numpy()
+        times, changes = [], []
+        marked = np.zeros(len(self.trades), dtype=bool)
+        for rows, entry, exit, stamps, close, _, _ in self._located_trades():
+            marked[rows] = True
+            shares = position_size / entry_prices[rows]
+            # Shares held over each bar's close-to-close move: (entry, exit]
+            held = np.zeros(len(stamps) + 1)
+            np.add.at(held, entry + 1, shares)
+            np.add.at(held, exit + 1, -shares)
+            moves = np.nan_to_num(np.diff(close, prepend=close[0]))
+            change = np.cumsum(held)[:-1] * moves
+            # Fills away from the bar's close
+            np.add.at(change, entry, shares * (close[entry] - entry_prices[rows]))
+            np.add.at(change, exit, shares * (exit_prices[rows] - close[exit]))
+            times.append(stamps)
+            changes.append(change)
+
+        realized = ~marked
+        times.append(
+            self.trades["exit_time"].to_numpy(dtype="datetime64[ns]")[realized]
+        )
+        changes.append(position_size * self.trades["return"].to_numpy()[realized])
+
+        stamps, slot = np.unique(np.concatenate(times), return_inverse=True)
+        profit = np.bincount(
+            slot, weights=np.concatenate(changes), minlength=len(stamps)
+        )
+        return pd.Series(
+            capital + np.cumsum(profit), index=pd.DatetimeIndex(stamps), name="equity"
+        )
+
+    def calculate_risk_metrics(
+        self, capital=100_000.0, position_size=10_000.0, periods_per_year=252
+    ):
+        """
+        Drawdown and risk-adjusted return of the marked-to-market equity curve.
+
+        Sharpe and Sortino ratios are computed from daily returns (each day's last
+        equity against the previous day's, the first day against ``capital``) with a
+        zero risk-free rate.
+
+        Args:
+            capital (float, optional): Starting equity. Defaults to 100,000.
+            position_size (float, optional): Amount invested per trade. Defaults to
+                10,000.
+            periods_per_year (int, optional): Trading days per year used to annualize.
+                Defaults to 252.
+
+        Returns:
+            dict: 'final_equity', 'total_return', 'max_drawdown' (fraction below the
+                running peak, at most 0), 'sharpe', 'sortino' and 'drawdown' (the
+                drawdown series on the equity curve's bars).
+        """
+        equity = self.calculate_equity_curve(capital, position_size)
+        values = equity.to_numpy()
+        peak = np.maximum.accumulate(np.r_[capital, values])[1:]
+        drawdown = pd.Series(values / peak - 1, index=equity.index, name="drawdown")
+
+        levels = np.r_[capital, equity.resample("D").last().dropna().to_numpy()]
+        returns = levels[1:] / levels[:-1] - 1
+        scale = np.sqrt(periods_per_year)
+        std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+        downside = (
+            np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else 0.0
         )
+        mean = returns.mean() if len(returns) else 0.0
 
+        final = float(values[-1]) if len(values) else capital
         return {
-            "strategy_avg_returns": strategy_avg_returns,
-            "overall_avg_return": overall_avg_return,
+            "final_equity": final,
+            "total_return": final / capital - 1,
+            "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+            "sharpe": float(mean / std * scale) if std > 0 else np.nan,
+            "sortino": float(mean / downside * scale) if downside > 0 else np.nan,
+            "drawdown": drawdown,
         }
 
     def analyze_losing_trade_patterns(self, df_data):
         """
-        Analyze losing trades to determine why they failed.
+        Analyze losing trades (round trips of ``trades`` with a negative return) to
+        determine why they failed.
+
+        Each trade is matched to the bar at its sell time through a sorted-time index
+        of its ticker's frame. Failure conditions whose columns the frame lacks are
+        not checked.
 
         Args:
             df_data (dict): Dictionary containing historical data for each ticker.
@@ -199,65 +562,40 @@ class TradeAnalyzer:
         Returns:
             pd.DataFrame: A DataFrame showing reasons for failure.
         """
-        trade_log = defaultdict(lambda: {"buy_price": None, "sell_price": None})
-        losing_trades_analysis = []
-
-        for reqId, transactions_list in self.transactions.items():
-            for trans in transactions_list:
-                date, action, ticker, price, entry_type = trans
-                if action == "BUY":
-                    trade_log[ticker]["buy_price"] = price
-                elif action == "SELL" and trade_log[ticker]["buy_price"]:
-                    buy_price = trade_log[ticker]["buy_price"]
-                    return_pct = (price - buy_price) / buy_price
-
-                    if return_pct < 0:  # Losing trade
-                        df = df_data.get(ticker, pd.DataFrame())
-
-                        # Find the row corresponding to the buy date
-                        trade_row = df[df["Date"] == date]
-                        if trade_row.empty:
-                            continue
-
-                        trade_row = trade_row.iloc[
-                            0
-                        ]  # Get the first row if multiple exist
-
-                        # Analyze failure reasons
-                        failed_conditions = []
-
-                        if trade_row["RelativeVolume"] < 1:
-                            failed_conditions.append("Low Relative Volume")
-
-                        if not trade_row["Momentum"]:
-                            failed_conditions.append("Weak Momentum")
-
-                        if trade_row["PullbackAboveVWAP"] == False:
-                            failed_conditions.append("Pullback Below VWAP")
-
-                        if trade_row["Extended"]:
-                            failed_conditions.append("Stock Too Extended Above VWAP")
-
-                        if trade_row["VWAP"] > buy_price:
-                            failed_conditions.append("Entered Below VWAP")
-
-                        # Store analysis
-                        losing_trades_analysis.append(
-                            {
-                                "date": date,
-                                "ticker": ticker,
-                                "buy_price": buy_price,
-                                "sell_price": price,
-                                "return_pct": return_pct * 100,
-                                "failure_reasons": ", ".join(failed_conditions),
-                            }
-                        )
-
-                    # Reset trade log after trade completion
-                    trade_log[ticker]["buy_price"] = None
-
-        # Convert to DataFrame for analysis
-        df_losing_analysis = pd.DataFrame(losing_trades_analysis)
+        losers = self.trades[self.trades["return"] < 0]
+        exit_times = losers["exit_time"].to_numpy(dtype="datetime64[ns]")
+        pieces = []
+        for ticker, rows in losers.groupby("ticker", sort=False).indices.items():
+            df = df_data.get(ticker)
+            if df is None or df.empty:
+                continue
+
+            # The first bar at each sell time, all of the ticker's trades at once
+            stamps, order = _bar_index(df)
+            positions, found = _find(stamps, exit_times[rows])
+            trades = losers.iloc[rows[found]]
+            bars = df.iloc[order[positions[found]]]
+            buy_prices = trades["entry_price"].to_numpy()
+            pieces.append(
+                pd.DataFrame(
+                    {
+                        "date": trades["exit_date"],
+                        "ticker": trades["ticker"],
+                        "buy_price": buy_prices,
+                        "sell_price": trades["exit_price"],
+                        "return_pct": trades["return"] * 100,
+                        "failure_reasons": _failure_reasons(bars, buy_prices),
+                    },
+                    index=trades.index,
+                )
+            )
+
+        # Back in trade order
+        df_losing_analysis = (
+            pd.concat(pieces).sort_index().reset_index(drop=True)
+            if pieces
+            else pd.DataFrame()
+        )
 
         if df_losing_analysis.empty:
             print("No losing trades found.")
@@ -273,65 +611,107 @@ class TradeAnalyzer:
 
         return df_losing_analysis
 
-    def plot_trades(self, strategy_filter=None):
+    def _trade_markers(self, reqId, stamps, strategy_filter=None):
+        """
+        Buy and sell markers of a reqId's transactions, placed at their nearest bars.
+
+        Args:
+            reqId: Key of the transactions and their frame in ``data``.
+            stamps (np.ndarray): The frame's sorted, non-NaT bar times.
+            strategy_filter (str, optional): Only mark this entry type. Defaults to
+                None.
+
+        Returns:
+            tuple: {'Buy': (x, y, hover), 'Sell': (x, y, hover)} arrays, and the
+                transactions' ticker (``reqId`` when there are none).
+        """
+        transactions = self.transactions.get(reqId, [])
+        if not transactions:
+            empty = (np.array([], dtype=stamps.dtype), np.array([]), np.array([]))
+            return {"Buy": empty, "Sell": empty}, reqId
+
+        dates, actions, tickers, prices, entry_types = (
+            np.array(column, dtype=object) for column in zip(*transactions)
+        )
+        times = _timestamps(dates)
+        keep = ~np.isnat(times)
+        if strategy_filter:
+            keep &= entry_types == strategy_filter
+        x = stamps[_nearest(stamps, times)]
+        verbs = np.char.partition(actions.astype(str), " ")[:, 0]
+        markers = {}
+        for side, placed in (
+            ("Buy", keep & (verbs == "BUY")),
+            ("Sell", keep & (actions == "SELL")),
+        ):
+            hover = np.char.add(
+                f"{side}<br>Entry Type: ", entry_types[placed].astype(str)
+            )
+            markers[side] = (x[placed], prices[placed].astype(np.float64), hover)
+        return markers, tickers[-1]
+
+    def plot_trades(
+        self, strategy_filter=None, max_points=None, method="minmax", on_zoom=False
+    ):
         """Plot stock price using Plotly, show Buy/Sell markers, Volume, and VWAP, with Relative Volume on secondary y-axis.
 
+        With ``max_points`` set, each chart is downsampled for large data (see
+        ``backtesting.downsample``). The bars are cut into about ``max_points``
+        buckets, shared by every trace of both rows. Each bucket becomes one candle
+        and one volume bar; lines keep their lowest and highest point per bucket
+        ('minmax') or one LTTB point per bucket ('lttb') and are drawn with WebGL.
+        The bars of trade markers are never merged into a bucket.
+
         Args:
             data (dict): Dictionary of dataframes containing stock data.
             transactions (list): List of transactions (date, ticker, action, price, entry_type).
             strategy_filter (str, optional): Filter to show trades for a specific strategy type. Defaults to None.
+            max_points (int, optional): Buckets per chart; None plots every bar. Defaults to None.
+            method (str, optional): Line downsampling, 'minmax' or 'lttb'. Defaults to "minmax".
+            on_zoom (bool, optional): Return ``go.FigureWidget``s that downsample the
+                visible range again after every zoom or pan, instead of showing static
+                figures. Display them in a notebook. Defaults to False.
+
+        Raises:
+            ValueError: If ``method`` is unknown, or ``on_zoom`` is set without
+                ``max_points``.
+            ImportError: If ``on_zoom`` is set and plotly's widget dependency
+                (anywidget) is not installed.
+
+        Returns:
+            list: The figures, one per charted reqId.
         """
+        if method not in LINE_DOWNSAMPLING:
+            raise ValueError(f"unknown downsampling method: {method}")
+        if on_zoom and max_points is None:
+            raise ValueError("on_zoom requires max_points")
+
+        figures = []
         for reqId in self.data:
-            df = self.data[reqId].copy()
-            if df.empty:
+            if self.data[reqId].empty:
                 continue
 
-            # Parse date without timezone
-            df["Date"] = (
-                df["Date"].astype(str).str.extract(r"(\d{8} \d{2}:\d{2}:\d{2})")[0]
-            )
-            df["Date"] = pd.to_datetime(
-                df["Date"], format="%Y%m%d %H:%M:%S", errors="coerce"
-            )
-            df.dropna(subset=["Date"], inplace=True)
-            df.sort_values("Date", inplace=True)
+            # Bars in time order through the shared index; unparseable dates dropped
+            stamps, order = self._bar_index(reqId)
+            valid = ~np.isnat(stamps)
+            stamps, order = stamps[valid], order[valid]
+            if not len(stamps):
+                continue
+            df = self.data[reqId].iloc[order]
+            df["Date"] = stamps
 
             df["Volume"] = pd.to_numeric(df["Volume"], errors="coerce")
             df["AverageVolume"] = df["Volume"].rolling(window=80).mean()
             df["RelativeVolume"] = df["Volume"] / df["AverageVolume"]
 
             # Calculate Exponential Moving Averages (EMAs)
-            df["EMA_3"] = df["Close"].ewm(span=3, adjust=False).mean()
-            df["EMA_5"] = df["Close"].ewm(span=5, adjust=False).mean()
-            df["EMA_10"] = df["Close"].ewm(span=10, adjust=False).mean()
-
-            buy_x, buy_y, buy_hover, sell_x, sell_y, sell_hover = [], [], [], [], [], []
-            for trans in self.transactions[reqId]:
-                # Parse transaction details
-                t_date_str, action, ticker, price, entry_type = trans
-                print(trans)
-                # Apply strategy filter if provided
-                if strategy_filter and entry_type != strategy_filter:
-                    continue
-
-                try:
-                    t_date_str = " ".join(
-                        t_date_str.split(" ")[:2]
-                    )  # Remove timezone part
-                    t_date = datetime.strptime(t_date_str, "%Y%m%d %H:%M:%S")
-                    nearest_idx = (df["Date"] - t_date).abs().idxmin()
-                    x_val = df.loc[nearest_idx, "Date"]
-                    y_val = price
-                    if action.split(" ")[0] == "BUY":
-                        buy_x.append(x_val)
-                        buy_y.append(y_val)
-                        buy_hover.append(f"Buy<br>Entry Type: {entry_type}")
-                    elif action == "SELL":
-                        sell_x.append(x_val)
-                        sell_y.append(y_val)
-                        sell_hover.append(f"Sell<br>Entry Type: {entry_type}")
-                except Exception as e:
-                    print(f"Error parsing transaction {trans}: {e}")
+            df[["EMA_3", "EMA_5", "EMA_10"]] = ema_bank(
+                df["Close"].to_numpy(), (3, 5, 10)
+            )
+
+            markers, ticker = self._trade_markers(reqId, stamps, strategy_filter)
+            buy_x, buy_y, buy_hover = markers["Buy"]
+            sell_x, sell_y, sell_hover = markers["Sell"]
             print(f"Buy markers: {len(buy_x)}, Sell markers: {len(sell_x)}")
             # Create subplots
             fig = make_subplots(
@@ -342,84 +722,19 @@ class TradeAnalyzer:
                 row_heights=[0.7, 0.3],
                 specs=[[{"secondary_y": False}], [{"secondary_y": True}]],
             )
+            # WebGL lines once the chart is downsampled for large data
+            scatter = go.Scatter if max_points is None else go.Scattergl
 
             # Candlesticks
-            fig.add_trace(
-                go.Candlestick(
-                    x=df["Date"],
-                    open=df["Open"],
-                    high=df["High"],
-                    low=df["Low"],
-                    close=df["Close"],
-                    name="Price",
-                ),
-                row=1,
-                col=1,
-            )
+            fig.add_trace(go.Candlestick(name="Price"), row=1, col=1)
 
-            # VWAP line
-            fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df["VWAP"],
-                    mode="lines",
-                    name="VWAP",
-                    line=dict(color="blue"),
-                ),
-                row=1,
-                col=1,
-            )
-
-            # EMA lines
-            fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df["EMA_3"],
-                    mode="lines",
-                    name="EMA 3",
-                    line=dict(color="purple", dash="solid"),
-                ),
-                row=1,
-                col=1,
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df["EMA_5"],
-                    mode="lines",
-                    name="EMA 5",
-                    line=dict(color="green", dash="dot"),
-                ),
-                row=1,
-                col=1,
-            )
-
-            fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df["EMA_10"],
-                    mode="lines",
-                    name="EMA 10",
-                    line=dict(color="orange", dash="dash"),
-                ),
-                row=1,
-                col=1,
-            )
+            # VWAP and EMA lines
+            for column, name, line in CHART_LINES:
+                fig.add_trace(scatter(mode="lines", name=name, line=line), row=1, col=1)
 
             # Volume bars
-            colors = [
-                "green" if row["Open"] - row["Close"] >= 0 else "red"
-                for index, row in df.iterrows()
-            ]
             fig.add_trace(
-                go.Bar(
-                    x=df["Date"],
-                    y=df["Volume"],
-                    name="Volume",
-                    marker_color=colors,
-                    showlegend=False,
-                ),
+                go.Bar(name="Volume", showlegend=False),
                 row=2,
                 col=1,
                 secondary_y=False,
@@ -427,9 +742,7 @@ class TradeAnalyzer:
 
             # Relative Volume as a line on secondary y-axis
             fig.add_trace(
-                go.Scatter(
-                    x=df["Date"],
-                    y=df["RelativeVolume"],
+                scatter(
                     mode="lines",
                     name="Relative Volume",
                     line=dict(color="orange", dash="dot"),
@@ -439,10 +752,14 @@ class TradeAnalyzer:
                 secondary_y=True,
             )
 
+            # Bars of the markers are always drawn at full resolution
+            marked = np.searchsorted(stamps, np.r_[buy_x, sell_x])
+            _show_bars(fig, _chart_view(df, marked, max_points, method))
+
             # Buy markers
-            if buy_x:
+            if len(buy_x):
                 fig.add_trace(
-                    go.Scatter(
+                    scatter(
                         x=buy_x,
                         y=buy_y,
                         mode="markers",
@@ -456,9 +773,9 @@ class TradeAnalyzer:
                 )
 
             # Sell markers
-            if sell_x:
+            if len(sell_x):
                 fig.add_trace(
-                    go.Scatter(
+                    scatter(
                         x=sell_x,
                         y=sell_y,
                         mode="markers",
@@ -526,4 +843,10 @@ class TradeAnalyzer:
 
             fig.update_layout(xaxis_rangeslider_visible=False)
 
-            fig.show()
+            if on_zoom:
+                fig = go.FigureWidget(fig)
+                _follow_zoom(fig, df, marked, max_points, method)
+            else:
+                fig.show()
+            figures.append(fig)
+        return figures
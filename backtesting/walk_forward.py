@@ -0,0 +1,175 @@
+"""
+Walk-forward optimization over the ``selected_stocks`` date -> tickers layout.
+
+The selected dates are split into rolling folds of ``in_sample`` dates followed by
+``out_of_sample`` dates. Each fold sweeps the parameter grid on its in-sample
+ticker-days, keeps the best combo and trades it on the out-of-sample ones; the
+out-of-sample trades of all folds are stitched into one equity curve.
+
+Folds run in parallel on the ``backtesting.sweep`` worker pool. All bars are loaded
+once and shared with the workers, and the pool runs with ``keep_features``: a worker
+keeps the feature store of every unit it has seen, with the features of every combo
+traded on it, so a ticker-day that several overlapping folds use is fetched once and
+featurized once per worker.
+
+Only trades entered on a unit's own date are scored; the rest of its bars (the
+multi-day history fetched with it) serve as indicator warm-up, so an out-of-sample
+score never includes trades from in-sample days.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtesting.sweep import (
+    check_params,
+    combo_transactions,
+    expand_grid,
+    rank,
+    run_pool,
+    score_transactions,
+)
+
+
+def make_folds(dates, in_sample, out_of_sample=1, step=None):
+    """
+    Rolling (in-sample dates, out-of-sample dates) windows.
+
+    Args:
+        dates (list): Dates (YYYYMMDD) in any order.
+        in_sample (int): Dates per in-sample window.
+        out_of_sample (int, optional): Dates per out-of-sample window. Defaults to 1.
+        step (int, optional): Dates between fold starts. Defaults to ``out_of_sample``,
+            so the out-of-sample windows tile the dates after the first in-sample window.
+
+    Raises:
+        ValueError: If ``step`` is smaller than ``out_of_sample`` (overlapping
+            out-of-sample windows cannot be stitched).
+
+    Returns:
+        list: (in-sample dates, out-of-sample dates) pairs.
+    """
+    step = step or out_of_sample
+    if step < out_of_sample:
+        raise ValueError("step must be at least out_of_sample")
+    dates = sorted(set(dates))
+    folds = []
+    for start in range(0, len(dates) - in_sample - out_of_sample + 1, step):
+        split = start + in_sample
+        folds.append((dates[start:split], dates[split : split + out_of_sample]))
+    return folds
+
+
+def _on_unit_date(transactions, dates):
+    """Keep the round trips entered on each unit's own date."""
+    kept = {}
+    for i, rows in transactions.items():
+        day = np.datetime64(pd.Timestamp(dates[i]), "D")
+        kept[i] = []
+        for k in range(0, len(rows), 2):
+            if rows[k][0].astype("datetime64[D]") == day:
+                kept[i] += rows[k : k + 2]
+    return kept
+
+
+def _run_fold(task):
+    """Optimize on the in-sample units and trade the winner out of sample."""
+    combos, in_ids, out_ids, dates, rank_by, min_trades = task
+    scores = rank(
+        [
+            {
+                **score_transactions(
+                    _on_unit_date(combo_transactions(params, in_ids), dates)
+                ),
+                "_combo": k,
+            }
+            for k, params in enumerate(combos)
+        ],
+        rank_by,
+        min_trades,
+    )
+    best = combos[scores["_combo"].iloc[0]]
+    out_transactions = _on_unit_date(combo_transactions(best, out_ids), dates)
+
+    exits, returns = [], []
+    for rows in out_transactions.values():
+        for buy, sell in zip(rows[::2], rows[1::2]):
+            exits.append(sell[0])
+            returns.append((sell[3] - buy[3]) / buy[3])
+    in_metrics = scores.drop(columns="_combo").to_dict("records")[0]
+    return best, in_metrics, score_transactions(out_transactions), exits, returns
+
+
+def walk_forward(
+    strategy,
+    grid,
+    units,
+    in_sample,
+    out_of_sample=1,
+    step=None,
+    processes=None,
+    rank_by="avg_return",
+    min_trades=1,
+):
+    """
+    Walk-forward optimization of one strategy's parameters.
+
+    Args:
+        strategy (str): Key of ``backtesting.sweep.STRATEGIES``.
+        grid (dict): Parameter name to candidate values, as for ``sweep``.
+        units (dict): (date, ticker) to prepared bars, e.g. from ``load_units``.
+        in_sample (int): Dates per in-sample window.
+        out_of_sample (int, optional): Dates per out-of-sample window. Defaults to 1.
+        step (int, optional): Dates between fold starts. Defaults to ``out_of_sample``.
+        processes (int, optional): Worker processes; folds run in parallel. Defaults to
+            the CPU count.
+        rank_by (str, optional): In-sample metric that picks each fold's combo.
+            Defaults to "avg_return".
+        min_trades (int, optional): Combos with fewer in-sample trades are only picked
+            when no combo has enough. Defaults to 1.
+
+    Raises:
+        ValueError: If ``backtesting.sweep.check_params`` rejects the grid.
+
+    Returns:
+        dict: 'folds', a DataFrame with one row per fold (its windows, the chosen
+            parameters, then ``is_``/``oos_`` prefixed metrics), and 'equity', the
+            compounded out-of-sample equity (starting at 1.0) indexed by exit time.
+    """
+    keys = list(units)
+    dates = [date for date, _ in keys]
+    folds = make_folds(dates, in_sample, out_of_sample, step)
+    check_params(strategy, grid)
+    combos = expand_grid(grid)
+    tasks = [
+        (
+            combos,
+            [i for i, date in enumerate(dates) if date in in_dates],
+            [i for i, date in enumerate(dates) if date in out_dates],
+            dates,
+            rank_by,
+            min_trades,
+        )
+        for in_dates, out_dates in folds
+    ]
+    results = run_pool(units, strategy, _run_fold, tasks, processes, keep_features=True)
+
+    rows, exits, returns = [], [], []
+    for (in_dates, out_dates), result in zip(folds, results):
+        best, in_metrics, out_metrics, fold_exits, fold_returns = result
+        rows.append(
+            {
+                "is_start": in_dates[0],
+                "is_end": in_dates[-1],
+                "oos_start": out_dates[0],
+                "oos_end": out_dates[-1],
+                **best,
+                **{f"is_{k}": v for k, v in in_metrics.items()},
+                **{f"oos_{k}": v for k, v in out_metrics.items()},
+            }
+        )
+        exits += fold_exits
+        returns += fold_returns
+
+    equity = pd.Series(returns, index=pd.DatetimeIndex(exits), dtype=float)
+    equity = (1 + equity.sort_index(kind="stable")).cumprod()
+    return {"folds": pd.DataFrame(rows), "equity": equity}
@@ -0,0 +1,151 @@
+"""
+AsyncHistClient against an in-process fake EClient: a ``ReplayApp`` that answers from
+a background thread after a fixed latency, like the TWS API thread, and can be told
+to stay silent or answer with an error for chosen symbols.
+
+Times one request at a time (what ``backtest()`` did) vs ``fetch_frames``, then checks
+a timeout with cancel, a retried pacing error, a no-data answer and token bucket
+pacing.
+
+Run from the repository root:
+    python benchmarks/bench_async_fetcher.py
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+from common import synthetic_bars
+
+from data.async_fetcher import AsyncHistClient
+from data.data_fetcher import usTechStk
+from data.replay import ReplayApp, ReplaySource
+
+N_TICKERS = 50
+LATENCY = 0.05
+END = "20250103 22:05:00 US/Eastern"
+PACING_ERROR = "Historical Market Data Service error message:Pacing violation"
+NO_DATA_ERROR = (
+    "Historical Market Data Service error message:HMDS query returned no data: "
+    "EMPTY@SMART Trades"
+)
+
+
+class FakeApp(ReplayApp):
+    """
+    Replay app answering after ``latency`` seconds on a timer thread.
+
+    ``script`` maps a symbol to the answers of its successive requests: "ok",
+    "silent" (never answers), "pacing" or "no data" (error 162); requests beyond the
+    script are answered "ok".
+    """
+
+    def __init__(self, source, latency=LATENCY, script=None):
+        super().__init__(source)
+        self.latency = latency
+        self.script = {
+            symbol: list(answers) for symbol, answers in (script or {}).items()
+        }
+        self.sent = []  # (monotonic time, reqId, symbol)
+        self.cancelled = []
+
+    def reqHistoricalData(self, reqId, contract, **request):
+        self.sent.append((time.monotonic(), reqId, contract.symbol))
+        answers = self.script.get(contract.symbol)
+        answer = answers.pop(0) if answers else "ok"
+        if answer == "silent":
+            return
+        if answer == "ok":
+            reply = super().reqHistoricalData
+            args, kwargs = (reqId, contract), request
+        else:
+            reply = self.error
+            message = PACING_ERROR if answer == "pacing" else NO_DATA_ERROR
+            args, kwargs = (reqId, 162, message), {}
+        threading.Timer(self.latency, reply, args=args, kwargs=kwargs).start()
+
+    def cancelHistoricalData(self, reqId):
+        self.cancelled.append(reqId)
+        super().cancelHistoricalData(reqId)
+
+
+def client_for(app, **options):
+    client = AsyncHistClient(app, **options)
+    app.hist_listener = client
+    return client
+
+
+def one_at_a_time(client, tickers):
+    return {
+        ticker: asyncio.run(client.fetch(usTechStk(ticker), END, "1 D", "1 min"))
+        for ticker in tickers
+    }
+
+
+def check(name, passed, detail=""):
+    print(f"{name:24}{'ok' if passed else 'FAILED':8}{detail}")
+
+
+if __name__ == "__main__":
+    tickers = [f"T{i}" for i in range(N_TICKERS)]
+    source = ReplaySource(
+        {ticker: synthetic_bars(2, seed=i) for i, ticker in enumerate(tickers)}
+    )
+
+    start = time.perf_counter()
+    serial = one_at_a_time(client_for(FakeApp(source)), tickers)
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    frames = client_for(FakeApp(source)).fetch_frames(tickers, END, "1 D", "1 min")
+    batch_time = time.perf_counter() - start
+    print(f"{N_TICKERS} tickers, {LATENCY * 1e3:.0f} ms latency")
+    print(f"one at a time: {serial_time:6.2f} s")
+    print(f"fetch_frames:  {batch_time:6.2f} s  ({serial_time / batch_time:.0f}x)")
+    check(
+        "success",
+        all(frames[t].equals(serial[t]) and len(frames[t]) for t in tickers),
+        f"{len(frames)} frames",
+    )
+
+    app = FakeApp(source, script={"T0": ["silent"] * 3})
+    result = client_for(app, timeout=0.2, retries=2, retry_delay=0.01).fetch_frames(
+        ["T0"], END, "1 D", "1 min"
+    )
+    check(
+        "timeout and cancel",
+        result["T0"] is None and len(app.cancelled) == 3 and not app.data,
+        f"{len(app.sent)} requests, {len(app.cancelled)} cancelled",
+    )
+
+    app = FakeApp(source, script={"T1": ["pacing", "ok"]})
+    result = client_for(app, retry_delay=0.01).fetch_frames(["T1"], END, "1 D", "1 min")
+    check(
+        "error retry",
+        result["T1"] is not None and len(result["T1"]) > 0 and len(app.sent) == 2,
+        f"{len(app.sent)} requests",
+    )
+
+    app = FakeApp(source, script={"T2": ["no data"]})
+    result = client_for(app).fetch_frames(["T2"], END, "1 D", "1 min")
+    check(
+        "no data",
+        result["T2"] is not None and result["T2"].empty and len(app.sent) == 1,
+        f"{len(app.sent)} request, empty frame",
+    )
+
+    # 5 tokens refilled at 5 per second: at most 5 + 5 * t requests in any t seconds
+    app = FakeApp(source, latency=0.0)
+    client = client_for(app, pacing_requests=5, pacing_window=1.0)
+    start = time.perf_counter()
+    client.fetch_frames(tickers[:15], END, "1 D", "1 min")
+    elapsed = time.perf_counter() - start
+    sent = np.array([t for t, _, _ in app.sent])
+    busiest = max(
+        np.searchsorted(sent, t + 1.0, side="right") - i for i, t in enumerate(sent)
+    )
+    check(
+        "token bucket pacing",
+        busiest <= 10 and elapsed >= 1.9,
+        f"15 requests in {elapsed:.2f} s, at most {busiest} in any 1 s",
+    )
@@ -0,0 +1,55 @@
+"""
+Per-bar cost of historicalData ingestion: per-bar pd.concat vs BarAccumulator.
+
+Run from the repository root:
+    python benchmarks/bench_bar_accumulator.py
+"""
+
+import time
+
+import pandas as pd
+from common import iter_bar_data, synthetic_bars
+
+from data.bar_accumulator import BarAccumulator
+
+
+def ingest_concat(bars):
+    data = None
+    for bar in bars:
+        row = pd.DataFrame(
+            [
+                {
+                    "Date": bar.date,
+                    "Open": bar.open,
+                    "High": bar.high,
+                    "Low": bar.low,
+                    "Close": bar.close,
+                    "Volume": bar.volume,
+                }
+            ]
+        )
+        data = row if data is None else pd.concat((data, row))
+    return data
+
+
+def ingest_accumulator(bars):
+    acc = BarAccumulator()
+    for bar in bars:
+        acc.append(bar)
+    return acc.to_frame()
+
+
+def per_bar_us(func, bars):
+    start = time.perf_counter()
+    func(bars)
+    return (time.perf_counter() - start) / len(bars) * 1e6
+
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=10)
+    print(f"{'bars':>8} {'concat us/bar':>15} {'accumulator us/bar':>20}")
+    for n in (600, 1200, 2400, 4800, 9600):
+        bars = list(iter_bar_data(df.iloc[:n]))
+        concat = per_bar_us(ingest_concat, bars) if n <= 4800 else float("nan")
+        accumulator = per_bar_us(ingest_accumulator, bars)
+        print(f"{n:>8} {concat:>15.1f} {accumulator:>20.2f}")
@@ -0,0 +1,49 @@
+"""
+Peak and retained memory of one ticker-day of the momentum backtest (the 5 days of
+1 min bars it fetches per unit), with the full indicator frame vs the compact schema.
+
+Peak is the largest traced allocation while ``backtest_ticker`` runs; retained is the
+size of the frame it returns (what ``app.data`` / ``run_backtest(keep_frames=True)``
+holds per unit until ``TradeAnalyzer`` is done with it).
+
+Run from the repository root:
+    python benchmarks/bench_compact_frames.py
+"""
+
+import tracemalloc
+
+import numpy as np
+from common import synthetic_bars
+
+from data.schema import unpack_flags
+from strategies.micro_pullback_momentum import COMPACT_FLAGS, backtest_ticker
+
+
+def measure(bars, compact):
+    tracemalloc.start()
+    df, records = backtest_ticker(bars, "SYN", compact=compact)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, records, peak, int(df.memory_usage(deep=True).sum())
+
+
+if __name__ == "__main__":
+    bars = synthetic_bars(n_days=5)
+    print(f"{len(bars):,} bars (one ticker-day, 5 days of history)")
+    backtest_ticker(bars, "SYN")  # warm up imports and caches
+
+    full, full_records, full_peak, full_kept = measure(bars, compact=False)
+    small, small_records, small_peak, small_kept = measure(bars, compact=True)
+    flags = unpack_flags(small["Flags"], COMPACT_FLAGS)
+    assert small_records == full_records
+    assert all(np.array_equal(flags[c], full[c].to_numpy()) for c in COMPACT_FLAGS)
+
+    print(f"{'':10}{'columns':>9}{'peak MB':>10}{'retained MB':>13}")
+    for name, df, peak, kept in (
+        ("full", full, full_peak, full_kept),
+        ("compact", small, small_peak, small_kept),
+    ):
+        print(f"{name:10}{df.shape[1]:>9}{peak / 2**20:>10.2f}{kept / 2**20:>13.2f}")
+    print(f"retained: {full_kept / small_kept:.1f}x smaller; same transactions")
+    print("\ncompact dtypes:")
+    print(small.dtypes.to_string())
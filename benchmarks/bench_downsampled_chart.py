@@ -0,0 +1,42 @@
+"""
+plot_trades for one ticker over growing histories: every bar in SVG traces vs the
+downsampled WebGL mode (``max_points=2000``). Reports figure construction time
+(``show`` is skipped) and the size of the figure JSON sent to the browser.
+
+Run from the repository root:
+    python benchmarks/bench_downsampled_chart.py
+"""
+
+import contextlib
+import io
+
+import plotly.graph_objects as go
+from bench_trade_lookup import indicator_frame, transactions_at
+from common import timeit
+
+from backtesting.trade_analyzer import TradeAnalyzer
+
+MODES = {
+    "full": {},
+    "minmax": {"max_points": 2000, "method": "minmax"},
+    "lttb": {"max_points": 2000, "method": "lttb"},
+}
+
+
+def build(analyzer, options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyzer.plot_trades(**options)[0]
+
+
+if __name__ == "__main__":
+    go.Figure.show = lambda self, *args, **kwargs: None
+    for n_days in (5, 20, 60):
+        df = indicator_frame(n_days=n_days)
+        analyzer = TradeAnalyzer(transactions_at(df, 300), {1000: df})
+        print(f"\n{len(df):,} bars, 300 trades")
+        print(f"{'':8}{'build ms':>10}{'JSON MB':>10}{'points':>9}")
+        for name, options in MODES.items():
+            elapsed, fig = timeit(build, analyzer, options, repeat=1)
+            points = sum(len(trace.x) for trace in fig.data)
+            size = len(fig.to_json()) / 2**20
+            print(f"{name:8}{elapsed * 1e3:>10.0f}{size:>10.2f}{points:>9,}")
@@ -0,0 +1,62 @@
+"""
+EMA ribbons and T3 on a (bars x tickers) panel: per-ticker pandas ewm chains vs the
+array kernels in indicators.ema.
+
+Run from the repository root:
+    python benchmarks/bench_ema_kernel.py
+"""
+
+import numpy as np
+import pandas as pd
+from common import timeit
+
+from indicators.ema import ema_bank, t3, t3_weights
+
+RIBBON = (4, 7, 15)
+T3_LENGTHS = (5, 8)
+
+
+def pandas_chain(panel):
+    """What the strategies do today: one ewm().mean() per ticker, span and T3 stage."""
+    c1, c2, c3, c4 = t3_weights()
+    out = {}
+    for ticker in panel.columns:
+        close = panel[ticker]
+        for span in RIBBON:
+            out[ticker, f"EMA{span}"] = close.ewm(span=span, adjust=False).mean()
+        for length in T3_LENGTHS:
+            e = [close]
+            for _ in range(6):
+                e.append(e[-1].ewm(span=length, adjust=False).mean())
+            out[ticker, f"T3_{length}"] = c1 * e[6] + c2 * e[5] + c3 * e[4] + c4 * e[3]
+    return out
+
+
+def kernel(panel):
+    values = panel.to_numpy()
+    return ema_bank(values, RIBBON), t3(values, T3_LENGTHS)
+
+
+if __name__ == "__main__":
+    n_bars, n_tickers = 4800, 500  # 5 days of 1 min bars
+    rng = np.random.default_rng(0)
+    panel = pd.DataFrame(
+        100 * np.exp(rng.normal(0, 1e-3, (n_bars, n_tickers)).cumsum(axis=0)),
+        columns=[f"T{i}" for i in range(n_tickers)],
+    )
+    print(f"{n_bars:,} bars x {n_tickers} tickers, spans {RIBBON} + T3 {T3_LENGTHS}")
+
+    old_time, old = timeit(pandas_chain, panel, repeat=1)
+    new_time, (ribbon, t3s) = timeit(kernel, panel)
+    print(f"pandas ewm chains: {old_time * 1e3:8.1f} ms")
+    print(f"array kernels:     {new_time * 1e3:8.1f} ms  ({old_time / new_time:.1f}x)")
+
+    error = 0.0
+    for i, ticker in enumerate(panel.columns):
+        for k, span in enumerate(RIBBON):
+            ref = old[ticker, f"EMA{span}"].to_numpy()
+            error = max(error, np.max(np.abs(ribbon[:, k, i] - ref) / ref))
+        for k, length in enumerate(T3_LENGTHS):
+            ref = old[ticker, f"T3_{length}"].to_numpy()
+            error = max(error, np.max(np.abs(t3s[:, k, i] - ref) / ref))
+    print(f"max relative difference: {error:.2e}")
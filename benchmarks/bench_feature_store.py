@@ -0,0 +1,65 @@
+"""
+Indicator sharing across the momentum strategies: one FeatureStore per strategy vs one
+shared store per ticker.
+
+Run from the repository root:
+    python benchmarks/bench_feature_store.py
+"""
+
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from indicators.feature_store import FeatureStore
+from strategies.micro_pull_back_breakout import compute_breakout_signal
+from strategies.micro_pull_back_ema import compute_micro_pullback_ema_strategy
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.micro_pullback_momentum import (
+    compute_momentum_signals,
+    compute_profit_hunter_signals,
+)
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_session_vwap
+
+
+def run_strategies(df, features=None):
+    """Run every strategy the momentum backtest combines; None gives each its own store."""
+    df = df.copy()
+    df["VolumeSpike"] = False
+    compute_micro_pullback(df, max_pullback_pct=0.02, features=features)
+    compute_breakout_signal(df, features=features)
+    compute_stochastic_bollinger_band(df, features=features)
+    compute_profit_hunter_signals(df, features=features)
+    compute_micro_pullback_ema_strategy(
+        df, threshold=0.0003, volume_spike_factor=2, features=features
+    )
+    return features
+
+
+def shared(df):
+    return run_strategies(df, FeatureStore(df))
+
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=5)
+    df["DateTime"] = pd.to_datetime(
+        df["Date"].str.replace(" US/Eastern", "", regex=False)
+    )
+    compute_session_vwap(df)
+    print(f"{len(df):,} bars (one ticker, 5 days)")
+
+    separate_time, _ = timeit(run_strategies, df)
+    shared_time, _ = timeit(shared, df)
+    print(f"store per strategy: {separate_time * 1e3:8.1f} ms")
+    print(
+        f"shared store:       {shared_time * 1e3:8.1f} ms  "
+        f"({separate_time / shared_time:.2f}x)"
+    )
+
+    store = FeatureStore(df)
+    compute_momentum_signals(df.copy(), store)
+    print("\ncompute_momentum_signals:")
+    print(
+        f"hits: {store.hits}  misses: {store.misses}  "
+        f"saved: {store.saved_time * 1e3:.1f} ms"
+    )
+    print(store.report().to_string(index=False, float_format="%.2f"))
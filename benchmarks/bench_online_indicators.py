@@ -0,0 +1,68 @@
+"""
+Online indicators: per-bar update cost and parity with the batch versions.
+
+Run from the repository root:
+    python benchmarks/bench_online_indicators.py
+"""
+
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import ta
+from common import synthetic_bars
+
+from indicators.online import (
+    ADX,
+    ATR,
+    EMA,
+    RSI,
+    ChoppinessIndex,
+    RollingMax,
+    RollingMean,
+    RollingMin,
+    RollingStd,
+)
+from strategies.micro_pull_back_ema import compute_choppiness_index
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=5)
+    high, low, close, volume = df["High"], df["Low"], df["Close"], df["Volume"]
+    bars = [
+        SimpleNamespace(high=h, low=l, close=c) for h, l, c in zip(high, low, close)
+    ]
+
+    cases = [
+        ("EMA(15)", EMA(span=15), close, close.ewm(span=15, adjust=False).mean()),
+        ("RollingMean(80)", RollingMean(80), volume, volume.rolling(80).mean()),
+        ("RollingStd(20)", RollingStd(20), close, close.rolling(20).std()),
+        ("RollingMax(5)", RollingMax(5), high, high.rolling(5).max()),
+        ("RollingMin(14)", RollingMin(14), low, low.rolling(14).min()),
+        ("RSI(14)", RSI(14), close, ta.momentum.RSIIndicator(close, window=14).rsi()),
+        (
+            "ATR(14)",
+            ATR(14),
+            bars,
+            ta.volatility.AverageTrueRange(
+                high, low, close, window=14
+            ).average_true_range(),
+        ),
+        ("ADX(15)", ADX(15), bars, ta.trend.adx(high, low, close, window=15)),
+        (
+            "ChoppinessIndex(14)",
+            ChoppinessIndex(14),
+            bars,
+            compute_choppiness_index(high, low, close),
+        ),
+    ]
+
+    print(f"{len(df):,} bars")
+    print(f"{'indicator':<20} {'us/update':>10} {'bit-exact':>10} {'max abs diff':>14}")
+    for name, indicator, inputs, batch in cases:
+        start = time.perf_counter()
+        streamed = np.array([indicator.update(x) for x in inputs], dtype=float)
+        per_bar = (time.perf_counter() - start) / len(df) * 1e6
+        batch = batch.to_numpy(dtype=float)
+        exact = np.array_equal(streamed, batch, equal_nan=True)
+        diff = 0.0 if exact else np.nanmax(np.abs(streamed - batch))
+        print(f"{name:<20} {per_bar:>10.2f} {str(exact):>10} {diff:>14.3g}")
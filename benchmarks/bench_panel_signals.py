@@ -0,0 +1,86 @@
+"""
+Universe-wide signal generation: per-ticker strategy functions vs the panel engine.
+
+Every ``GAPPED_EVERY``-th ticker misses ``GAP_FRACTION`` of its bars at random, as
+thinly traded small caps do, so the panel's windows have to skip the timestamps a
+ticker has no bar for.
+
+Run from the repository root:
+    python benchmarks/bench_panel_signals.py
+"""
+
+import numpy as np
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from data.panel import Panel
+from strategies.micro_pull_back_breakout import compute_breakout_signal
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.panel_signals import compute_panel_signals
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_session_vwap
+
+N_TICKERS = 50
+GAPPED_EVERY = 5
+GAP_FRACTION = 0.05
+
+
+def per_ticker(frames):
+    out = {}
+    for ticker, df in frames.items():
+        df = compute_session_vwap(df.copy())
+        average_volume = df["Volume"].rolling(window=80).mean()
+        df["VolumeSpike"] = (df["Volume"] / average_volume > 5) & (df["Volume"] > 15000)
+        out[ticker] = (
+            compute_micro_pullback(df, max_pullback_pct=0.02)["MicroPullback"],
+            compute_breakout_signal(df)["Breakout"],
+            compute_stochastic_bollinger_band(df)["StochBollingerEntry"],
+        )
+    return out
+
+
+def panel_mode(frames):
+    panel = Panel.from_frames(frames)
+    return panel, compute_panel_signals(panel)
+
+
+if __name__ == "__main__":
+    frames = {}
+    rng = np.random.default_rng(0)
+    for seed in range(N_TICKERS):
+        df = synthetic_bars(n_days=5, seed=seed)
+        df["DateTime"] = pd.to_datetime(
+            df["Date"].str.replace(" US/Eastern", "", regex=False)
+        )
+        if seed % GAPPED_EVERY == 0:
+            df = df[rng.random(len(df)) >= GAP_FRACTION].reset_index(drop=True)
+        frames[f"T{seed}"] = df
+    print(
+        f"{N_TICKERS} tickers x up to {len(synthetic_bars(n_days=5)):,} bars, "
+        f"every {GAPPED_EVERY}th missing {GAP_FRACTION:.0%} of its bars"
+    )
+
+    old_time, old = timeit(per_ticker, frames, repeat=1)
+    new_time, (panel, signals) = timeit(panel_mode, frames)
+    print(f"per-ticker functions: {old_time * 1e3:9.1f} ms")
+    print(
+        f"panel engine:         {new_time * 1e3:9.1f} ms  ({old_time / new_time:.0f}x)"
+    )
+
+    names = ("MicroPullback", "Breakout", "StochasticBollinger")
+    split = panel.to_frames(
+        **{name: signals[name].to_numpy(dtype=bool) for name in names}
+    )
+    for k, name in enumerate(names):
+        mismatched = [
+            ticker
+            for ticker in frames
+            if not np.array_equal(
+                old[ticker][k].to_numpy(dtype=bool), split[ticker][name].to_numpy()
+            )
+        ]
+        found = sum(int(old[ticker][k].sum()) for ticker in frames)
+        print(
+            f"{name:20} {found:4} per-ticker signals, "
+            f"tickers differing: {len(mismatched)}"
+        )
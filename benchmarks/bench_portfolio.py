@@ -0,0 +1,51 @@
+"""
+Portfolio simulation over a large universe: bars merged per event by the
+backtesting.portfolio engine.
+
+Run from the repository root:
+    python benchmarks/bench_portfolio.py [n_tickers]
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from backtesting.portfolio import Portfolio
+from strategies.micro_pullback_momentum import ENTRY_SIGNALS
+
+N_DAYS = 20
+
+
+def signal_frames(n_tickers):
+    rng = np.random.default_rng(0)
+    frames = {}
+    for i in range(n_tickers):
+        bars = synthetic_bars(N_DAYS, seed=i)
+        df = pd.DataFrame(
+            {
+                "DateTime": pd.to_datetime(bars["Date"].str[:17]),
+                "Close": bars["Close"],
+            }
+        )
+        for column in ENTRY_SIGNALS.values():
+            df[column] = rng.random(len(df)) < 0.002
+        frames[f"T{i}"] = df
+    return frames
+
+
+if __name__ == "__main__":
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    frames = signal_frames(n_tickers)
+    n_bars = sum(len(df) for df in frames.values())
+    print(f"{n_tickers} tickers, {n_bars:,} bars")
+
+    run_time, portfolio = timeit(
+        lambda: Portfolio(max_positions=10, position_pct=0.1).run(frames), repeat=1
+    )
+    print(
+        f"Portfolio.run: {run_time:6.2f} s  ({n_bars / run_time / 1e6:.1f}M bars/s), "
+        f"{len(portfolio.fills)} fills, {sum(portfolio.rejected.values())} rejected, "
+        f"final equity {portfolio.equity['equity'].iloc[-1]:,.0f}"
+    )
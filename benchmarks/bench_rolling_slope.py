@@ -0,0 +1,40 @@
+"""
+Rolling regression slope: rolling().apply(compute_slope) vs the closed-form rolling_slope.
+
+Run from the repository root:
+    python benchmarks/bench_rolling_slope.py
+"""
+
+import numpy as np
+from common import synthetic_bars, timeit
+
+from indicators.regression import rolling_regression, rolling_slope
+from strategies.micro_pull_back_ema import compute_slope
+
+
+def apply_slope(series, window):
+    return series.rolling(window=window).apply(compute_slope, raw=False)
+
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=5)
+    ema = df["Close"].ewm(span=15, adjust=False).mean()
+    print(f"{len(ema):,} bars (one ticker, 5 days), window 10")
+
+    old_time, old = timeit(apply_slope, ema, 10, repeat=1)
+    new_time, new = timeit(rolling_slope, ema, 10)
+    error = np.nanmax(np.abs(old - new))
+    print(f"rolling().apply(compute_slope): {old_time * 1e3:9.1f} ms")
+    print(
+        f"rolling_slope:                  {new_time * 1e3:9.2f} ms  "
+        f"({old_time / new_time:.0f}x)"
+    )
+    print(f"max absolute difference: {error:.2e}")
+
+    year = synthetic_bars(n_days=252)
+    columns = year[["Open", "High", "Low", "Close"]]
+    full_time, _ = timeit(rolling_regression, columns, 10, intercept=True, r2=True)
+    print(f"1 year x 4 columns, slope + intercept + R2: {full_time * 1e3:8.1f} ms")
+    windows = np.random.default_rng(0).integers(5, 60, len(year))
+    variable_time, _ = timeit(rolling_slope, year["Close"], windows)
+    print(f"1 year, per-bar windows 5-59:              {variable_time * 1e3:8.1f} ms")
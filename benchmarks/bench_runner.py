@@ -0,0 +1,59 @@
+"""
+Momentum backtest over many cached ticker-days: sequential backtest() vs the pooled
+backtesting.runner at increasing worker counts.
+
+Run from the repository root:
+    python benchmarks/bench_runner.py [n_units]
+"""
+
+import os
+import sys
+
+from common import synthetic_bars, timeit
+
+from backtesting.runner import run_backtest
+from data.replay import ReplayApp, ReplaySource
+from strategies.micro_pullback_momentum import backtest
+
+N_TICKERS = 10
+
+
+class SourceClient:
+    """``fetch_frames`` over recorded bars, standing in for a warm ``BarCache``."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def fetch_frames(self, tickers, endDate, duration, candle_size):
+        return {
+            ticker: self.source.bars(ticker, endDate, duration) for ticker in tickers
+        }
+
+
+if __name__ == "__main__":
+    n_units = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_days = -(-n_units // N_TICKERS)
+    source = ReplaySource(
+        {f"T{i}": synthetic_bars(n_days + 4, seed=i) for i in range(N_TICKERS)}
+    )
+    days = sorted(source.frames["T0"]["Date"].str[:8].unique())[4:]
+    selected_stocks = {day: list(source.frames) for day in days}
+    client = SourceClient(source)
+    print(f"{len(days) * N_TICKERS} ticker-days, {os.cpu_count()} CPUs")
+
+    app = ReplayApp(source)
+    base_time, (date_stats, transactions) = timeit(
+        backtest, selected_stocks, app, app.ticker_event, client=client, repeat=1
+    )
+    print(f"backtest():           {base_time:7.2f} s")
+    workers = 1
+    while workers <= os.cpu_count():
+        run_time, (stats, trans, _) = timeit(
+            run_backtest, selected_stocks, client, processes=workers, repeat=1
+        )
+        same = stats == date_stats and dict(trans) == dict(transactions)
+        print(
+            f"run_backtest, {workers:2d} proc: {run_time:7.2f} s"
+            f"  ({base_time / run_time:.1f}x, identical: {same})"
+        )
+        workers *= 2
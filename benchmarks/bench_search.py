@@ -0,0 +1,58 @@
+"""
+Micro pullback parameter search: exhaustive grid sweep vs successive halving.
+
+Reports the cost of each in ticker-day backtests and the full-universe score of the
+combo each one picks.
+
+Run from the repository root:
+    python benchmarks/bench_search.py
+"""
+
+from common import synthetic_bars, timeit
+
+from backtesting.search import metric_objective, successive_halving
+from backtesting.sweep import prepare_bars, sweep
+
+N_UNITS = 27
+GRID = {
+    "vol_thresh": [10000, 15000, 20000],
+    "volume_window": [40, 80],
+    "rel_volume_thresh": [2, 3, 5],
+    "max_pullback_pct": [0.01, 0.015, 0.02],
+    "target_pct": [0.03, 0.04, 0.06],
+}
+
+
+if __name__ == "__main__":
+    units = {
+        ("20250416", f"T{i}"): prepare_bars(synthetic_bars(5, seed=i))
+        for i in range(N_UNITS)
+    }
+    objective = metric_objective("avg_return", min_trades=10)
+
+    grid_time, ranked = timeit(sweep, "micro_pullback", GRID, units, repeat=1)
+    scores = ranked.apply(objective, axis=1)
+    n_combos = len(ranked)
+    print(f"{N_UNITS} ticker-days, {n_combos} combos")
+    print(
+        f"grid sweep:         {n_combos * N_UNITS:6d} backtests {grid_time:7.2f} s"
+        f"  best score {scores.max():.3f}"
+    )
+
+    halving_time, result = timeit(
+        successive_halving,
+        "micro_pullback",
+        GRID,
+        units,
+        n_candidates=n_combos,
+        min_units=3,
+        objective=objective,
+        repeat=1,
+    )
+    cost = result["history"]["units"].sum()
+    final = result["history"].iloc[-1]
+    print(
+        f"successive halving: {cost:6d} backtests {halving_time:7.2f} s"
+        f"  best score {final['score']:.3f}"
+        f"  (rank {int((scores > final['score']).sum()) + 1} of {n_combos})"
+    )
@@ -0,0 +1,59 @@
+"""
+Session VWAP on 1 year of 1 min bars: groupby.apply + merge vs compute_session_vwap.
+
+Run from the repository root:
+    python benchmarks/bench_session_vwap.py
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from utils import compute_daily_vwap, compute_session_vwap
+
+
+def groupby_apply_merge(df):
+    df = df.copy()
+    df["DateOnly"] = df["DateTime"].dt.date
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pandas warns about apply on grouping columns
+        df_vwap = (
+            df.groupby("DateOnly").apply(compute_daily_vwap).reset_index(drop=True)
+        )
+    return df.merge(df_vwap, on="DateTime", how="left")
+
+
+def vectorized(df):
+    return compute_session_vwap(df.copy())
+
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=252)
+    df["DateTime"] = pd.to_datetime(
+        df["Date"].str.replace(" US/Eastern", "", regex=False)
+    )
+    print(f"{len(df):,} bars")
+
+    old_time, old = timeit(groupby_apply_merge, df)
+    new_time, new = timeit(vectorized, df)
+    error = np.nanmax(np.abs(old["VWAP"] - new["VWAP"]) / old["VWAP"])
+    print(f"groupby.apply + merge: {old_time * 1e3:8.1f} ms")
+    print(
+        f"compute_session_vwap:  {new_time * 1e3:8.1f} ms  ({old_time / new_time:.0f}x)"
+    )
+    print(f"max relative difference: {error:.2e}")
+
+    bands_time, _ = timeit(
+        lambda: compute_session_vwap(
+            df.copy(), band_stds=(1, 2), extra_anchors=("09:30",)
+        )
+    )
+    print(f"with 2 bands + 09:30 anchor: {bands_time * 1e3:8.1f} ms")
+
+    panel = pd.concat(
+        [df.assign(Ticker=f"T{i}") for i in range(20)], ignore_index=True
+    ).sort_values("DateTime", kind="stable")
+    panel_time, _ = timeit(lambda: compute_session_vwap(panel.copy(), by="Ticker"))
+    print(f"20-ticker panel ({len(panel):,} bars): {panel_time * 1e3:8.1f} ms")
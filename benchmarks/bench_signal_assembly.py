@@ -0,0 +1,76 @@
+"""
+Signal assembly in compute_momentum_signals: the left joins on 'DateTime' it used to
+chain vs attaching each strategy's index-aligned output on the index.
+
+Run from the repository root:
+    python benchmarks/bench_signal_assembly.py
+"""
+
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from indicators.feature_store import FeatureStore
+from strategies.micro_pull_back_breakout import compute_breakout_signal
+from strategies.micro_pull_back_ema import compute_micro_pullback_ema_strategy
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.micro_pullback_momentum import (
+    _attach,
+    compute_momentum_signals,
+    compute_profit_hunter_signals,
+)
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_session_vwap
+
+
+def strategy_outputs(df):
+    """The five strategy frames compute_momentum_signals combines, in its order."""
+    features = FeatureStore(df)
+    df = df.copy()
+    df["VolumeSpike"] = False
+    return [
+        compute_micro_pullback(df, max_pullback_pct=0.02, features=features),
+        compute_breakout_signal(df, features=features),
+        compute_stochastic_bollinger_band(df, features=features),
+        compute_profit_hunter_signals(df, features=features),
+        compute_micro_pullback_ema_strategy(
+            df, threshold=0.0003, volume_spike_factor=2, features=features
+        ),
+    ]
+
+
+def merge_chain(df, outputs):
+    for output in outputs:
+        df = df.merge(output, on="DateTime", how="left")
+    return df
+
+
+def attach_chain(df, outputs):
+    for output in outputs:
+        df = _attach(df, output)
+    return df
+
+
+if __name__ == "__main__":
+    for n_days in (5, 60):
+        df = synthetic_bars(n_days=n_days)
+        df["DateTime"] = pd.to_datetime(
+            df["Date"].str.replace(" US/Eastern", "", regex=False)
+        )
+        compute_session_vwap(df)
+        outputs = strategy_outputs(df)
+        print(f"\n{len(df):,} bars (one ticker, {n_days} days)")
+
+        merge_time, _ = timeit(merge_chain, df, outputs, repeat=10)
+        attach_time, _ = timeit(attach_chain, df, outputs, repeat=10)
+        guard_time, _ = timeit(lambda: df["DateTime"].duplicated().any())
+        total_time, _ = timeit(compute_momentum_signals, df.copy())
+        print(f"merge on DateTime:   {merge_time * 1e3:8.2f} ms")
+        print(
+            f"index attach:        {attach_time * 1e3:8.2f} ms  "
+            f"({merge_time / attach_time:.1f}x)"
+        )
+        print(f"duplicate guard:     {guard_time * 1e3:8.2f} ms")
+        print(
+            f"compute_momentum_signals: {total_time * 1e3:8.1f} ms "
+            f"(saved {(merge_time - attach_time) / total_time:.0%} of it)"
+        )
@@ -0,0 +1,64 @@
+"""
+Trade simulation over one year of 1 min bars: the per-bar ``df.iloc`` loop the
+backtests used vs backtesting.simulator.simulate.
+
+Run from the repository root:
+    python benchmarks/bench_simulator.py
+"""
+
+import numpy as np
+from common import synthetic_bars, timeit
+
+from backtesting.simulator import simulate
+from strategies.micro_pullback_momentum import ENTRY_SIGNALS, EXIT_RULES
+
+
+def iloc_loop(df):
+    """The momentum backtest's loop before the simulator, minus the bookkeeping."""
+    trades = []
+    in_position = False
+    for i in range(len(df)):
+        row = df.iloc[i]
+        close_price = row["Close"]
+        if not in_position:
+            for entry_type, column in ENTRY_SIGNALS.items():
+                if row[column]:
+                    break
+            else:
+                continue
+            stop_loss_pct, target_pct = EXIT_RULES[entry_type]
+            entry, entry_price = i, close_price
+            stop_loss = entry_price * (1 - stop_loss_pct)
+            target_price = entry_price * (1 + target_pct)
+            in_position = True
+        elif close_price >= target_price or close_price <= stop_loss:
+            trades.append((entry, i, entry_type))
+            in_position = False
+    if in_position:
+        trades.append((entry, -1, entry_type))
+    return trades
+
+
+def vectorized(df):
+    return simulate(
+        df["Close"],
+        {name: df[column] for name, column in ENTRY_SIGNALS.items()},
+        EXIT_RULES,
+    )
+
+
+if __name__ == "__main__":
+    df = synthetic_bars(n_days=252)
+    rng = np.random.default_rng(1)
+    for column in ENTRY_SIGNALS.values():
+        df[column] = rng.random(len(df)) < 0.002
+    print(f"{len(df):,} bars, {len(ENTRY_SIGNALS)} entry signals")
+
+    old_time, old = timeit(iloc_loop, df, repeat=1)
+    new_time, trades = timeit(vectorized, df)
+    print(f"df.iloc loop: {old_time * 1e3:10.1f} ms")
+    print(f"simulate:     {new_time * 1e3:10.1f} ms  ({old_time / new_time:.0f}x)")
+
+    new = list(zip(trades.entry.tolist(), trades.exit.tolist(), trades.kind.tolist()))
+    same = new == [(e, x, list(ENTRY_SIGNALS).index(k)) for e, x, k in old]
+    print(f"{len(trades)} trades, identical: {same}")
@@ -0,0 +1,81 @@
+"""
+Memory allocated per call by the strategy entry points on a wide frame (the momentum
+backtest's indicator frame, where every strategy used to start with ``df.copy()``).
+
+The shared FeatureStore is warmed up first, so a call only pays for its own column
+arithmetic and output frame. Per call the benchmark reports the peak of traced
+allocations above the starting point, and the bytes and allocation blocks still held
+afterwards (the returned frame). Run it on two checkouts to compare implementations.
+
+Run from the repository root:
+    python benchmarks/bench_strategy_allocations.py
+"""
+
+import tracemalloc
+
+from common import synthetic_bars
+
+from backtesting.sweep import prepare_bars
+from indicators.feature_store import FeatureStore
+from strategies.micro_pull_back_breakout import compute_breakout_signal
+from strategies.micro_pull_back_ema import compute_micro_pullback_ema_strategy
+from strategies.micro_pullback import compute_micro_pullback
+from strategies.micro_pullback_momentum import (
+    compute_momentum_signals,
+    compute_profit_hunter_signals,
+)
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_daily_vwap
+
+CALLS = {
+    "compute_micro_pullback": lambda df, f: compute_micro_pullback(
+        df, max_pullback_pct=0.02, features=f
+    ),
+    "compute_breakout_signal": lambda df, f: compute_breakout_signal(df, features=f),
+    "compute_stochastic_bollinger_band": lambda df, f: (
+        compute_stochastic_bollinger_band(df, features=f)
+    ),
+    "compute_micro_pullback_ema_strategy": lambda df, f: (
+        compute_micro_pullback_ema_strategy(
+            df, threshold=0.0003, volume_spike_factor=2, features=f
+        )
+    ),
+    "compute_profit_hunter_signals": lambda df, f: compute_profit_hunter_signals(
+        df, features=f
+    ),
+    "compute_daily_vwap": lambda df, f: compute_daily_vwap(df),
+}
+
+
+def allocations(call, df, features):
+    """(peak bytes, retained bytes, retained blocks) of one call."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    result = call(df, features)
+    peak = tracemalloc.get_traced_memory()[1] - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    held = after.compare_to(before, "filename")
+    del result
+    return (
+        peak,
+        sum(stat.size_diff for stat in held),
+        sum(stat.count_diff for stat in held),
+    )
+
+
+if __name__ == "__main__":
+    bars = prepare_bars(synthetic_bars(n_days=5))
+    df = compute_momentum_signals(bars.copy())
+    features = FeatureStore(df)
+    for call in CALLS.values():
+        call(df, features)  # warm the shared store
+
+    deep = df.memory_usage(deep=True).sum()
+    print(f"{len(df):,} bars x {df.shape[1]} columns ({deep / 2**20:.2f} MB deep)")
+    print(f"{'':38}{'peak KB':>10}{'kept KB':>10}{'kept blocks':>13}")
+    for name, call in CALLS.items():
+        peak, kept, blocks = allocations(call, df, features)
+        print(f"{name:38}{peak / 2**10:>10.0f}{kept / 2**10:>10.0f}{blocks:>13}")
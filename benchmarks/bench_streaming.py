@@ -0,0 +1,68 @@
+"""
+Momentum strategy backtest over one year of 1 min bars: ``backtest_ticker`` on the
+whole history in memory vs the chunked streaming backtest reading day partitions from
+a BarCache-style directory, with every entry signal in its own book.
+
+Run from the repository root:
+    python benchmarks/bench_streaming.py
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from common import synthetic_bars
+
+from backtesting.streaming import (
+    cached_days,
+    day_chunks,
+    frame_days,
+    stream_momentum_backtest,
+)
+from strategies.micro_pullback_momentum import backtest_ticker
+
+N_DAYS = 252
+CHUNK_DAYS = 5
+
+
+def measure(func, *args):
+    """Wall time, peak traced memory (MB) and result of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def full_run(root):
+    bars = pd.concat(cached_days(root, "T0"), ignore_index=True)
+    _, books = backtest_ticker(bars, "T0", multi_book=True)
+    return {book: transactions for book, (transactions, _) in books.items()}
+
+
+def chunked_run(root):
+    transactions, _ = stream_momentum_backtest(
+        lambda: day_chunks(cached_days(root, "T0"), CHUNK_DAYS), "T0"
+    )
+    return transactions
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as root:
+        day_dir = os.path.join(root, "T0", "1_min")
+        os.makedirs(day_dir)
+        for day in frame_days(synthetic_bars(N_DAYS)):
+            day.to_parquet(os.path.join(day_dir, day["Date"].iloc[0][:8] + ".parquet"))
+        print(f"{N_DAYS} days of 1 min bars, {CHUNK_DAYS}-day chunks")
+
+        full_time, full_peak, full = measure(full_run, root)
+        chunk_time, chunk_peak, chunked = measure(chunked_run, root)
+    print(f"in memory: {full_time:6.2f} s, peak {full_peak:7.1f} MB")
+    print(f"streamed:  {chunk_time:6.2f} s, peak {chunk_peak:7.1f} MB")
+    for book, transactions in full.items():
+        same = chunked[book] == transactions
+        print(f"{book:20}{len(transactions):6} transactions, identical: {same}")
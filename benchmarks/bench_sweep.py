@@ -0,0 +1,78 @@
+"""
+Parameter sweeps: re-running the strategy per combo from scratch vs backtesting.sweep
+(shared bars and parameter-independent features, process pool), for the micro
+pullback (no parameter-independent features) and the stochastic Bollinger strategy
+(RSI/ADX/ATR and fixed Bollinger windows shared).
+
+Run from the repository root:
+    python benchmarks/bench_sweep.py
+"""
+
+import os
+
+from common import synthetic_bars, timeit
+
+from backtesting.simulator import simulate
+from backtesting.sweep import (
+    STRATEGIES,
+    expand_grid,
+    prepare_bars,
+    score_transactions,
+    sweep,
+)
+
+N_UNITS = 20
+GRIDS = {
+    "micro_pullback": {
+        "volume_window": [40, 80, 120],
+        "rel_volume_thresh": [3, 5],
+        "max_pullback_pct": [0.01, 0.015, 0.02],
+        "target_pct": [0.04, 0.06],
+    },
+    "stochastic_bollinger": {
+        "volume_multiplier": [1.2, 1.5],
+        "adx_threshold": [15, 20, 25],
+        "rsi_threshold": [30, 50, 70],
+        "target_pct": [0.04, 0.06],
+    },
+}
+
+
+def naive(strategy, units):
+    signal, column = STRATEGIES[strategy]
+    rows = []
+    for params in expand_grid(GRIDS[strategy]):
+        target_pct = params["target_pct"]
+        signal_params = {k: v for k, v in params.items() if k != "target_pct"}
+        transactions = {}
+        for i, ((date, ticker), df) in enumerate(units.items()):
+            flags = signal(df, **signal_params)[column]
+            trades = simulate(
+                df["Close"], {column: flags}, {column: (0.03, target_pct)}
+            )
+            transactions[i] = []
+            for entry, exit, kind, entry_price, exit_price in trades.rows():
+                transactions[i].append((entry, "BUY", ticker, entry_price, kind))
+                if exit is not None:
+                    transactions[i].append((exit, "SELL", ticker, exit_price, kind))
+        rows.append({**params, **score_transactions(transactions)})
+    return rows
+
+
+if __name__ == "__main__":
+    units = {
+        ("20250416", f"T{i}"): prepare_bars(synthetic_bars(5, seed=i))
+        for i in range(N_UNITS)
+    }
+    for strategy, grid in GRIDS.items():
+        n_combos = len(expand_grid(grid))
+        print(
+            f"\n{strategy}: {N_UNITS} ticker-days x {n_combos} combos,"
+            f" {os.cpu_count()} CPUs"
+        )
+
+        old_time, old = timeit(naive, strategy, units, repeat=1)
+        new_time, ranked = timeit(sweep, strategy, grid, units, repeat=1)
+        print(f"per-combo recompute: {old_time:7.2f} s")
+        print(f"sweep:               {new_time:7.2f} s  ({old_time / new_time:.1f}x)")
+        print(ranked.head())
@@ -0,0 +1,56 @@
+"""
+TradeAnalyzer metrics over a sweep-sized set of round trips: construction (pairing
+into the round-trip table) and each metric.
+
+Run from the repository root:
+    python benchmarks/bench_trade_analyzer.py
+"""
+
+import numpy as np
+import pandas as pd
+from common import timeit
+
+from backtesting.trade_analyzer import TradeAnalyzer
+
+ENTRY_TYPES = ("EMA", "MicroPullback", "Breakout", "StochasticBollinger")
+METRICS = (
+    "calculate_profit_by_entry_type",
+    "calculate_win_rate",
+    "calculate_total_profit",
+    "calculate_average_trade_return",
+)
+
+
+def synthetic_transactions(n_units=2000, trades_per_unit=100, seed=0):
+    """reqId -> alternating BUY/SELL tuples with IB date strings, like the backtests."""
+    rng = np.random.default_rng(seed)
+    stamps = pd.date_range("2025-01-02 04:00", periods=2 * trades_per_unit, freq="min")
+    dates = list(stamps.strftime("%Y%m%d %H:%M:%S US/Eastern"))
+    transactions = {}
+    for unit in range(1000, 1000 + n_units):
+        ticker = f"T{unit % 500}"
+        buys = rng.uniform(2, 20, trades_per_unit)
+        sells = buys * (1 + rng.normal(0, 0.03, trades_per_unit))
+        kinds = rng.integers(0, len(ENTRY_TYPES), trades_per_unit)
+        rows = []
+        for k in range(trades_per_unit):
+            entry_type = ENTRY_TYPES[kinds[k]]
+            rows.append((dates[2 * k], "BUY", ticker, buys[k], entry_type))
+            rows.append((dates[2 * k + 1], "SELL", ticker, sells[k], entry_type))
+        transactions[unit] = rows
+    return transactions
+
+
+if __name__ == "__main__":
+    transactions = synthetic_transactions()
+    n = sum(len(rows) for rows in transactions.values()) // 2
+    print(f"{n:,} round trips in {len(transactions):,} reqIds")
+
+    build_time, analyzer = timeit(TradeAnalyzer, transactions, None)
+    print(f"{'construction':34}{build_time * 1e3:9.1f} ms")
+    total = build_time
+    for name in METRICS:
+        elapsed, _ = timeit(getattr(analyzer, name))
+        total += elapsed
+        print(f"{name:34}{elapsed * 1e3:9.1f} ms")
+    print(f"{'total':34}{total * 1e3:9.1f} ms")
@@ -0,0 +1,80 @@
+"""
+Bar-level TradeAnalyzer analytics on a year of 1 min bars for several tickers: trade
+excursions (MAE/MFE), the marked-to-market equity curve and the risk metrics, against
+locating each trade's bars by scanning its frame with a boolean mask.
+
+Run from the repository root:
+    python benchmarks/bench_trade_excursions.py
+"""
+
+import numpy as np
+import pandas as pd
+from common import synthetic_bars, timeit
+
+from backtesting.trade_analyzer import TradeAnalyzer
+
+N_TICKERS = 10
+N_DAYS = 250
+TRADES_PER_TICKER = 2000
+SCANNED_TRADES = 200
+
+
+def ticker_data(seed):
+    """One year of bars with 'DateTime', and random round trips on them."""
+    bars = synthetic_bars(n_days=N_DAYS, seed=seed)
+    bars["DateTime"] = pd.to_datetime(bars["Date"].str[:17], format="%Y%m%d %H:%M:%S")
+    rng = np.random.default_rng(seed)
+    entries = np.sort(rng.choice(len(bars) - 500, TRADES_PER_TICKER, replace=False))
+    exits = entries + rng.integers(1, 400, len(entries))
+    close, dates = bars["Close"].to_numpy(), bars["Date"].to_numpy()
+    rows = []
+    for entry, exit in zip(entries, exits):
+        rows.append((dates[entry], "BUY", f"T{seed}", close[entry], "EMA"))
+        rows.append((dates[exit], "SELL", f"T{seed}", close[exit], "EMA"))
+    return bars, rows
+
+
+def scan_excursions(analyzer, n):
+    """MAE/MFE of the first ``n`` trades, locating each one's bars with a mask."""
+    out = []
+    for trade in analyzer.trades.head(n).itertuples():
+        df = analyzer.data[trade.reqId]
+        held = (df["DateTime"] > trade.entry_time) & (df["DateTime"] <= trade.exit_time)
+        out.append(
+            (
+                min(df.loc[held, "Low"].min() / trade.entry_price - 1, 0),
+                max(df.loc[held, "High"].max() / trade.entry_price - 1, 0),
+            )
+        )
+    return out
+
+
+if __name__ == "__main__":
+    data, transactions = {}, {}
+    for seed in range(N_TICKERS):
+        data[seed], transactions[seed] = ticker_data(seed)
+    n_bars = sum(len(df) for df in data.values())
+    n_trades = sum(len(rows) for rows in transactions.values()) // 2
+    print(f"{n_bars:,} bars, {n_trades:,} trades over {N_TICKERS} tickers")
+
+    analyzer = TradeAnalyzer(transactions, data)
+    first_time, excursions = timeit(analyzer.calculate_excursions, repeat=1)
+    excursion_time, excursions = timeit(analyzer.calculate_excursions)
+    equity_time, _ = timeit(analyzer.calculate_equity_curve)
+    metrics_time, metrics = timeit(analyzer.calculate_risk_metrics)
+    scan_time, scanned = timeit(scan_excursions, analyzer, SCANNED_TRADES, repeat=1)
+
+    expected = excursions[["mae", "mfe"]].head(SCANNED_TRADES).to_numpy()
+    assert np.allclose(np.array(scanned), expected)
+    print(f"excursions, first call (locates):   {first_time * 1e3:8.1f} ms")
+    print(f"excursions, trades located:         {excursion_time * 1e3:8.1f} ms")
+    print(f"equity curve:                       {equity_time * 1e3:8.1f} ms")
+    print(f"risk metrics (incl. equity curve):  {metrics_time * 1e3:8.1f} ms")
+    print(
+        f"mask scan, {SCANNED_TRADES} trades:              {scan_time * 1e3:8.1f} ms  "
+        f"(~{scan_time / SCANNED_TRADES * n_trades:.1f} s for all)"
+    )
+    print(
+        f"max drawdown {metrics['max_drawdown']:.2%}  sharpe {metrics['sharpe']:.2f}  "
+        f"sortino {metrics['sortino']:.2f}"
+    )
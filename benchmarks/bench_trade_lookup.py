@@ -0,0 +1,64 @@
+"""
+Trade-to-bar lookup in TradeAnalyzer for one ticker with a growing number of trades:
+``plot_trades`` (figure construction; ``show`` is skipped) and
+``analyze_losing_trade_patterns``.
+
+Run from the repository root:
+    python benchmarks/bench_trade_lookup.py
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import plotly.graph_objects as go
+from common import synthetic_bars, timeit
+
+from backtesting.trade_analyzer import TradeAnalyzer
+
+
+def indicator_frame(n_days, seed=0):
+    """Synthetic bars with the columns the loss analysis and the chart read."""
+    rng = np.random.default_rng(seed)
+    df = synthetic_bars(n_days=n_days, seed=seed)
+    n = len(df)
+    df["VWAP"] = df["Close"].rolling(30, min_periods=1).mean()
+    df["RelativeVolume"] = rng.lognormal(0, 1, n)
+    df["Momentum"] = rng.random(n) < 0.5
+    df["PullbackAboveVWAP"] = rng.random(n) < 0.5
+    df["Extended"] = rng.random(n) < 0.2
+    return df
+
+
+def transactions_at(df, n_trades, seed=0):
+    """{reqId: BUY/SELL pairs} at random bars of ``df``, about half of them losers."""
+    rng = np.random.default_rng(seed)
+    bars = np.sort(rng.choice(len(df), 2 * n_trades, replace=False))
+    dates = df["Date"].to_numpy()[bars]
+    close = df["Close"].to_numpy()
+    rows = []
+    for k in range(n_trades):
+        entry, exit = bars[2 * k], bars[2 * k + 1]
+        rows.append((dates[2 * k], "BUY", "SYN", close[entry], "MicroPullback"))
+        rows.append((dates[2 * k + 1], "SELL", "SYN", close[exit], "MicroPullback"))
+    return {1000: rows}
+
+
+def quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+if __name__ == "__main__":
+    go.Figure.show = lambda self, *args, **kwargs: None
+    df = indicator_frame(n_days=20)
+    print(f"{len(df):,} bars (one ticker, 20 days)")
+    print(f"{'trades':>8}{'plot_trades ms':>16}{'loss analysis ms':>18}")
+    for n_trades in (100, 1000, 4000):
+        transactions = transactions_at(df, n_trades)
+        analyzer = TradeAnalyzer(transactions, {1000: df})
+        plot_time, _ = timeit(quiet, analyzer.plot_trades, repeat=1)
+        loss_time, losers = timeit(
+            quiet, analyzer.analyze_losing_trade_patterns, {"SYN": df}, repeat=1
+        )
+        print(f"{n_trades:>8,}{plot_time * 1e3:>16.1f}{loss_time * 1e3:>18.1f}")
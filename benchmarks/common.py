@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# IB extended-hours session for 1 min bars: 04:00 - 20:00 US/Eastern
+SESSION_START = pd.Timedelta(hours=4)
+BARS_PER_DAY = 16 * 60
+
+
+def synthetic_bars(n_days=10, start="2025-01-02", seed=0, bars_per_day=BARS_PER_DAY):
+    """
+    Generate IB-style 1 min bars (random walk prices, lognormal volume) for benchmarking.
+
+    Args:
+        n_days (int, optional): Number of business days to generate. Defaults to 10.
+        start (str, optional): First trading day. Defaults to "2025-01-02".
+        seed (int, optional): Random seed so every run sees the same bars. Defaults to 0.
+        bars_per_day (int, optional): Bars per session. Defaults to the extended-hours count.
+
+    Returns:
+        pd.DataFrame: Frame with the ``Date``, ``Open``, ``High``, ``Low``, ``Close`` and ``Volume``
+            columns produced by ``TradeApp.historicalData``.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start, periods=n_days)
+    offsets = pd.to_timedelta(np.arange(bars_per_day), unit="min") + SESSION_START
+    stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+    n = len(stamps)
+
+    close = 5.0 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.001, (2, n))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    volume = np.round(rng.lognormal(8, 1.5, n))
+
+    dates = pd.DatetimeIndex(stamps).strftime("%Y%m%d %H:%M:%S") + " US/Eastern"
+    return pd.DataFrame(
+        {
+            "Date": np.asarray(dates, dtype=object),
+            "Open": open_,
+            "High": high,
+            "Low": low,
+            "Close": close,
+            "Volume": volume,
+        }
+    )
+
+
+def iter_bar_data(df):
+    """Yield ``ibapi.common.BarData``-like objects for each row of a bar frame."""
+    for date, o, h, l, c, v in zip(
+        df["Date"], df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]
+    ):
+        yield SimpleNamespace(date=date, open=o, high=h, low=l, close=c, volume=v)
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Return the best wall-clock time of ``repeat`` calls and the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
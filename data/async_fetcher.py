@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import time
+
+from data.bar_accumulator import BarAccumulator
+from data.data_fetcher import histData, usTechStk
+
+# IB historical data pacing: at most 60 requests in any 10 minute window and
+# no more than 50 requests outstanding at the same time.
+IB_PACING_REQUESTS = 60
+IB_PACING_WINDOW = 600.0
+IB_MAX_IN_FLIGHT = 50
+
+# Request-level errors worth retrying (pacing violation, inactivity, query errors)
+RETRYABLE_ERROR_CODES = {162, 165, 322, 366}
+# HMDS also answers a query that has no bars with error 162; that is an empty result
+NO_DATA_CODE = 162
+NO_DATA_MESSAGE = "query returned no data"
+
+
+class HistoricalDataError(Exception):
+    """Raised when TWS answers a historical data request with an error."""
+
+    def __init__(self, reqId, code, message):
+        super().__init__(f"reqId {reqId}: error {code} - {message}")
+        self.reqId = reqId
+        self.code = code
+        self.message = message
+
+    @property
+    def no_data(self):
+        """bool: Whether the error only says the query matched no bars."""
+        return self.code == NO_DATA_CODE and NO_DATA_MESSAGE in self.message.lower()
+
+
+class HistoricalDataTimeout(Exception):
+    """Raised when a historical data request gets no answer within its timeout."""
+
+
+class TokenBucket:
+    """
+    Async token bucket used to keep request rates inside IB's pacing limits.
+
+    The bucket starts full with ``capacity`` tokens and refills continuously at
+    ``rate`` tokens per second. Each ``acquire`` consumes one token, sleeping until
+    one is available.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (int): Maximum number of tokens (the allowed burst size).
+            clock (callable, optional): Monotonic clock in seconds. Defaults to time.monotonic.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        # No await between the final check and the decrement, so concurrent
+        # waiters on the same event loop cannot overdraw the bucket.
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class AsyncHistClient:
+    """
+    Asyncio facade over ``histData`` that multiplexes many historical requests.
+
+    Each request gets its own reqId and future. The app's EWrapper callbacks must
+    forward completion and errors to the client, which resolves the matching future
+    from the API thread:
+
+        class TradeApp(EWrapper, EClient):
+            def historicalDataEnd(self, reqId, start, end):
+                ...
+                if self.hist_listener is not None:
+                    self.hist_listener.notify_end(reqId)
+
+            def error(self, reqId, errorCode, errorString, *args):
+                ...
+                if self.hist_listener is not None:
+                    self.hist_listener.notify_error(reqId, errorCode, errorString)
+
+    Completed bars are read from (and removed from) ``app.data[reqId]``, so the app
+    only needs the ``reqHistoricalData``/``cancelHistoricalData`` surface of EClient.
+    """
+
+    def __init__(
+        self,
+        app,
+        first_req_id=50000,
+        max_in_flight=IB_MAX_IN_FLIGHT,
+        pacing_requests=IB_PACING_REQUESTS,
+        pacing_window=IB_PACING_WINDOW,
+        timeout=60.0,
+        retries=2,
+        retry_delay=2.0,
+    ):
+        """
+        Args:
+            app: The EClient/EWrapper application used to send requests.
+            first_req_id (int, optional): First reqId handed out by the client; keep it clear of
+                ids used elsewhere. Defaults to 50000.
+            max_in_flight (int, optional): Maximum simultaneous outstanding requests. Defaults to 50.
+            pacing_requests (int, optional): Requests allowed per pacing window. Defaults to 60.
+            pacing_window (float, optional): Pacing window in seconds. Defaults to 600.
+            timeout (float, optional): Seconds to wait for ``historicalDataEnd``. Defaults to 60.
+            retries (int, optional): Retries after a timeout or retryable error. Defaults to 2.
+            retry_delay (float, optional): Base delay in seconds, doubled per retry. Defaults to 2.
+        """
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._next_req_id = first_req_id
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Pacing state outlives individual event loops so back-to-back fetch_frames
+        # calls still share one request budget.
+        self._bucket = TokenBucket(pacing_requests / pacing_window, pacing_requests)
+        self._in_flight = None
+
+    # --- callbacks, invoked from the API thread ---
+
+    def notify_end(self, reqId):
+        """Resolve the future for ``reqId`` with the bars stored in ``app.data``."""
+        self._resolve(reqId, None)
+
+    def notify_error(self, reqId, errorCode, errorString):
+        """Fail the future for ``reqId``; informational codes and unknown ids are ignored."""
+        if 2100 <= errorCode < 2200:  # warnings and farm status messages
+            return
+        self._resolve(reqId, HistoricalDataError(reqId, errorCode, errorString))
+
+    def _resolve(self, reqId, exc):
+        with self._lock:
+            entry = self._pending.pop(reqId, None)
+        if entry is None:
+            return
+        loop, future = entry
+
+        def settle():
+            if future.done():
+                return
+            if exc is None:
+                future.set_result(reqId)
+            else:
+                future.set_exception(exc)
+
+        loop.call_soon_threadsafe(settle)
+
+    # --- request side ---
+
+    def _slots(self):
+        loop = asyncio.get_running_loop()
+        if self._in_flight is None or self._in_flight[0] is not loop:
+            self._in_flight = (loop, asyncio.Semaphore(self.max_in_flight))
+        return self._in_flight[1]
+
+    def _new_req_id(self):
+        with self._lock:
+            reqId = self._next_req_id
+            self._next_req_id += 1
+            return reqId
+
+    def _discard(self, reqId):
+        with self._lock:
+            self._pending.pop(reqId, None)
+        self.app.data.pop(reqId, None)
+        # Drop any partially accumulated bars left behind by a cancelled request
+        getattr(self.app, "bars", {}).pop(reqId, None)
+
+    async def _request_once(self, contract, endDate, duration, candle_size):
+        loop = asyncio.get_running_loop()
+        reqId = self._new_req_id()
+        future = loop.create_future()
+        with self._lock:
+            self._pending[reqId] = (loop, future)
+
+        histData(self.app, reqId, contract, endDate, duration, candle_size)
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.app.cancelHistoricalData(reqId)
+            self._discard(reqId)
+            raise HistoricalDataTimeout(
+                f"reqId {reqId}: no response for {contract.symbol} within {self.timeout}s"
+            )
+        except HistoricalDataError as e:
+            self._discard(reqId)
+            if e.no_data:
+                return BarAccumulator().to_frame()
+            raise
+        return self.app.data.pop(reqId, None)
+
+    async def fetch(self, contract, endDate, duration, candle_size):
+        """
+        Fetch one contract's bars, honoring pacing, timeouts and retries.
+
+        Args:
+            contract (Contract): The contract to request.
+            endDate (str): End date and time in the format 'YYYYMMDD HH:MM:SS TZ'.
+            duration (str): Duration string (e.g. '5 D').
+            candle_size (str): Bar size (e.g. '1 min').
+
+        Returns:
+            pd.DataFrame or None: The bars delivered by ``historicalData``; an empty
+                frame when HMDS reports that the query returned no data (error 162,
+                which is not retried), or None if the request completed without data.
+
+        Raises:
+            HistoricalDataError: On a non-retryable error or once retries are exhausted.
+            HistoricalDataTimeout: If the last attempt timed out.
+        """
+        for attempt in range(self.retries + 1):
+            async with self._slots():
+                await self._bucket.acquire()
+                try:
+                    return await self._request_once(
+                        contract, endDate, duration, candle_size
+                    )
+                except HistoricalDataError as e:
+                    if e.code not in RETRYABLE_ERROR_CODES or attempt == self.retries:
+                        raise
+                except HistoricalDataTimeout:
+                    if attempt == self.retries:
+                        raise
+            await asyncio.sleep(self.retry_delay * 2**attempt)
+
+    async def fetch_many(self, tickers, endDate, duration, candle_size):
+        """
+        Fetch bars for many tickers concurrently.
+
+        Returns:
+            dict: Mapping of ticker to its DataFrame. Tickers whose request failed or timed
+                out map to None; the failure is printed like other fetch warnings.
+        """
+
+        async def one(ticker):
+            try:
+                return await self.fetch(
+                    usTechStk(ticker), endDate, duration, candle_size
+                )
+            except (HistoricalDataError, HistoricalDataTimeout) as e:
+                print(f"Warning: Fetch failed for {ticker}: {e}")
+                return None
+
+        frames = await asyncio.gather(*(one(ticker) for ticker in tickers))
+        return dict(zip(tickers, frames))
+
+    def fetch_frames(self, tickers, endDate, duration, candle_size):
+        """Blocking wrapper around ``fetch_many`` for synchronous callers such as ``backtest``."""
+        return asyncio.run(self.fetch_many(tickers, endDate, duration, candle_size))
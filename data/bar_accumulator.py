@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+BAR_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class BarAccumulator:
+    """
+    Collects streamed bars into preallocated typed column buffers.
+
+    IB delivers historical data one ``historicalData`` callback per bar. Building a
+    one-row DataFrame and concatenating it onto the running frame copies the whole
+    frame on every bar, so ingestion becomes quadratic in the number of bars. This
+    class appends each bar into NumPy buffers that grow geometrically and builds a
+    single DataFrame only when the request completes.
+    """
+
+    def __init__(self, capacity=1024, growth_factor=2.0):
+        """
+        Initialize an empty accumulator.
+
+        Args:
+            capacity (int, optional): Initial number of rows to preallocate. Defaults to 1024.
+            growth_factor (float, optional): Multiplier applied to the capacity whenever the
+                buffers are full. Defaults to 2.0.
+        """
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        self.growth_factor = growth_factor
+        self._size = 0
+        self._dates = np.empty(max(int(capacity), 1), dtype=object)
+        self._values = np.empty((len(self._dates), len(BAR_COLUMNS)), dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._dates)
+
+    def _grow(self):
+        new_capacity = max(int(self.capacity * self.growth_factor), self.capacity + 1)
+        dates = np.empty(new_capacity, dtype=object)
+        dates[: self._size] = self._dates[: self._size]
+        values = np.empty((new_capacity, len(BAR_COLUMNS)), dtype=np.float64)
+        values[: self._size] = self._values[: self._size]
+        self._dates, self._values = dates, values
+
+    def append(self, bar):
+        """
+        Append one IB ``BarData`` (or any object with the same attributes).
+
+        Args:
+            bar: Object exposing ``date``, ``open``, ``high``, ``low``, ``close`` and ``volume``.
+        """
+        self.append_values(bar.date, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+    def append_values(self, date, open_, high, low, close, volume):
+        """Append one bar given its raw field values."""
+        if self._size == self.capacity:
+            self._grow()
+        i = self._size
+        self._dates[i] = date
+        row = self._values[i]
+        row[0] = open_
+        row[1] = high
+        row[2] = low
+        row[3] = close
+        # ibapi reports volume as a Decimal; store it as float like the strategies expect
+        row[4] = float(volume)
+        self._size = i + 1
+
+    def to_frame(self):
+        """
+        Materialize the accumulated bars.
+
+        Returns:
+            pd.DataFrame: A frame with ``Date``, ``Open``, ``High``, ``Low``, ``Close`` and
+                ``Volume`` columns and a default RangeIndex.
+        """
+        n = self._size
+        frame = {"Date": self._dates[:n].copy()}
+        for j, column in enumerate(BAR_COLUMNS):
+            frame[column] = self._values[:n, j].copy()
+        return pd.DataFrame(frame)
+
+    def clear(self):
+        """Drop all accumulated bars while keeping the allocated buffers."""
+        self._dates[: self._size] = None
+        self._size = 0
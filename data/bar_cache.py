@@ -0,0 +1,213 @@
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+try:
+    import pandas_market_calendars as mcal
+except ImportError:  # fall back to weekdays; holidays are recorded as empty days
+    mcal = None
+
+BAR_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+# IB extended hours end at 20:00 US/Eastern; a day is final once that has passed.
+SESSION_CLOSE = pd.Timedelta(hours=20)
+EXCHANGE_TZ = "US/Eastern"
+
+
+def trading_days(end_day, count):
+    """
+    Return the ``count`` trading days ending at ``end_day`` (inclusive), oldest first.
+
+    Uses the NYSE calendar from ``pandas_market_calendars`` when it is installed and
+    plain weekdays otherwise.
+    """
+    end_day = pd.Timestamp(end_day).normalize()
+    start = end_day - pd.Timedelta(days=2 * count + 10)
+    if mcal is not None:
+        days = mcal.get_calendar("NYSE").valid_days(start, end_day).tz_localize(None)
+    else:
+        days = pd.bdate_range(start, end_day)
+    return [day.strftime("%Y%m%d") for day in days[-count:]]
+
+
+def parse_duration_days(duration):
+    """Convert an IB duration string in days or weeks ('5 D', '2 W') to trading days."""
+    value, unit = duration.split()
+    if unit == "D":
+        return int(value)
+    if unit == "W":
+        return int(value) * 5
+    return None
+
+
+class BarCache:
+    """
+    Persistent on-disk cache of historical bars in front of a historical data client.
+
+    Bars are stored as Parquet partitions laid out as
+    ``<root>/<symbol>/<bar size>/<YYYYMMDD>.parquet``, one file per trading day. A
+    request is answered from disk when every trading day it covers is present;
+    otherwise only the missing days are fetched from the wrapped client, grouped
+    into one request per contiguous range, and written back.
+
+    Days that are still trading (today before the extended session closes) are never
+    written, and any partition already stored for such a day is discarded, so a
+    partial session is always refetched. Days that come back without bars inside an
+    otherwise successful fetch (holidays, halted symbols) are stored as empty
+    partitions so they are not requested again.
+
+    The cache exposes the same ``fetch_frames`` method as ``AsyncHistClient`` and can be
+    passed to ``backtest()`` as its ``client``.
+    """
+
+    def __init__(self, client, root="data/cache"):
+        """
+        Args:
+            client: Object with ``fetch_frames(tickers, endDate, duration, candle_size)``
+                returning a dict of ticker to DataFrame, e.g. ``AsyncHistClient``.
+            root (str, optional): Directory holding the Parquet partitions. Defaults to "data/cache".
+        """
+        self.client = client
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self.day_hits = 0
+        self.day_misses = 0
+
+    @property
+    def stats(self):
+        """dict: Request-level and day-level hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "day_hits": self.day_hits,
+            "day_misses": self.day_misses,
+        }
+
+    def _path(self, ticker, candle_size, day):
+        return os.path.join(
+            self.root, ticker, candle_size.replace(" ", "_"), f"{day}.parquet"
+        )
+
+    @staticmethod
+    def _is_final(day, now=None):
+        now = now or pd.Timestamp.now(tz=EXCHANGE_TZ).tz_localize(None)
+        return now >= pd.Timestamp(day) + SESSION_CLOSE
+
+    def _has_day(self, ticker, candle_size, day):
+        path = self._path(ticker, candle_size, day)
+        if not os.path.exists(path):
+            return False
+        if not self._is_final(day):
+            os.remove(path)  # stale partial session
+            return False
+        return True
+
+    def _read_day(self, ticker, candle_size, day):
+        return pd.read_parquet(self._path(ticker, candle_size, day))
+
+    def _write_days(self, ticker, candle_size, days, bars):
+        """Split fetched bars by trading date and store each finished day."""
+        if bars is None:  # failed request; leave the days missing so they are retried
+            return
+        bar_days = bars["Date"].astype(str).str[:8]
+        for day in days:
+            if not self._is_final(day):
+                continue
+            path = self._path(ticker, candle_size, day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            day_bars = bars.loc[bar_days == day, BAR_COLUMNS].reset_index(drop=True)
+            day_bars.to_parquet(path, index=False)
+
+    @staticmethod
+    def _contiguous_ranges(covered, missing):
+        """Group missing days into runs that are contiguous in the covered day list."""
+        positions = {day: i for i, day in enumerate(covered)}
+        ranges = []
+        for day in missing:
+            if ranges and positions[day] == positions[ranges[-1][-1]] + 1:
+                ranges[-1].append(day)
+            else:
+                ranges.append([day])
+        return ranges
+
+    def fetch_frames(self, tickers, endDate, duration, candle_size):
+        """
+        Fetch bars for many tickers, serving whatever is already on disk.
+
+        Args:
+            tickers (list): Ticker symbols.
+            endDate (str): End date and time in the format 'YYYYMMDD HH:MM:SS TZ' (or '' for now).
+            duration (str): IB duration string. Only day and week durations are cached;
+                anything else is passed straight to the client.
+            candle_size (str): Bar size (e.g. '1 min').
+
+        Returns:
+            dict: Mapping of ticker to its DataFrame, or None if no bars are available.
+        """
+        n_days = parse_duration_days(duration)
+        if n_days is None:
+            self.misses += len(tickers)
+            return self.client.fetch_frames(tickers, endDate, duration, candle_size)
+
+        end_day = (
+            endDate[:8]
+            if endDate
+            else pd.Timestamp.now(tz=EXCHANGE_TZ).strftime("%Y%m%d")
+        )
+        covered = trading_days(end_day, n_days)
+
+        # (range end day, range length) -> tickers needing that range
+        requests = defaultdict(list)
+        for ticker in tickers:
+            missing = [
+                day for day in covered if not self._has_day(ticker, candle_size, day)
+            ]
+            self.day_hits += len(covered) - len(missing)
+            self.day_misses += len(missing)
+            if missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+            for days in self._contiguous_ranges(covered, missing):
+                requests[(days[-1], len(days))].append(ticker)
+
+        # Bars for days that cannot be stored yet (today's session) are served from the fetch
+        volatile = defaultdict(list)
+        for (last_day, length), range_tickers in requests.items():
+            if last_day == end_day and endDate:
+                range_end = endDate
+            else:
+                range_end = f"{last_day} 23:59:59 {EXCHANGE_TZ}"
+            frames = self.client.fetch_frames(
+                range_tickers, range_end, f"{length} D", candle_size
+            )
+            stop = covered.index(last_day) + 1
+            days = covered[stop - length : stop]
+            for ticker, bars in frames.items():
+                self._write_days(ticker, candle_size, days, bars)
+                if bars is None or bars.empty:
+                    continue
+                open_days = [day for day in days if not self._is_final(day)]
+                if open_days:
+                    bar_days = bars["Date"].astype(str).str[:8]
+                    volatile[ticker].append(bars[bar_days.isin(open_days)])
+
+        results = {}
+        for ticker in tickers:
+            parts = [
+                self._read_day(ticker, candle_size, day)
+                for day in covered
+                if self._is_final(day)
+                and os.path.exists(self._path(ticker, candle_size, day))
+            ]
+            parts = [part for part in parts + volatile[ticker] if not part.empty]
+            if not parts:
+                results[ticker] = None
+                continue
+            bars = pd.concat(parts, ignore_index=True)
+            results[ticker] = bars.sort_values("Date", kind="stable").reset_index(
+                drop=True
+            )
+        return results
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from indicators.panel import session_vwap
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class Panel:
+    """
+    Bars for many tickers aligned on one timeline as (time x ticker) float64 arrays.
+
+    Rows are the union of every ticker's bar timestamps, columns are tickers, and NaN
+    marks a timestamp a ticker has no bar for. Strategy code written against these
+    arrays evaluates a whole universe in a handful of vectorized calls instead of one
+    pandas pass per ticker.
+    """
+
+    def __init__(self, index, tickers, open_, high, low, close, volume, vwap=None):
+        """
+        Args:
+            index (pd.DatetimeIndex): Bar timestamps (rows), ascending.
+            tickers (list): Ticker symbols (columns).
+            open_, high, low, close, volume (np.ndarray): (time x ticker) arrays.
+            vwap (np.ndarray, optional): Session VWAP; computed on first use when None.
+        """
+        self.index = index
+        self.tickers = list(tickers)
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self._vwap = vwap
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Align per-ticker bar frames into a panel.
+
+        Args:
+            frames (dict): Mapping of ticker to a bar DataFrame with OHLCV columns and
+                either 'DateTime' or IB 'Date' strings. A 'VWAP' column is used when every
+                frame has one.
+
+        Raises:
+            ValueError: If a frame has duplicate timestamps.
+        """
+        parts = {}
+        for ticker, df in frames.items():
+            if "DateTime" in df.columns:
+                stamps = pd.DatetimeIndex(df["DateTime"])
+            else:
+                stamps = pd.DatetimeIndex(
+                    pd.to_datetime(
+                        df["Date"].astype(str).str[:17], format="%Y%m%d %H:%M:%S"
+                    )
+                )
+            if stamps.has_duplicates:
+                raise ValueError(f"{ticker}: duplicate bar timestamps")
+            columns = list(FIELDS) + (["VWAP"] if "VWAP" in df.columns else [])
+            parts[ticker] = df[columns].set_axis(stamps, axis=0)
+
+        wide = pd.concat(parts, axis=1).sort_index()
+        arrays = {
+            field: wide.xs(field, axis=1, level=1).to_numpy(dtype=np.float64)
+            for field in FIELDS
+        }
+        vwap = None
+        if all("VWAP" in part.columns for part in parts.values()):
+            vwap = wide.xs("VWAP", axis=1, level=1).to_numpy(dtype=np.float64)
+        return cls(
+            wide.index,
+            list(parts),
+            arrays["Open"],
+            arrays["High"],
+            arrays["Low"],
+            arrays["Close"],
+            arrays["Volume"],
+            vwap,
+        )
+
+    @property
+    def shape(self):
+        return self.close.shape
+
+    @property
+    def present(self):
+        """np.ndarray: True where a ticker has a bar."""
+        return ~np.isnan(self.close)
+
+    @property
+    def sessions(self):
+        """np.ndarray: Integer trading-day code per row."""
+        return self.index.values.astype("datetime64[D]").view(np.int64)
+
+    @property
+    def vwap(self):
+        """np.ndarray: Daily session VWAP, as ``compute_session_vwap`` computes it."""
+        if self._vwap is None:
+            self._vwap = session_vwap(
+                self.sessions, self.high, self.low, self.close, self.volume
+            )
+        return self._vwap
+
+    def frame(self, values):
+        """Wrap a (time x ticker) array as a DataFrame indexed by timestamp."""
+        return pd.DataFrame(values, index=self.index, columns=self.tickers)
+
+    def to_frames(self, **columns):
+        """
+        Split (time x ticker) arrays back into one frame per ticker.
+
+        Args:
+            **columns: Output column name to (time x ticker) array.
+
+        Returns:
+            dict: Mapping of ticker to a DataFrame with 'DateTime' and the given columns,
+                holding only the rows where the ticker has a bar.
+        """
+        present = self.present
+        frames = {}
+        for col, ticker in enumerate(self.tickers):
+            rows = present[:, col]
+            data = {"DateTime": self.index[rows]}
+            for name, values in columns.items():
+                data[name] = values[rows, col]
+            frames[ticker] = pd.DataFrame(data)
+        return frames
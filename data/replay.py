@@ -0,0 +1,320 @@
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from ibapi.common import BarData
+
+from data.bar_accumulator import BarAccumulator
+from data.bar_cache import EXCHANGE_TZ
+
+# Regular trading hours used when a request asks for useRTH=1
+RTH_START = "09:30:00"
+RTH_END = "16:00:00"
+# IB duration units counted on the clock rather than in trading days -> DateOffset unit
+DURATION_OFFSETS = {"S": "seconds", "M": "months", "Y": "years"}
+
+
+class ReplaySource:
+    """
+    Recorded bars keyed by symbol, loaded from DataFrames, flat files or a ``BarCache`` root.
+
+    Every frame uses the ``Date``/``Open``/``High``/``Low``/``Close``/``Volume`` layout
+    produced by ``TradeApp.historicalData``, with IB date strings such as
+    ``'20250416 09:30:00 US/Eastern'``.
+    """
+
+    def __init__(self, frames):
+        """
+        Args:
+            frames (dict): Mapping of symbol to a bar DataFrame.
+        """
+        self.frames = {
+            symbol: df.sort_values("Date", kind="stable").reset_index(drop=True)
+            for symbol, df in frames.items()
+        }
+
+    @classmethod
+    def from_files(cls, paths):
+        """
+        Load one file per symbol; the file name (without extension) is the symbol.
+
+        Args:
+            paths (list or str): Parquet/CSV paths, or a directory containing them.
+        """
+        if isinstance(paths, str):
+            paths = sorted(
+                glob.glob(os.path.join(paths, "*.parquet"))
+                + glob.glob(os.path.join(paths, "*.csv"))
+            )
+        frames = {}
+        for path in paths:
+            symbol, ext = os.path.splitext(os.path.basename(path))
+            if ext == ".parquet":
+                frames[symbol] = pd.read_parquet(path)
+            else:
+                frames[symbol] = pd.read_csv(path, dtype={"Date": str})
+        return cls(frames)
+
+    @classmethod
+    def from_cache(cls, root, candle_size="1 min"):
+        """Load every symbol stored by a ``BarCache`` rooted at ``root`` for one bar size."""
+        frames = {}
+        for symbol in sorted(os.listdir(root)):
+            days = sorted(
+                glob.glob(
+                    os.path.join(
+                        root, symbol, candle_size.replace(" ", "_"), "*.parquet"
+                    )
+                )
+            )
+            parts = [pd.read_parquet(path) for path in days]
+            parts = [part for part in parts if not part.empty]
+            if parts:
+                frames[symbol] = pd.concat(parts, ignore_index=True)
+        return cls(frames)
+
+    def bars(self, symbol, endDateTime="", durationStr="", useRTH=0):
+        """
+        Select the bars an IB historical request would return.
+
+        Args:
+            symbol (str): Ticker symbol.
+            endDateTime (str, optional): 'YYYYMMDD HH:MM:SS TZ'; empty means the end of the recording.
+            durationStr (str, optional): '<n> <unit>' with an IB unit: 'D' (trading
+                days in the recording), 'W' (five trading days each), or 'S', 'M' and
+                'Y' (seconds, calendar months and years back from the end). Empty
+                means everything before the end.
+            useRTH (int, optional): 1 to keep only regular trading hours. Defaults to 0.
+
+        Raises:
+            ValueError: If ``durationStr`` is not a count followed by one of those units.
+
+        Returns:
+            pd.DataFrame: The selected bars (empty if the symbol is unknown).
+        """
+        df = self.frames.get(symbol)
+        if df is None:
+            return pd.DataFrame(
+                columns=["Date", "Open", "High", "Low", "Close", "Volume"]
+            )
+
+        stamps = df["Date"].astype(str).str[:17]
+        mask = np.ones(len(df), dtype=bool)
+        if endDateTime:
+            mask &= (stamps <= endDateTime[:17]).to_numpy()
+        if durationStr:
+            value, unit = durationStr.split()
+            if unit in ("D", "W"):
+                n_days = int(value) * (5 if unit == "W" else 1)
+                days = stamps.str[:8]
+                keep = np.sort(days[mask].unique())[-n_days:]
+                mask &= days.isin(keep).to_numpy()
+            elif unit in DURATION_OFFSETS:
+                times = pd.to_datetime(stamps, format="%Y%m%d %H:%M:%S")
+                end = pd.Timestamp(endDateTime[:17]) if endDateTime else times.max()
+                start = end - pd.DateOffset(**{DURATION_OFFSETS[unit]: int(value)})
+                mask &= (times > start).to_numpy()
+            else:
+                raise ValueError(f"Unsupported duration unit in {durationStr!r}")
+        if useRTH:
+            clock = stamps.str[9:17]
+            mask &= ((clock >= RTH_START) & (clock < RTH_END)).to_numpy()
+        return df[mask].reset_index(drop=True)
+
+
+def _bar_data(date, open_, high, low, close, volume):
+    bar = BarData()
+    bar.date = date
+    bar.open = open_
+    bar.high = high
+    bar.low = low
+    bar.close = close
+    bar.volume = volume
+    return bar
+
+
+def _epoch_seconds(dates):
+    stamps = pd.to_datetime(dates.astype(str).str[:17], format="%Y%m%d %H:%M:%S")
+    return (stamps.dt.tz_localize(EXCHANGE_TZ).astype("int64") // 10**9).to_numpy()
+
+
+class ReplayClient:
+    """
+    Network-free stand-in for ``EClient`` that replays recorded bars.
+
+    It implements the EClient surface the backtests use: ``reqHistoricalData``
+    answers through the wrapper's ``historicalData``/``historicalDataEnd`` callbacks
+    (and ``historicalDataUpdate`` for ``keepUpToDate`` requests), and
+    ``reqRealTimeBars`` streams ``realtimeBar`` callbacks. Connection methods are
+    no-ops so scripts written for TWS run unchanged.
+
+    With ``speed=None`` everything is delivered at maximum speed: historical requests
+    complete synchronously inside ``reqHistoricalData``, which makes runs
+    deterministic. With a numeric ``speed`` streamed bars are paced on a background
+    thread at ``speed`` times wall-clock (``speed=60`` plays one minute per second).
+    """
+
+    def __init__(self, wrapper, source, speed=None):
+        """
+        Args:
+            wrapper: Object receiving the EWrapper callbacks (usually ``self``).
+            source (ReplaySource): The recorded bars.
+            speed (float, optional): Wall-clock multiplier for streamed bars; None replays
+                at maximum speed. Defaults to None.
+        """
+        self.wrapper = wrapper
+        self.source = source
+        self.speed = speed
+        self._streams = {}
+
+    # --- connection surface ---
+
+    def connect(self, host="127.0.0.1", port=7497, clientId=0):
+        pass
+
+    def run(self):
+        pass
+
+    def isConnected(self):
+        return True
+
+    def disconnect(self):
+        self.cancelAll()
+
+    # --- historical data ---
+
+    def reqHistoricalData(
+        self,
+        reqId,
+        contract,
+        endDateTime,
+        durationStr,
+        barSizeSetting,
+        whatToShow,
+        useRTH,
+        formatDate,
+        keepUpToDate,
+        chartOptions,
+    ):
+        df = self.source.bars(contract.symbol, endDateTime, durationStr, useRTH)
+        rows = zip(
+            df["Date"], df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]
+        )
+        for row in rows:
+            self.wrapper.historicalData(reqId, _bar_data(*row))
+        start = df["Date"].iloc[0] if len(df) else ""
+        end = df["Date"].iloc[-1] if len(df) else ""
+        self.wrapper.historicalDataEnd(reqId, start, end)
+
+        if keepUpToDate:
+            later = self.source.bars(contract.symbol, useRTH=useRTH)
+            later = later[later["Date"].astype(str) > str(end)]
+            self._stream(reqId, later, self._emit_update)
+
+    def cancelHistoricalData(self, reqId):
+        self._stop(reqId)
+
+    # --- real-time bars ---
+
+    def reqRealTimeBars(
+        self, reqId, contract, barSize, whatToShow, useRTH, realTimeBarsOptions
+    ):
+        self._stream(
+            reqId, self.source.bars(contract.symbol, useRTH=useRTH), self._emit_realtime
+        )
+
+    def cancelRealTimeBars(self, reqId):
+        self._stop(reqId)
+
+    def cancelAll(self):
+        for reqId in list(self._streams):
+            self._stop(reqId)
+
+    # --- streaming ---
+
+    def _emit_update(self, reqId, epoch, row):
+        self.wrapper.historicalDataUpdate(reqId, _bar_data(*row))
+
+    def _emit_realtime(self, reqId, epoch, row):
+        date, open_, high, low, close, volume = row
+        wap = (high + low + close) / 3
+        self.wrapper.realtimeBar(
+            reqId, int(epoch), open_, high, low, close, volume, wap, 0
+        )
+
+    def _stream(self, reqId, df, emit):
+        epochs = _epoch_seconds(df["Date"]) if len(df) else np.empty(0, dtype=np.int64)
+        rows = list(
+            zip(
+                df["Date"], df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]
+            )
+        )
+        if self.speed is None:
+            for epoch, row in zip(epochs, rows):
+                emit(reqId, epoch, row)
+            return
+
+        stop = threading.Event()
+
+        def play():
+            started = time.monotonic()
+            for epoch, row in zip(epochs, rows):
+                delay = (epoch - epochs[0]) / self.speed - (time.monotonic() - started)
+                if stop.wait(max(delay, 0)):
+                    return
+                emit(reqId, epoch, row)
+
+        thread = threading.Thread(target=play, daemon=True)
+        self._streams[reqId] = (stop, thread)
+        thread.start()
+
+    def _stop(self, reqId):
+        stream = self._streams.pop(reqId, None)
+        if stream is not None:
+            stream[0].set()
+
+
+class ReplayApp(ReplayClient):
+    """
+    Drop-in replacement for the backtesting ``TradeApp`` backed by recorded bars.
+
+    Collects ``historicalData`` bars with a ``BarAccumulator`` into ``data[reqId]`` and
+    signals ``ticker_event`` on ``historicalDataEnd``, so it can be passed straight to
+    any ``backtest(selected_stocks, app, ticker_event)``. Like ``TradeApp`` it forwards
+    ``historicalDataEnd`` and ``error`` to ``hist_listener`` (an ``AsyncHistClient``).
+    """
+
+    def __init__(self, source, ticker_event=None, speed=None):
+        super().__init__(self, source, speed=speed)
+        self.data = {}
+        self.bars = {}
+        self.realtime = {}
+        self.hist_listener = None
+        self.ticker_event = ticker_event or threading.Event()
+
+    def historicalData(self, reqId, bar):
+        if reqId not in self.bars:
+            self.bars[reqId] = BarAccumulator()
+        self.bars[reqId].append(bar)
+
+    def historicalDataEnd(self, reqId, start, end):
+        if reqId in self.bars:
+            self.data[reqId] = self.bars.pop(reqId).to_frame()
+        if self.hist_listener is not None:
+            self.hist_listener.notify_end(reqId)
+        self.ticker_event.set()
+
+    def error(self, reqId, errorCode, errorString, *args):
+        if self.hist_listener is not None:
+            self.hist_listener.notify_error(reqId, errorCode, errorString)
+
+    def historicalDataUpdate(self, reqId, bar):
+        pass
+
+    def realtimeBar(self, reqId, time, open_, high, low, close, volume, wap, count):
+        if reqId not in self.realtime:
+            self.realtime[reqId] = BarAccumulator()
+        self.realtime[reqId].append_values(time, open_, high, low, close, volume)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("Open", "High", "Low", "Close", "VWAP")
+# Bits available in the packed flag column
+MAX_FLAGS = 64
+
+
+def _flag_dtype(n_flags):
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_flags <= np.iinfo(dtype).bits:
+            return dtype
+    raise ValueError(f"at most {MAX_FLAGS} flags can be packed")
+
+
+def pack_flags(df, flags):
+    """
+    Pack boolean columns into one unsigned integer per row.
+
+    Args:
+        df (pd.DataFrame): Frame holding the ``flags`` columns.
+        flags (list): Boolean column names; the k-th becomes bit k.
+
+    Raises:
+        ValueError: If more than ``MAX_FLAGS`` flags are given.
+
+    Returns:
+        np.ndarray: Bitmasks of the smallest unsigned dtype that holds every flag.
+    """
+    dtype = _flag_dtype(len(flags))
+    packed = np.zeros(len(df), dtype=dtype)
+    for bit, column in enumerate(flags):
+        packed |= df[column].to_numpy(dtype=bool).astype(dtype) << dtype(bit)
+    return packed
+
+
+def unpack_flags(packed, flags):
+    """
+    Boolean arrays of bitmasks written by ``pack_flags``.
+
+    Args:
+        packed (array-like): Bitmasks, e.g. the 'Flags' column of a compact frame.
+        flags (list): Flag names in the order they were packed.
+
+    Returns:
+        dict: Flag name to bool array.
+    """
+    packed = np.asarray(packed)
+    return {
+        column: (packed >> packed.dtype.type(bit)) & 1 == 1
+        for bit, column in enumerate(flags)
+    }
+
+
+def compact_frame(df, columns=(), flags=()):
+    """
+    Copy of a bar frame reduced to declared columns in a compact schema.
+
+    The schema is float32 prices ('Open', 'High', 'Low', 'Close', 'VWAP'), uint32
+    'Volume' (rounded; missing and negative volumes stored as 0), 'DateTime' as
+    datetime64[ns] (an int64 epoch in nanoseconds) in place of the IB 'Date' string,
+    the ``flags`` bit-packed into one 'Flags' column, and ``columns`` (float64 ones as
+    float32, anything else as it is). Every other column is dropped.
+
+    Args:
+        df (pd.DataFrame): Bars with 'DateTime', OHLCV and optionally 'VWAP'.
+        columns (list, optional): Further columns to keep. Defaults to none.
+        flags (list, optional): Boolean columns to pack; the k-th becomes bit k of
+            'Flags' (see ``unpack_flags``). Defaults to none.
+
+    Returns:
+        pd.DataFrame: Compact frame with the index of ``df``.
+    """
+    out = {"DateTime": df["DateTime"].to_numpy(dtype="datetime64[ns]")}
+    for column in PRICE_COLUMNS:
+        if column in df.columns:
+            out[column] = df[column].to_numpy(dtype=np.float32)
+    volume = np.rint(np.nan_to_num(df["Volume"].to_numpy(dtype=np.float64)))
+    out["Volume"] = np.clip(volume, 0, np.iinfo(np.uint32).max).astype(np.uint32)
+    for column in columns:
+        values = df[column].to_numpy()
+        out[column] = (
+            values.astype(np.float32) if values.dtype == np.float64 else values
+        )
+    if flags:
+        out["Flags"] = pack_flags(df, flags)
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,301 @@
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import ta
+
+from indicators.ema import ema_bank, t3
+from indicators.regression import rolling_slope
+
+BASE_COLUMNS = ("Open", "High", "Low", "Close", "Volume", "VWAP")
+
+
+def _rsi_simple(close, window):
+    # Rolling-mean RSI used by compute_breakout_signal
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(window).mean()
+    loss = -delta.clip(upper=0).rolling(window).mean()
+    rs = gain / (loss + 1e-10)
+    return 100 - (100 / (1 + rs))
+
+
+def _true_range(high, low, close):
+    return pd.concat(
+        [high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1
+    ).max(axis=1)
+
+
+class FeatureStore:
+    """
+    Memoizing store of indicator series for one ticker's bars.
+
+    Strategies ask the store for features instead of recomputing them, so an
+    indicator requested by several strategies in the same run (80-bar average volume,
+    20-bar Bollinger statistics, ATR/RSI/ADX variants, ...) is computed once. Features
+    are keyed by (indicator, params, source), where the source is either a base column
+    name or the identity of another feature returned by the store, so chained features
+    such as an EMA of an EMA are memoized too.
+
+    Every returned Series is shared between callers and must be treated as read-only;
+    ``values`` hands out base columns and features as read-only NumPy arrays, which is
+    what the array-level strategy functions (``*_outputs``) compute from.
+    """
+
+    def __init__(self, df, columns=BASE_COLUMNS):
+        """
+        Args:
+            df (pd.DataFrame): Bars for one ticker. Base columns are captured at construction,
+                so build a new store whenever the bars change.
+            columns (tuple, optional): Base columns exposed by name. Missing columns are
+                skipped. Defaults to OHLCV plus VWAP.
+        """
+        self.index = df.index
+        self._columns = {col: df[col] for col in columns if col in df.columns}
+        self._cache = {}
+        self._keys = {}  # id(feature series) -> cache key
+        self._cost = {}
+        self._hits = defaultdict(int)
+
+    def matches(self, df):
+        """
+        Whether features from this store were computed from the bars in ``df``.
+
+        The index must be equal and every base column of the store must be present in
+        ``df`` and hold the same values: the same array, or a copy of it such as the
+        one ``pd.concat`` makes when strategy columns are attached. Bars with the same
+        index but different prices do not match.
+        """
+        if not self.index.equals(df.index):
+            return False
+        for col, series in self._columns.items():
+            if col not in df.columns:
+                return False
+            values, base = df[col].to_numpy(), series.to_numpy()
+            if values is not base and not np.array_equal(values, base, equal_nan=True):
+                return False
+        return True
+
+    # --- core ---
+
+    def _source_key(self, source):
+        if isinstance(source, str):
+            return source
+        key = self._keys.get(id(source))
+        if key is None:
+            raise ValueError("source must be a column name or a series from this store")
+        return key
+
+    def _resolve(self, source):
+        if isinstance(source, str):
+            return self._columns[source]
+        return source
+
+    def get(self, name, sources, params, compute):
+        """
+        Return the memoized feature, computing it on the first request.
+
+        Args:
+            name (str): Indicator name.
+            sources (tuple): Column names or store-returned series the feature is derived from.
+            params (tuple): Hashable indicator parameters.
+            compute (callable): Called with the resolved source series to build the feature.
+
+        Returns:
+            pd.Series: The feature.
+        """
+        key = (name, tuple(self._source_key(s) for s in sources), params)
+        if key in self._cache:
+            self._hits[key] += 1
+            return self._cache[key]
+
+        start = time.perf_counter()
+        series = compute(*(self._resolve(s) for s in sources))
+        self._store(key, series, time.perf_counter() - start)
+        return series
+
+    def _store(self, key, series, cost):
+        self._cost[key] = cost
+        self._cache[key] = series
+        self._keys[id(series)] = key
+
+    def entries(self):
+        """dict: Cache key -> feature, for everything computed so far."""
+        return dict(self._cache)
+
+    def seed(self, key, series):
+        """
+        Store a feature computed elsewhere (e.g. in another process) under a key from
+        ``entries``. Requests for it are hits from then on; it costs nothing.
+        """
+        self._store(key, series, 0.0)
+
+    # --- features ---
+
+    def column(self, name):
+        return self._columns[name]
+
+    def values(self, source):
+        """Read-only NumPy view of a base column or of a feature from this store."""
+        values = self._resolve(source).to_numpy()
+        if values.flags.writeable:
+            values = values.view()
+            values.flags.writeable = False
+        return values
+
+    def range(self):
+        """High - Low."""
+        return self.get("range", ("High", "Low"), (), lambda h, l: h - l)
+
+    def typical_price(self):
+        """(High + Low + Close) / 3."""
+        return self.get(
+            "typical_price",
+            ("High", "Low", "Close"),
+            (),
+            lambda h, l, c: (h + l + c) / 3,
+        )
+
+    def true_range(self):
+        """True range with the first bar falling back to High - Low."""
+        return self.get("true_range", ("High", "Low", "Close"), (), _true_range)
+
+    def shift(self, source, periods=1):
+        return self.get("shift", (source,), (periods,), lambda s: s.shift(periods))
+
+    def diff(self, source, periods=1):
+        return self.get("diff", (source,), (periods,), lambda s: s.diff(periods))
+
+    def ema(self, source, span, adjust=False):
+        return self.emas(source, (span,), adjust)[0]
+
+    def emas(self, source, spans, adjust=False):
+        """
+        EMA ribbon: the EMAs of ``source`` for each span, as a list of Series.
+
+        Spans not cached yet are computed together in one ``ema_bank`` call and then
+        memoized individually, so ``ema(source, span)`` hits the same entries.
+        """
+        keys = [("ema", (self._source_key(source),), (span, adjust)) for span in spans]
+        missing = [span for span, key in zip(spans, keys) if key not in self._cache]
+        if missing:
+            start = time.perf_counter()
+            values = ema_bank(self._resolve(source).to_numpy(), missing, adjust)
+            cost = (time.perf_counter() - start) / len(missing)
+            for k, span in enumerate(missing):
+                series = pd.Series(values[:, k], index=self.index)
+                self._store(("ema", keys[0][1], (span, adjust)), series, cost)
+        result = []
+        for span, key in zip(spans, keys):
+            if span not in missing:
+                self._hits[key] += 1
+            result.append(self._cache[key])
+        return result
+
+    def t3(self, source, length, vfactor=0.7):
+        """Tillson T3 moving average (six cascaded EMAs of ``length``)."""
+        return self.get(
+            "t3",
+            (source,),
+            (length, vfactor),
+            lambda s: pd.Series(t3(s.to_numpy(), (length,), vfactor)[:, 0], s.index),
+        )
+
+    def rolling(self, source, window, how="mean"):
+        """Rolling ``how`` ('mean', 'sum', 'std', 'max', 'min', 'median') over ``window`` bars."""
+        return self.get(
+            f"rolling_{how}",
+            (source,),
+            (window,),
+            lambda s: getattr(s.rolling(window=window), how)(),
+        )
+
+    def slope(self, source, window):
+        """Rolling linear-regression slope against bar position."""
+        return self.get(
+            "slope", (source,), (window,), lambda s: rolling_slope(s, window)
+        )
+
+    def median(self, source):
+        return self.get("median", (source,), (), lambda s: s.median())
+
+    def rsi(self, window=14):
+        """``ta`` RSI (Wilder smoothing) of Close."""
+        return self.get(
+            "rsi",
+            ("Close",),
+            (window,),
+            lambda c: ta.momentum.RSIIndicator(c, window=window).rsi(),
+        )
+
+    def rsi_simple(self, window=14):
+        """RSI from rolling means of gains and losses, as in ``compute_breakout_signal``."""
+        return self.get(
+            "rsi_simple", ("Close",), (window,), lambda c: _rsi_simple(c, window)
+        )
+
+    def atr(self, window=14):
+        """``ta`` average true range (Wilder smoothing)."""
+        return self.get(
+            "atr",
+            ("High", "Low", "Close"),
+            (window,),
+            lambda h, l, c: ta.volatility.AverageTrueRange(
+                h, l, c, window=window
+            ).average_true_range(),
+        )
+
+    def adx(self, window=14):
+        """``ta`` average directional index."""
+        return self.get(
+            "adx",
+            ("High", "Low", "Close"),
+            (window,),
+            lambda h, l, c: ta.trend.ADXIndicator(h, l, c, window=window).adx(),
+        )
+
+    # --- reporting ---
+
+    @property
+    def hits(self):
+        return sum(self._hits.values())
+
+    @property
+    def misses(self):
+        return len(self._cache)
+
+    @property
+    def saved_time(self):
+        """float: Seconds of recomputation avoided by cache hits."""
+        return sum(self._cost[key] * hits for key, hits in self._hits.items())
+
+    def report(self):
+        """
+        Summarize cache usage per indicator.
+
+        Returns:
+            pd.DataFrame: One row per indicator with hits, misses (distinct computations),
+                the time spent computing it and the time saved by cache hits.
+        """
+        stats = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "compute": 0.0, "saved": 0.0}
+        )
+        for key, cost in self._cost.items():
+            row = stats[key[0]]
+            row["misses"] += 1
+            row["hits"] += self._hits[key]
+            row["compute"] += cost
+            row["saved"] += cost * self._hits[key]
+        return pd.DataFrame(
+            [
+                {
+                    "feature": name,
+                    "hits": row["hits"],
+                    "misses": row["misses"],
+                    "compute_ms": row["compute"] * 1e3,
+                    "saved_ms": row["saved"] * 1e3,
+                }
+                for name, row in sorted(stats.items())
+            ],
+            columns=["feature", "hits", "misses", "compute_ms", "saved_ms"],
+        )
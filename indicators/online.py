@@ -0,0 +1,471 @@
+"""
+Online (streaming) indicators with an O(1) ``update`` per bar.
+
+Each indicator keeps only the state its window needs and returns the current value
+from ``update``; ``value`` holds the last result (NaN during warm-up). Value-based
+indicators take a float, bar-based ones take any object with ``high``, ``low`` and
+``close`` attributes, such as ``ibapi.common.BarData``.
+
+The arithmetic mirrors the batch versions used by the strategies (pandas ``ewm`` and
+``rolling`` and the ``ta`` RSI/ATR/ADX indicators) so a streamed series matches
+the batch one, bit for bit where the batch code is sequential and to floating-point
+tolerance otherwise.
+"""
+
+import math
+import operator
+from collections import deque
+
+import numpy as np
+
+NAN = float("nan")
+
+
+def _pairwise_sum(values):
+    """Sum in the same order as NumPy's pairwise summation for short arrays (< 128)."""
+    n = len(values)
+    if n < 8:
+        total = 0.0
+        for x in values:
+            total += x
+        return total
+    r = list(values[:8])
+    i = 8
+    while i < n - n % 8:
+        for j in range(8):
+            r[j] += values[i + j]
+        i += 8
+    total = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+    for x in values[i:]:
+        total += x
+    return total
+
+
+class EMA:
+    """Exponential moving average matching ``Series.ewm(...).mean()``."""
+
+    def __init__(self, span=None, alpha=None, adjust=False, min_periods=0):
+        """
+        Args:
+            span (float, optional): EWM span; give either ``span`` or ``alpha``.
+            alpha (float, optional): Smoothing factor.
+            adjust (bool, optional): Same meaning as in pandas. Defaults to False.
+            min_periods (int, optional): Observations required before a value is returned.
+                Defaults to 0.
+        """
+        # pandas converts everything to a centre of mass first; do the same so alpha
+        # carries identical rounding.
+        com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self._new_wt = 1.0 if adjust else self.alpha
+        self._old_wt = 1.0
+        self._weighted = NAN
+        self.count = 0
+        self.value = NAN
+
+    def update(self, x):
+        if x == x:
+            self.count += 1
+            if self._weighted != self._weighted:
+                self._weighted = x
+            else:
+                self._old_wt *= 1.0 - self.alpha
+                if self._weighted != x:
+                    self._weighted = (
+                        self._old_wt * self._weighted + self._new_wt * x
+                    ) / (self._old_wt + self._new_wt)
+                self._old_wt = self._old_wt + self._new_wt if self.adjust else 1.0
+        self.value = self._weighted if self.count >= self.min_periods else NAN
+        return self.value
+
+
+class RollingSum:
+    """Rolling sum matching ``Series.rolling(window).sum()`` (Kahan-compensated add/remove)."""
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._buffer = deque()
+        self.nobs = 0
+        self.total = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same = 0
+        self._prev = NAN
+        self.value = NAN
+
+    def _add(self, x):
+        if x != x:
+            return
+        self.nobs += 1
+        y = x - self._comp_add
+        t = self.total + y
+        self._comp_add = t - self.total - y
+        self.total = t
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+
+    def _remove(self, x):
+        if x != x:
+            return
+        self.nobs -= 1
+        y = -x - self._comp_remove
+        t = self.total + y
+        self._comp_remove = t - self.total - y
+        self.total = t
+
+    def _push(self, x):
+        if not self._buffer:
+            self._prev = x
+        self._buffer.append(x)
+        if len(self._buffer) > self.window:
+            self._remove(self._buffer.popleft())
+        self._add(x)
+
+    def update(self, x):
+        self._push(x)
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            self.value = (
+                self._prev * self.nobs if self._same >= self.nobs else self.total
+            )
+        else:
+            self.value = NAN
+        return self.value
+
+
+class RollingMean(RollingSum):
+    """Rolling mean matching ``Series.rolling(window).mean()``."""
+
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, min_periods)
+        self._negatives = 0
+
+    def _add(self, x):
+        super()._add(x)
+        if x == x and math.copysign(1.0, x) < 0:
+            self._negatives += 1
+
+    def _remove(self, x):
+        super()._remove(x)
+        if x == x and math.copysign(1.0, x) < 0:
+            self._negatives -= 1
+
+    def update(self, x):
+        self._push(x)
+        if self.nobs >= self.min_periods and self.nobs > 0:
+            mean = self.total / self.nobs
+            if self._same >= self.nobs:
+                mean = self._prev
+            elif self._negatives == 0 and mean < 0:
+                mean = 0.0
+            elif self._negatives == self.nobs and mean > 0:
+                mean = 0.0
+            self.value = mean
+        else:
+            self.value = NAN
+        return self.value
+
+
+class RollingVar:
+    """Rolling variance using Welford's update/downdate, like ``rolling(window).var()``."""
+
+    def __init__(self, window, ddof=1, min_periods=None):
+        self.window = window
+        self.ddof = ddof
+        self.min_periods = window if min_periods is None else min_periods
+        self._buffer = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same = 0
+        self._prev = NAN
+        self.value = NAN
+
+    def _add(self, x):
+        if x != x:
+            return
+        self.nobs += 1
+        self._same = self._same + 1 if x == self._prev else 1
+        self._prev = x
+        prev_mean = self.mean - self._comp_add
+        y = x - self._comp_add
+        t = y - self.mean
+        self._comp_add = t + self.mean - y
+        self.mean = self.mean + t / self.nobs
+        self.ssqdm += (x - prev_mean) * (x - self.mean)
+
+    def _remove(self, x):
+        if x != x:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean - self._comp_remove
+            y = x - self._comp_remove
+            t = y - self.mean
+            self._comp_remove = t + self.mean - y
+            self.mean = self.mean - t / self.nobs
+            self.ssqdm -= (x - prev_mean) * (x - self.mean)
+        else:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+
+    def _variance(self):
+        if self.nobs >= self.min_periods and self.nobs > self.ddof:
+            if self.nobs == 1 or self._same >= self.nobs:
+                return 0.0
+            return self.ssqdm / (self.nobs - self.ddof)
+        return NAN
+
+    def update(self, x):
+        if not self._buffer:
+            self._prev = x
+        self._buffer.append(x)
+        if len(self._buffer) > self.window:
+            self._remove(self._buffer.popleft())
+        self._add(x)
+        self.value = self._variance()
+        return self.value
+
+
+class RollingStd(RollingVar):
+    """Rolling standard deviation, like ``rolling(window).std()``."""
+
+    def update(self, x):
+        variance = super().update(x)
+        self.value = math.sqrt(variance) if variance > 0 else variance
+        return self.value
+
+
+class _RollingExtreme:
+    """
+    Rolling max/min over a monotonic deque of (index, value) pairs.
+
+    ``dominates(new, old)`` is true when a new value makes an older one in the deque
+    irrelevant: ``operator.ge`` for the max, ``operator.le`` for the min.
+    """
+
+    def __init__(self, window, dominates, min_periods=None):
+        self.window = window
+        self._dominates = dominates
+        self.min_periods = window if min_periods is None else min_periods
+        self._deque = deque()
+        self._valid = deque()
+        self.index = -1
+        self.value = NAN
+
+    def update(self, x):
+        self.index += 1
+        cutoff = self.index - self.window
+        while self._valid and self._valid[0] <= cutoff:
+            self._valid.popleft()
+        while self._deque and self._deque[0][0] <= cutoff:
+            self._deque.popleft()
+        if x == x:
+            self._valid.append(self.index)
+            while self._deque and self._dominates(x, self._deque[-1][1]):
+                self._deque.pop()
+            self._deque.append((self.index, x))
+        if len(self._valid) >= self.min_periods and self._deque:
+            self.value = self._deque[0][1]
+        else:
+            self.value = NAN
+        return self.value
+
+
+class RollingMax(_RollingExtreme):
+    """Rolling maximum matching ``rolling(window).max()``."""
+
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, operator.ge, min_periods)
+
+
+class RollingMin(_RollingExtreme):
+    """Rolling minimum matching ``rolling(window).min()``."""
+
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, operator.le, min_periods)
+
+
+class TrueRange:
+    """True range; NaN on the first bar, which has no previous close."""
+
+    def __init__(self):
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, bar):
+        prev = self.prev_close
+        if prev != prev:
+            self.value = NAN
+        else:
+            self.value = max(
+                bar.high - bar.low, abs(bar.high - prev), abs(bar.low - prev)
+            )
+        self.prev_close = bar.close
+        return self.value
+
+
+class RSI:
+    """
+    Relative strength index of closing prices.
+
+    With ``wilder=True`` (default) this matches ``ta.momentum.RSIIndicator``: gains and
+    losses are smoothed with ``ewm(alpha=1/window, adjust=False)``. With
+    ``wilder=False`` it matches the simple rolling-mean RSI used by
+    ``compute_breakout_signal``.
+    """
+
+    def __init__(self, window=14, wilder=True):
+        self.window = window
+        self.wilder = wilder
+        if wilder:
+            self._gain = EMA(alpha=1.0 / window, min_periods=window)
+            self._loss = EMA(alpha=1.0 / window, min_periods=window)
+        else:
+            self._gain = RollingMean(window)
+            self._loss = RollingMean(window)
+        self.prev = NAN
+        self.value = NAN
+
+    def update(self, close):
+        delta = close - self.prev
+        self.prev = close
+        if self.wilder:
+            up = delta if delta > 0 else 0.0
+            down = -delta if delta < 0 else 0.0
+            gain = self._gain.update(up)
+            loss = self._loss.update(down)
+            if loss == 0:
+                self.value = 100.0
+            else:
+                self.value = 100 - 100 / (1 + gain / loss)
+        else:
+            up = max(delta, 0.0) if delta == delta else NAN
+            down = -min(delta, 0.0) if delta == delta else NAN
+            gain = self._gain.update(up)
+            loss = self._loss.update(down)
+            self.value = 100 - 100 / (1 + gain / (loss + 1e-10))
+        return self.value
+
+
+class ATR:
+    """
+    Wilder average true range matching ``ta.volatility.AverageTrueRange``.
+
+    The first ``window`` true ranges (the first one being high - low) are averaged,
+    then each new true range is folded in with Wilder smoothing. Like ``ta``, the value
+    is 0.0 during warm-up.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self._seed = []
+        self.prev_close = NAN
+        self.value = 0.0
+
+    def update(self, bar):
+        prev = self.prev_close
+        ranges = [bar.high - bar.low]
+        if prev == prev:
+            ranges += [abs(bar.high - prev), abs(bar.low - prev)]
+        tr = max(ranges)
+        self.prev_close = bar.close
+        self.count += 1
+        if self.count <= self.window:
+            self._seed.append(tr)
+            if self.count == self.window:
+                self.value = _pairwise_sum(self._seed) / self.window
+                self._seed = None
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        return self.value
+
+
+class ADX:
+    """
+    Average directional index matching ``ta.trend.ADXIndicator(...).adx()``.
+
+    True range and directional movement are summed over the first ``window`` bars
+    that have a previous bar, then Wilder-smoothed; ADX is the mean of the first
+    ``window`` DX values followed by Wilder smoothing. Like ``ta``, the value is 0.0
+    until ``2 * window - 1`` bars have been seen.
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self.prev = None
+        self._trs = self._dip = self._din = 0.0
+        self._seed = ([], [], [])
+        self._dx_seed = []
+        self.value = 0.0
+
+    def update(self, bar):
+        n = self.window
+        prev = self.prev
+        self.prev = bar
+        self.count += 1
+        if prev is None:
+            return self.value
+
+        tr = max(bar.high, prev.close) - min(bar.low, prev.close)
+        up = bar.high - prev.high
+        down = prev.low - bar.low
+        pos = up if (up > down and up > 0) else 0.0
+        neg = down if (down > up and down > 0) else 0.0
+
+        t = self.count - 1  # bar index
+        if t <= n:
+            for seed, x in zip(self._seed, (tr, pos, neg)):
+                seed.append(x)
+            if t == n:
+                self._trs, self._dip, self._din = map(_pairwise_sum, self._seed)
+        else:
+            self._trs = self._trs - self._trs / float(n) + tr
+            self._dip = self._dip - self._dip / float(n) + pos
+            self._din = self._din - self._din / float(n) + neg
+        if t < n:
+            return self.value
+
+        dip = 100 * (self._dip / self._trs) if self._trs != 0 else 0
+        din = 100 * (self._din / self._trs) if self._trs != 0 else 0
+        dx = 100 * abs((dip - din) / (dip + din)) if dip + din != 0 else 0
+
+        if t <= 2 * n - 1:
+            self._dx_seed.append(dx)
+            if t == 2 * n - 1:
+                self.value = _pairwise_sum(self._dx_seed) / n
+        else:
+            self.value = ((self.value * (n - 1)) + dx) / float(n)
+        return self.value
+
+
+class ChoppinessIndex:
+    """Choppiness index matching ``micro_pull_back_ema.compute_choppiness_index``."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self._tr = TrueRange()
+        self._tr_sum = RollingSum(window)
+        self._high = RollingMax(window)
+        self._low = RollingMin(window)
+        self.value = NAN
+
+    def update(self, bar):
+        atr = self._tr_sum.update(self._tr.update(bar))
+        span = self._high.update(bar.high) - self._low.update(bar.low)
+        if atr != atr or span != span or (atr == 0 and span == 0):
+            self.value = NAN
+        elif span == 0:
+            self.value = math.copysign(math.inf, atr)
+        elif atr == 0:
+            self.value = -math.inf
+        else:
+            # np.log10 rather than math.log10 so results round like the batch version
+            self.value = 100 * np.log10(atr / span) / np.log10(self.window)
+        return self.value
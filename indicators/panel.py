@@ -0,0 +1,215 @@
+"""
+Indicator kernels over (time x ticker) panels.
+
+Every function takes 2-D float64 arrays with one row per timestamp and one column per
+ticker, where NaN marks a bar a ticker does not have, and returns an array of the
+same shape. Rolling and EWM statistics go through pandas' column-wise window code in
+one call for the whole panel, and the Wilder-smoothed ``ta`` indicators (RSI, ATR, ADX)
+run their recurrence once per bar across all tickers, so the cost no longer scales
+with the number of Python-level per-ticker passes.
+
+Results match the per-ticker pandas/``ta`` code a ticker's own frame would produce.
+A ticker's bars need not cover every panel timestamp: given the panel's ``present``
+mask, ``rolling``, ``shift`` and ``diff`` run over each ticker's own bars and scatter
+the result back (tickers without interior gaps still share one call), and the ``ta``
+indicators always do. Rows a ticker has no bar for are NaN (False for booleans).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _frame(values):
+    return pd.DataFrame(values, copy=False)
+
+
+def _gapped(present):
+    return present is not None and not present.all()
+
+
+def rolling(values, window, how="mean", present=None):
+    """
+    Column-wise ``rolling(window).<how>()`` (1-D arrays are one column).
+
+    With ``present``, each ticker's windows span its last ``window`` bars rather than
+    the last ``window`` panel rows.
+    """
+    if _gapped(present):
+        return _by_segment(lambda v: rolling(v, window, how), present, values)
+    return (
+        getattr(_frame(values).rolling(window), how)().to_numpy().reshape(values.shape)
+    )
+
+
+def shift(values, periods=1, fill=np.nan, present=None):
+    """
+    Shift every column down by ``periods`` rows (bool arrays are filled with False).
+
+    With ``present``, each ticker's values move by ``periods`` of its own bars.
+    """
+    if _gapped(present):
+        return _by_segment(lambda v: shift(v, periods, fill), present, values)
+    if periods == 0:
+        return values.copy()
+    if values.dtype == bool:
+        fill = False
+    out = np.empty_like(values)
+    out[:periods] = fill
+    out[periods:] = values[:-periods]
+    return out
+
+
+def diff(values, periods=1, present=None):
+    return values - shift(values, periods, present=present)
+
+
+def as_float(flags, present):
+    """Booleans as 0/1 floats, NaN where the ticker has no bar."""
+    return np.where(present, flags, np.nan)
+
+
+def column_median(values):
+    """Per-ticker median over time, broadcastable against the panel."""
+    return _frame(values).median().to_numpy()[None, :]
+
+
+def session_vwap(sessions, high, low, close, volume):
+    """
+    Session VWAP for every ticker, restarting at each change of ``sessions``.
+
+    Same arithmetic as ``utils.compute_session_vwap`` with its default anchor.
+
+    Args:
+        sessions (np.ndarray): One integer session code (e.g. the trading day) per row.
+    """
+    typical = (high + low + close) / 3
+    cum_volume = _frame(volume).groupby(sessions, sort=False).cumsum().to_numpy()
+    cum_pv = _frame(volume * typical).groupby(sessions, sort=False).cumsum().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cum_pv / cum_volume
+
+
+def _segments(present):
+    """
+    Group tickers by the rows holding their bars.
+
+    Yields (rows, columns) pairs: tickers whose bars form one contiguous block of rows
+    are grouped by that block; a ticker with interior gaps gets its own group with
+    exactly its bar rows.
+    """
+    n_rows = len(present)
+    counts = present.sum(axis=0)
+    first = np.argmax(present, axis=0)
+    last = n_rows - 1 - np.argmax(present[::-1], axis=0)
+    contiguous = counts == last - first + 1
+    blocks = {}
+    for col in np.flatnonzero(counts > 0):
+        if contiguous[col]:
+            blocks.setdefault((first[col], last[col]), []).append(col)
+        else:
+            yield np.flatnonzero(present[:, col]), np.array([col])
+    for (start, stop), cols in blocks.items():
+        yield np.arange(start, stop + 1), np.array(cols)
+
+
+def _by_segment(kernel, present, *arrays):
+    """
+    Run ``kernel`` on each ticker group's own bars and scatter the result back.
+
+    Rows without a bar are NaN, or False when the first array is boolean.
+    """
+    if arrays[0].dtype == bool:
+        out = np.zeros(arrays[0].shape, dtype=bool)
+    else:
+        out = np.full(arrays[0].shape, np.nan)
+    for rows, cols in _segments(present):
+        block = np.ix_(rows, cols)
+        out[block] = kernel(*(a[block] for a in arrays))
+    return out
+
+
+def _first_sum(values, count):
+    """Sum of the first ``count`` rows per column, with NumPy's pairwise rounding."""
+    return np.ascontiguousarray(values[:count].T).sum(axis=1)
+
+
+def _wilder_atr(high, low, close, window):
+    n_rows = len(close)
+    if n_rows < window:
+        return np.full(close.shape, np.nan)
+    prev_close = shift(close)
+    true_range = high - low
+    true_range[1:] = np.maximum(
+        true_range[1:],
+        np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))[1:],
+    )
+    atr = np.zeros(close.shape)
+    atr[window - 1] = _first_sum(true_range, window) / window
+    for i in range(window, n_rows):
+        atr[i] = (atr[i - 1] * (window - 1) + true_range[i]) / float(window)
+    return atr
+
+
+def wilder_atr(high, low, close, window=14):
+    """``ta.volatility.AverageTrueRange(...).average_true_range()`` for every ticker."""
+    return _by_segment(
+        lambda h, l, c: _wilder_atr(h, l, c, window), ~np.isnan(close), high, low, close
+    )
+
+
+def _wilder_adx(high, low, close, window):
+    n_rows = len(close)
+    if n_rows < 2 * window:
+        return np.full(close.shape, np.nan)
+    prev_close = close[:-1]
+    # Rows 1.. of the true range and the +DM / -DM directional movement
+    moves = np.empty((n_rows - 1, 3, close.shape[1]))
+    moves[:, 0] = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    moves[:, 1] = np.abs(((up > down) & (up > 0)) * up)
+    moves[:, 2] = np.abs(((down > up) & (down > 0)) * down)
+
+    # Wilder running sums; like ta, the last one is never filled in
+    length = n_rows - window + 1
+    sums = np.zeros((length, 3, close.shape[1]))
+    for k in range(3):
+        sums[0, k] = _first_sum(moves[:, k], window)
+    for i in range(1, length - 1):
+        sums[i] = sums[i - 1] - sums[i - 1] / float(window) + moves[window + i - 1]
+
+    trs, dip, din = sums[:, 0], sums[:, 1], sums[:, 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dip = np.where(trs != 0, 100 * (dip / trs), 0)
+        din = np.where(trs != 0, 100 * (din / trs), 0)
+        dx = np.where(dip + din != 0, 100 * np.abs((dip - din) / (dip + din)), 0)
+
+    adx = np.zeros((length, close.shape[1]))
+    adx[window] = _first_sum(dx, window) / window
+    for i in range(window + 1, length):
+        adx[i] = ((adx[i - 1] * (window - 1)) + dx[i - 1]) / float(window)
+    return np.concatenate((np.zeros((window - 1, close.shape[1])), adx))
+
+
+def wilder_adx(high, low, close, window=14):
+    """``ta.trend.ADXIndicator(...).adx()`` for every ticker."""
+    return _by_segment(
+        lambda h, l, c: _wilder_adx(h, l, c, window), ~np.isnan(close), high, low, close
+    )
+
+
+def _wilder_rsi(close, window):
+    delta = diff(close)
+    # ta turns the first (undefined) move into 0.0
+    up = np.where(delta > 0, delta, 0.0)
+    down = -np.where(delta < 0, delta, 0.0)
+    smooth = dict(alpha=1 / window, min_periods=window, adjust=False)
+    up = _frame(up).ewm(**smooth).mean().to_numpy()
+    down = _frame(down).ewm(**smooth).mean().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(down == 0, 100, 100 - (100 / (1 + up / down)))
+
+
+def wilder_rsi(close, window=14):
+    """``ta.momentum.RSIIndicator(...).rsi()`` for every ticker."""
+    return _by_segment(lambda c: _wilder_rsi(c, window), ~np.isnan(close), close)
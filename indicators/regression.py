@@ -0,0 +1,133 @@
+"""
+Vectorized rolling least-squares regression against bar position.
+
+Every window is regressed on the fixed grid x = 0, 1, ..., n - 1, the same fit
+``compute_slope`` gets from ``LinearRegression`` one window at a time. With x fixed
+the OLS solution only needs window sums against a constant kernel:
+
+    slope     = sum((x - x_mean) * (y - y_mean)) / sum((x - x_mean) ** 2)
+    intercept = y_mean - slope * x_mean
+    r2        = slope ** 2 * sum((x - x_mean) ** 2) / sum((y - y_mean) ** 2)
+
+so all windows are solved at once on a strided view of the data, with no per-bar
+Python call or model object. Windows containing NaN produce NaN, like
+``rolling().apply`` with the default ``min_periods``.
+"""
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+STATS = ("Slope", "Intercept", "R2")
+
+
+def _fit_windows(windows, window):
+    """Solve OLS for stacked windows of shape (..., window); returns slope, intercept, r2."""
+    x = np.arange(window, dtype=np.float64) - (window - 1) / 2
+    sxx = x @ x
+    y_mean = windows.mean(axis=-1)
+    centred = windows - y_mean[..., None]
+    sxy = centred @ x
+    slope = sxy / sxx
+    intercept = y_mean - slope * (window - 1) / 2
+    syy = np.einsum("...i,...i->...", centred, centred)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r2 = sxy * sxy / (sxx * syy)
+    return slope, intercept, r2
+
+
+def _rolling_fit(values, window):
+    """
+    Rolling OLS on a 2-D float array (rows x columns).
+
+    ``window`` is an int, or one window length per row. Rows without a full window
+    (or with a window shorter than 2) are NaN.
+    """
+    n_rows = len(values)
+    out = np.full((3,) + values.shape, np.nan)
+
+    if np.ndim(window) == 0:
+        window = int(window)
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        if window <= n_rows:
+            windows = sliding_window_view(values, window, axis=0)
+            for k, stat in enumerate(_fit_windows(windows, window)):
+                out[k, window - 1 :] = stat
+        return out
+
+    window = np.asarray(window)
+    if len(window) != n_rows:
+        raise ValueError("per-row windows must have one entry per row")
+    rows = np.arange(n_rows)
+    # One strided pass per distinct window length, gathering only the rows using it
+    for size in np.unique(window[(window >= 2) & (window <= rows + 1)]):
+        size = int(size)
+        selected = rows[(window == size) & (rows >= size - 1)]
+        windows = sliding_window_view(values, size, axis=0)[selected - size + 1]
+        for k, stat in enumerate(_fit_windows(windows, size)):
+            out[k, selected] = stat
+    return out
+
+
+def rolling_regression(values, window, intercept=False, r2=False):
+    """
+    Rolling linear regression of values on bar position.
+
+    Args:
+        values (pd.Series, pd.DataFrame or np.ndarray): Series to regress; each column of a
+            DataFrame (or 2-D array) is fitted independently.
+        window (int or array-like): Window length, or one window length per row for
+            variable windows.
+        intercept (bool, optional): Also return the intercept (fitted value at the first bar
+            of the window). Defaults to False.
+        r2 (bool, optional): Also return the coefficient of determination. Defaults to False.
+
+    Returns:
+        pd.DataFrame: 'Slope' (plus 'Intercept'/'R2') for a Series or 1-D array, or
+            '<column>_Slope', ... for each column of a DataFrame or 2-D array, aligned
+            with the input index.
+    """
+    frame = isinstance(values, pd.DataFrame) or np.ndim(values) == 2
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        index = values.index
+    else:
+        index = pd.RangeIndex(len(values))
+    data = np.asarray(values, dtype=np.float64)
+    if isinstance(values, pd.DataFrame):
+        columns = [str(col) for col in values.columns]
+    elif frame:
+        columns = [str(col) for col in range(data.shape[1])]
+    if not frame:
+        data = data[:, None]
+
+    fit = _rolling_fit(data, window)
+    wanted = [k for k, keep in enumerate((True, intercept, r2)) if keep]
+    result = {}
+    for c in range(data.shape[1]):
+        for k in wanted:
+            name = f"{columns[c]}_{STATS[k]}" if frame else STATS[k]
+            result[name] = fit[k, :, c]
+    return pd.DataFrame(result, index=index)
+
+
+def rolling_slope(values, window):
+    """
+    Rolling regression slope, a vectorized drop-in for
+    ``values.rolling(window).apply(compute_slope)``.
+
+    Args:
+        values (pd.Series, pd.DataFrame or np.ndarray): Series (or columns) to regress.
+        window (int or array-like): Window length, or one window length per row.
+
+    Returns:
+        Same type and shape as ``values``: the slope per bar, NaN until a full window.
+    """
+    fit = _rolling_fit(
+        np.asarray(values, dtype=np.float64).reshape(len(values), -1), window
+    )[0]
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(fit, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(fit[:, 0], index=values.index, name=values.name)
+    return fit.reshape(np.shape(values))
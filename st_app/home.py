@@ -1,41 +1,34 @@
+import os
+import sys
 import threading
 import time
 
-import pandas as pd
 import streamlit as st
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from ibapi.client import EClient
 from ibapi.contract import Contract
 from ibapi.wrapper import EWrapper
 
+from data.bar_accumulator import BarAccumulator
+
 
 class TradeApp(EWrapper, EClient):
     def __init__(self):
         EClient.__init__(self, self)
         self.hist_data = {}
+        self.bars = {}
         self.data_event = threading.Event()
 
     def historicalData(self, reqId, bar):
-        new_data = pd.DataFrame(
-            [
-                {
-                    "Date": bar.date,
-                    "Open": bar.open,
-                    "High": bar.high,
-                    "Low": bar.low,
-                    "Close": bar.close,
-                    "Volume": bar.volume,
-                }
-            ]
-        )
-
-        if reqId not in self.hist_data or len(self.hist_data[reqId]) == 0:
-            self.hist_data[reqId] = new_data
-        else:
-            self.hist_data[reqId] = pd.concat(
-                [self.hist_data[reqId], new_data], ignore_index=True
-            )
+        if reqId not in self.bars:
+            self.bars[reqId] = BarAccumulator()
+        self.bars[reqId].append(bar)
 
     def historicalDataEnd(self, reqId, startDateStr, endDateStr):
+        if reqId in self.bars:
+            self.hist_data[reqId] = self.bars.pop(reqId).to_frame()
         print(
             f"Historical data fetch completed for ReqId: {reqId}, Start: {startDateStr}, End: {endDateStr}"
         )
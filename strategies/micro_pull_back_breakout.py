@@ -1,66 +1,89 @@
 import numpy as np
 import pandas as pd
 
+from indicators.feature_store import FeatureStore
+from indicators.panel import rolling, shift
+
 
 def compute_breakout_signal(
-    df, breakout_multiplier=1.0, vwap_multiplier=1.1, rsi_overbought=85
+    df, breakout_multiplier=1.0, vwap_multiplier=1.1, rsi_overbought=85, features=None
 ):
     """
     Compute breakout signal based on strong candle breakout with volatility and trend confirmation.
     Filters out 'buying the top' behavior with RSI and VWAP extension filters.
+    Indicators are taken from ``features`` (a shared FeatureStore) when given.
     """
 
-    df = df.copy()
+    if features is None or not features.matches(df):
+        features = FeatureStore(df)
+    outputs = breakout_outputs(
+        features,
+        df["VolumeSpike"].to_numpy(dtype=bool),
+        breakout_multiplier,
+        vwap_multiplier,
+        rsi_overbought,
+    )
+    return pd.DataFrame({"DateTime": df["DateTime"], **outputs}, index=df.index)
 
-    # Small red candle allowance in trend
-    def increasing_trend_with_one_small_red(df):
-        small_reds = (df["Close"] < df["Open"]) & (
-            abs(df["Open"] - df["Close"]) / df["Open"] < 0.008
-        )
-        return small_reds.rolling(window=5).sum().shift(1) <= 1
 
-    df["AllowTrend"] = increasing_trend_with_one_small_red(df)
+def breakout_outputs(
+    features,
+    volume_spike,
+    breakout_multiplier=1.0,
+    vwap_multiplier=1.1,
+    rsi_overbought=85,
+):
+    """
+    Breakout signal and its filters from read-only column views, without copying the
+    bars.
 
-    # Candle body strength
-    df["Body"] = abs(df["Close"] - df["Open"])
-    df["Range"] = df["High"] - df["Low"]
-    df["StrongBreakoutCandle"] = (df["Body"] / df["Range"]) > 0.8
+    Args:
+        features (FeatureStore): Store built on the bars.
+        volume_spike (np.ndarray): 'VolumeSpike' flags of the bars.
+
+    Returns:
+        dict: 'PrevHigh5', 'RSI', 'StrongBreakoutCandle', 'AllowTrend',
+            'SufficientVolatility' and 'Breakout' arrays.
+    """
+    open_, close = features.values("Open"), features.values("Close")
+    vwap = features.values("VWAP")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Small red candle allowance in trend
+        small_reds = (close < open_) & (np.abs(open_ - close) / open_ < 0.008)
+        allow_trend = shift(rolling(small_reds.astype(np.float64), 5, "sum")) <= 1
+
+        # Candle body strength
+        body = np.abs(close - open_)
+        strong_candle = (body / features.values(features.range())) > 0.8
 
     # Volatility filter
-    df["ATR"] = (df["High"] - df["Low"]).rolling(window=10).mean()
-    df["SufficientVolatility"] = df["ATR"] > df["ATR"].median()
+    atr = features.rolling(features.range(), 10)
+    sufficient_volatility = features.values(atr) > features.median(atr)
 
     # Previous local high for breakout comparison
-    df["PrevHigh5"] = df["High"].rolling(window=5).max().shift(1)
+    prev_high5 = features.values(features.shift(features.rolling("High", 5, "max")))
 
     # RSI for overbought filter
-    delta = df["Close"].diff()
-    gain = delta.clip(lower=0).rolling(14).mean()
-    loss = -delta.clip(upper=0).rolling(14).mean()
-    rs = gain / (loss + 1e-10)
-    df["RSI"] = 100 - (100 / (1 + rs))
+    rsi = features.values(features.rsi_simple(14))
 
     # Final breakout signal
-    df["Breakout"] = (
-        (df["Close"] > df["PrevHigh5"] * breakout_multiplier)
-        & (
-            df["Close"] < df["VWAP"] * vwap_multiplier
-        )  # Prevent buying extreme extensions
-        & (df["RSI"] < rsi_overbought)
-        & df["VolumeSpike"]
-        & df["StrongBreakoutCandle"]
-        & df["AllowTrend"]
-        & df["SufficientVolatility"]
-    )
+    with np.errstate(invalid="ignore"):
+        breakout = (
+            (close > prev_high5 * breakout_multiplier)
+            & (close < vwap * vwap_multiplier)  # Prevent buying extreme extensions
+            & (rsi < rsi_overbought)
+            & volume_spike
+            & strong_candle
+            & allow_trend
+            & sufficient_volatility
+        )
 
-    return df[
-        [
-            "DateTime",
-            "PrevHigh5",
-            "RSI",
-            "StrongBreakoutCandle",
-            "AllowTrend",
-            "SufficientVolatility",
-            "Breakout",
-        ]
-    ]
+    return {
+        "PrevHigh5": prev_high5,
+        "RSI": rsi,
+        "StrongBreakoutCandle": strong_candle,
+        "AllowTrend": allow_trend,
+        "SufficientVolatility": sufficient_volatility,
+        "Breakout": breakout,
+    }
@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
-import ta  # Technical Analysis library
 from sklearn.linear_model import LinearRegression
 
+from indicators.feature_store import FeatureStore
+from indicators.panel import shift
+
 
 def compute_slope(series: pd.Series) -> float:
     """Compute slope of a serires using linear regression."""
@@ -35,74 +37,117 @@ def compute_micro_pullback_ema_strategy(
     choppiness_threshold=61,
     adx_threshold=20,
     breakout_window=10,
+    features=None,
 ):
     """
     Enhanced micro pullback strategy with choppiness index, breakout confirmation, ADX.
+    Indicators are taken from ``features`` (a shared FeatureStore) when given.
     """
 
-    df = df.copy()
+    if features is None or not features.matches(df):
+        features = FeatureStore(df)
+    outputs = micro_pullback_ema_outputs(
+        features,
+        threshold,
+        volume_spike_factor,
+        volume_window,
+        slope_window,
+        slope_threshold,
+        choppiness_threshold,
+        adx_threshold,
+        breakout_window,
+    )
+    return pd.DataFrame({"DateTime": df["DateTime"], **outputs}, index=df.index)
 
-    # === EMAs ===
-    df["EMA4"] = df["Close"].ewm(span=4, adjust=False).mean()
-    df["EMA7"] = df["Close"].ewm(span=7, adjust=False).mean()
-    df["EMA15"] = df["Close"].ewm(span=15, adjust=False).mean()
 
-    # === Crossovers ===
-    df["EMA4_cross_EMA7"] = (df["EMA4"].shift(2) <= df["EMA7"].shift(2)) & (
-        df["EMA4"].shift(1) > df["EMA7"].shift(1)
-    )
-    df["EMA4_cross_EMA15"] = (df["EMA4"] > df["EMA15"]) & (df["EMA7"] > df["EMA15"])
-    df["PreSignal"] = df["EMA4_cross_EMA7"] & df["EMA4_cross_EMA15"]
-
-    # === Candle & Volume Filters ===
-    df["GreenCandle"] = df["Close"] > df["Open"]
-    df["AvgVolume"] = df["Volume"].rolling(window=volume_window).mean()
-    df["VolumeSpike"] = (df["Volume"] > df["AvgVolume"] * volume_spike_factor) & (
-        df["Volume"] > 15000
-    )
-    df["EMA4_pct_change"] = df["EMA4"].pct_change()
+def micro_pullback_ema_outputs(
+    features,
+    threshold=0.001,
+    volume_spike_factor=4,
+    volume_window=80,
+    slope_window=10,
+    slope_threshold=0.002,
+    choppiness_threshold=61,
+    adx_threshold=20,
+    breakout_window=10,
+):
+    """
+    EMA micro pullback signal and its indicators from read-only column views, without
+    copying the bars.
 
-    # === EMA Slope ===
-    df["EMA15_Slope"] = (
-        df["EMA15"].rolling(window=slope_window).apply(compute_slope, raw=False)
-    )
+    Args:
+        features (FeatureStore): Store built on the bars.
+
+    Returns:
+        dict: 'EMA4', 'EMA7', 'EMA15', 'EMA4_pct_change', 'EMA15_Slope',
+            'ChoppinessIndex', 'ADX', 'BreakoutConfirm', 'StrongClose' and
+            'EMABuySignal' arrays.
+    """
+    open_, high = features.values("Open"), features.values("High")
+    low, close = features.values("Low"), features.values("Close")
+    volume = features.values("Volume")
 
-    # === Trend Strength Filters ===
-    df["ChoppinessIndex"] = compute_choppiness_index(df["High"], df["Low"], df["Close"])
-    df["ADX"] = ta.trend.adx(df["High"], df["Low"], df["Close"], window=15)
-
-    # === Breakout Filter ===
-    df["RecentHigh"] = df["High"].rolling(breakout_window).max().shift(1)
-    df["BreakoutConfirm"] = df["High"] > df["RecentHigh"]
-
-    # === Strong Close ===
-    df["StrongClose"] = df["Close"] > (df["Open"] + 0.5 * (df["High"] - df["Low"]))
-
-    # === Final Buy Signal ===
-    df["EMABuySignal"] = (
-        df["PreSignal"]
-        & (df["EMA4_pct_change"] >= threshold)
-        & df["GreenCandle"]
-        & df["VolumeSpike"]
-        & (df["EMA15_Slope"] > slope_threshold)
-        & (df["ChoppinessIndex"] < choppiness_threshold)
-        & (df["ADX"] > adx_threshold)
-        & df["BreakoutConfirm"]
-        & df["StrongClose"]
+    # === EMAs ===
+    ema4, ema7, ema15 = (
+        features.values(ema) for ema in features.emas("Close", (4, 7, 15))
     )
 
-    return df[
-        [
-            "DateTime",
-            "EMA4",
-            "EMA7",
-            "EMA15",
-            "EMA4_pct_change",
-            "EMA15_Slope",
-            "ChoppinessIndex",
-            "ADX",
-            "BreakoutConfirm",
-            "StrongClose",
-            "EMABuySignal",
-        ]
-    ]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # === Crossovers ===
+        ema4_cross_ema7 = (shift(ema4, 2) <= shift(ema7, 2)) & (
+            shift(ema4) > shift(ema7)
+        )
+        ema4_cross_ema15 = (ema4 > ema15) & (ema7 > ema15)
+        pre_signal = ema4_cross_ema7 & ema4_cross_ema15
+
+        # === Candle & Volume Filters ===
+        green_candle = close > open_
+        avg_volume = features.values(features.rolling("Volume", volume_window))
+        volume_spike = (volume > avg_volume * volume_spike_factor) & (volume > 15000)
+        ema4_pct_change = ema4 / shift(ema4) - 1
+
+        # === EMA Slope ===
+        ema15_slope = features.values(
+            features.slope(features.ema("Close", 15), slope_window)
+        )
+
+        # === Trend Strength Filters ===
+        choppiness = compute_choppiness_index(
+            features.column("High"), features.column("Low"), features.column("Close")
+        ).to_numpy()
+        adx = features.values(features.adx(15))
+
+        # === Breakout Filter ===
+        recent_high = features.values(
+            features.shift(features.rolling("High", breakout_window, "max"))
+        )
+        breakout_confirm = high > recent_high
+
+        # === Strong Close ===
+        strong_close = close > (open_ + 0.5 * (high - low))
+
+        # === Final Buy Signal ===
+        buy_signal = (
+            pre_signal
+            & (ema4_pct_change >= threshold)
+            & green_candle
+            & volume_spike
+            & (ema15_slope > slope_threshold)
+            & (choppiness < choppiness_threshold)
+            & (adx > adx_threshold)
+            & breakout_confirm
+            & strong_close
+        )
+
+    return {
+        "EMA4": ema4,
+        "EMA7": ema7,
+        "EMA15": ema15,
+        "EMA4_pct_change": ema4_pct_change,
+        "EMA15_Slope": ema15_slope,
+        "ChoppinessIndex": choppiness,
+        "ADX": adx,
+        "BreakoutConfirm": breakout_confirm,
+        "StrongClose": strong_close,
+        "EMABuySignal": buy_signal,
+    }
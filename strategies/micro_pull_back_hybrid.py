@@ -4,14 +4,16 @@ from typing import Dict, List, Tuple
 
 import pandas as pd
 
+from backtesting.simulator import simulate
 from data.data_fetcher import histData, usTechStk
-from utils import compute_daily_vwap
+from indicators.ema import ema_bank
+from utils import compute_session_vwap
 
 
-def backtest(selected_stocks, app, ticker_event):
+def backtest(selected_stocks, app, ticker_event, client=None):
     from datetime import datetime
 
-    from utils import compute_daily_vwap
+    from utils import compute_session_vwap
 
     date_stats = {}
     transactions = []
@@ -20,35 +22,38 @@ def backtest(selected_stocks, app, ticker_event):
     for date in selected_stocks:
         date_stats[date] = {}
 
-        for ticker in selected_stocks[date]:
-            ticker_event.clear()
-            histData(
-                app,
-                reqID,
-                usTechStk(ticker),
-                date + " 22:05:00 US/Eastern",
-                "10 D",
-                "1 min",
+        if client is not None:
+            frames = client.fetch_frames(
+                selected_stocks[date], date + " 22:05:00 US/Eastern", "10 D", "1 min"
             )
-            ticker_event.wait()
+        for ticker in selected_stocks[date]:
+            if client is not None:
+                bars = frames.get(ticker)
+            else:
+                ticker_event.clear()
+                histData(
+                    app,
+                    reqID,
+                    usTechStk(ticker),
+                    date + " 22:05:00 US/Eastern",
+                    "10 D",
+                    "1 min",
+                )
+                ticker_event.wait()
+                bars = app.data.get(reqID)
 
-            if reqID not in app.data or app.data[reqID].empty:
+            if bars is None or bars.empty:
                 print(f"Warning: No data for {ticker} on {date}")
                 continue
 
-            df = app.data[reqID].copy()
+            df = bars.copy()
             df["Volume"] = df["Volume"].astype(float)
             df["DateTime"] = df["Date"].apply(
                 lambda date: datetime.strptime(
                     date.split(" ")[0] + " " + date.split(" ")[1], "%Y%m%d %H:%M:%S"
                 )
             )
-            df["DateOnly"] = df["DateTime"].dt.date
-
-            df_vwap = (
-                df.groupby("DateOnly").apply(compute_daily_vwap).reset_index(drop=True)
-            )
-            df = df.merge(df_vwap, on="DateTime", how="left")
+            compute_session_vwap(df)
 
             # === Micro Pullback Indicators ===
             df["Green"] = df["Close"] > df["Open"]
@@ -79,9 +84,9 @@ def backtest(selected_stocks, app, ticker_event):
             )
 
             # === Trend Following / Breakout Indicators ===
-            df["EMA9"] = df["Close"].ewm(span=9).mean()
-            df["EMA21"] = df["Close"].ewm(span=21).mean()
-            df["EMA50"] = df["Close"].ewm(span=50).mean()
+            df[["EMA9", "EMA21", "EMA50"]] = ema_bank(
+                df["Close"].to_numpy(), (9, 21, 50), adjust=True
+            )
             df["ShortUp"] = df["EMA9"] > df["EMA21"]
             df["LongUp"] = df["EMA21"] > df["EMA50"]
             df["Breakout"] = df["Close"] > df["High"].rolling(20).max().shift(1)
@@ -95,45 +100,32 @@ def backtest(selected_stocks, app, ticker_event):
 
             df.dropna(inplace=True)
 
-            in_position = False
-            entry_price, stop_loss, target_price = None, None, None
-            buy_date, sell_date = None, None
-
-            for i in range(len(df)):
-                row = df.iloc[i]
-                close_price = row["Close"]
-
-                if not in_position:
-                    if row["MicroPullbackScore"] >= 3 or row["TrendScore"] >= 3:
-                        if row["MicroPullbackScore"] >= row["TrendScore"]:
-                            strategy = "MicroPullback"
-                        else:
-                            strategy = "TrendBreakout"
-
-                        entry_price = close_price
-                        stop_loss = entry_price * 0.98
-                        target_price = entry_price * 1.05
-                        buy_date = row["Date"]
-                        transactions.append(
-                            (buy_date, ticker, f"BUY ({strategy})", entry_price)
-                        )
-                        in_position = True
-
-                else:
-                    if close_price >= target_price or close_price <= stop_loss:
-                        exit_price = close_price
-                        sell_date = row["Date"]
-                        transactions.append((sell_date, ticker, "SELL", exit_price))
-
-                        date_stats[date][ticker] = {
-                            "return": (exit_price - entry_price) / entry_price,
-                            "buy_date": buy_date,
-                            "sell_date": sell_date,
-                        }
-
-                        in_position = False
-                        entry_price, stop_loss, target_price = None, None, None
-                        buy_date, sell_date = None, None
+            entry = (df["MicroPullbackScore"] >= 3) | (df["TrendScore"] >= 3)
+            pullback_led = df["MicroPullbackScore"] >= df["TrendScore"]
+            trades = simulate(
+                df["Close"],
+                {
+                    "MicroPullback": entry & pullback_led,
+                    "TrendBreakout": entry & ~pullback_led,
+                },
+                {"MicroPullback": (0.02, 0.05), "TrendBreakout": (0.02, 0.05)},
+            )
+            dates = df["Date"].to_numpy()
+            for entry, exit, strategy, entry_price, exit_price in trades.rows():
+                buy_date = dates[entry]
+                transactions.append(
+                    (buy_date, ticker, f"BUY ({strategy})", entry_price)
+                )
+                if exit is None:
+                    continue
+
+                sell_date = dates[exit]
+                transactions.append((sell_date, ticker, "SELL", exit_price))
+                date_stats[date][ticker] = {
+                    "return": (exit_price - entry_price) / entry_price,
+                    "buy_date": buy_date,
+                    "sell_date": sell_date,
+                }
 
             app.data[reqID] = df
             reqID += 1
@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
 
+from indicators.feature_store import FeatureStore
+from indicators.panel import shift
+
 
 def compute_micro_pullback(
     df: pd.DataFrame,
@@ -8,59 +12,76 @@ def compute_micro_pullback(
     rel_volume_thresh=5,
     vol_thresh=15000,
     max_pullback_pct=0.015,
+    features=None,
 ):
     """
     Identifies Micro Pullback patterns in the provided DataFrame.
 
     Parameters:
         df (pd.DataFrame): DataFrame with 'Open', 'High', 'Low', 'Close', 'Volume', and 'VWAP' columns.
-        atr_window (int): Rolling window for ATR calculation.
+        atr_window (int): Rolling window for ATR calculation (diagnostic only; it does
+            not change the signal).
         volume_window (int): Rolling window for average volume.
         rel_volume_thresh (float): Relative volume threshold to detect volume spike.
         vol_thresh (int): Minimum absolute volume threshold.
         max_pullback_pct (float): Maximum % pullback for valid pullback detection.
+        features (FeatureStore, optional): Shared indicator store built on ``df``.
 
     Returns:
-        pd.DataFrame: Original DataFrame with extra columns indicating pattern detections.
+        pd.DataFrame: 'MicroPullback' and 'DateTime' columns on the index of ``df``.
     """
+    if features is None or not features.matches(df):
+        features = FeatureStore(df)
+    outputs = micro_pullback_outputs(
+        features,
+        volume_window=volume_window,
+        rel_volume_thresh=rel_volume_thresh,
+        vol_thresh=vol_thresh,
+        max_pullback_pct=max_pullback_pct,
+    )
+    return pd.DataFrame({**outputs, "DateTime": df["DateTime"]}, index=df.index)
 
-    df = df.copy()
 
-    # Momentum check
-    df["Green"] = df["Close"] > df["Open"]
-    df["StrongMomentum"] = (
-        df["Green"].shift(1).fillna(False)
-        & df["Green"].shift(2).fillna(False)
-        & df["Green"].shift(3).fillna(False)
-        & (df["High"].shift(1) > df["High"].shift(2))
-        & (df["High"].shift(2) > df["High"].shift(3))
-    )
+def micro_pullback_outputs(
+    features,
+    volume_window=80,
+    rel_volume_thresh=5,
+    vol_thresh=15000,
+    max_pullback_pct=0.015,
+):
+    """
+    Micro pullback signal from read-only column views, without copying the bars.
 
-    # ATR and momentum confirmation
-    df["ATR"] = (
-        df["High"].rolling(atr_window).max() - df["Low"].rolling(atr_window).min()
-    )
-    df["Momentum"] = df["StrongMomentum"] & ((df["High"] - df["Low"]) > 0.4 * df["ATR"])
+    Takes the parameters of ``compute_micro_pullback`` that change the signal.
 
-    # Pullback logic
-    df["Pullback"] = (df["Close"] < df["Close"].shift(1)) & (
-        (df["Close"].shift(1) - df["Close"]) / df["Close"].shift(1) <= max_pullback_pct
-    )
-    df["PullbackAboveVWAP"] = df["Pullback"] & (df["Low"] > df["VWAP"])
+    Args:
+        features (FeatureStore): Store built on the bars.
 
-    # Volume filters
-    df["AverageVolume"] = df["Volume"].rolling(window=volume_window).mean()
-    df["RelativeVolume"] = df["Volume"] / df["AverageVolume"]
-    df["Close_to_VWAP"] = df["Close"] / df["VWAP"]
-    df["NotExtended"] = df["Close_to_VWAP"] < 5
+    Returns:
+        dict: {'MicroPullback': bool array}.
+    """
+    open_, high = features.values("Open"), features.values("High")
+    close, volume = features.values("Close"), features.values("Volume")
 
-    # VWAP reclaim and spike
-    df["VWAP_Reclaim"] = (df["Low"] > df["VWAP"]) & (df["Close"] > df["VWAP"])
-    df["VolumeSpike"] = (df["RelativeVolume"] > rel_volume_thresh) & (
-        df["Volume"] > vol_thresh
+    # Momentum check
+    green = close > open_
+    strong_momentum = (
+        shift(green, 1)
+        & shift(green, 2)
+        & shift(green, 3)
+        & (shift(high, 1) > shift(high, 2))
+        & (shift(high, 2) > shift(high, 3))
     )
 
-    # Final micro pullback signal
-    df["MicroPullback"] = df["StrongMomentum"] & df["Pullback"] & df["VolumeSpike"]
+    # Pullback logic
+    prev_close = shift(close)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pullback = (close < prev_close) & (
+            (prev_close - close) / prev_close <= max_pullback_pct
+        )
+        relative_volume = volume / features.values(
+            features.rolling("Volume", volume_window)
+        )
+    volume_spike = (relative_volume > rel_volume_thresh) & (volume > vol_thresh)
 
-    return df[["MicroPullback", "DateTime"]]
+    return {"MicroPullback": strong_momentum & pullback & volume_spike}
@@ -4,16 +4,23 @@ from typing import Dict, List, Tuple
 
 import pandas as pd
 
+from backtesting.simulator import simulate
 from data.data_fetcher import histData, usTechStk
-from utils import compute_daily_vwap
+from utils import compute_session_vwap
 
 
 # bull flag strategy
 def backtest(
-    selected_stocks: Dict[str, List[str]], app, ticker_event: threading.Event
+    selected_stocks: Dict[str, List[str]],
+    app,
+    ticker_event: threading.Event,
+    client=None,
 ) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], List[Tuple[str, str, str, float]]]:
     """
     Backtest a combined micro pullback and bull flag strategy ensuring strong volume, momentum, and clean setups.
+
+    Pass an ``AsyncHistClient`` as ``client`` to fetch each date's tickers concurrently
+    instead of waiting on ``ticker_event`` one request at a time.
     """
 
     date_stats = {}
@@ -22,23 +29,31 @@ def backtest(
 
     for date in selected_stocks.keys():
         date_stats[date] = {}
-        for ticker in selected_stocks[date]:
-            ticker_event.clear()
-            histData(
-                app,
-                reqID,
-                usTechStk(ticker),
-                date + " 22:05:00 US/Eastern",
-                "10 D",
-                "5 mins",
+        if client is not None:
+            frames = client.fetch_frames(
+                selected_stocks[date], date + " 22:05:00 US/Eastern", "10 D", "5 mins"
             )
-            ticker_event.wait()
+        for ticker in selected_stocks[date]:
+            if client is not None:
+                bars = frames.get(ticker)
+            else:
+                ticker_event.clear()
+                histData(
+                    app,
+                    reqID,
+                    usTechStk(ticker),
+                    date + " 22:05:00 US/Eastern",
+                    "10 D",
+                    "5 mins",
+                )
+                ticker_event.wait()
+                bars = app.data.get(reqID)
 
-            if reqID not in app.data or app.data[reqID].empty:
+            if bars is None or bars.empty:
                 print(f"Warning: No data for {ticker} on {date}")
                 continue
 
-            df = app.data[reqID].copy()
+            df = bars.copy()
             df["Volume"] = df["Volume"].astype(float)
             df["DateTime"] = df["Date"].apply(
                 lambda date: datetime.strptime(
@@ -46,12 +61,7 @@ def backtest(
                 )
             )
 
-            df["DateOnly"] = df["DateTime"].dt.date
-
-            df_vwap = (
-                df.groupby("DateOnly").apply(compute_daily_vwap).reset_index(drop=True)
-            )
-            df = df.merge(df_vwap, on="DateTime", how="left")
+            compute_session_vwap(df)
 
             # === Micro Pullback Setup ===
             df["Green"] = df["Close"] > df["Open"]
@@ -98,44 +108,25 @@ def backtest(
             df.dropna(inplace=True)
 
             # === Simulate Trades ===
-            in_position = False
-            entry_price, stop_loss, target_price = None, None, None
-            buy_date, sell_date = None, None
-
-            for i in range(len(df)):
-                close_price = df.iloc[i]["Close"]
-
-                if not in_position:
-                    if df.iloc[i]["MicroPullback"] or df.iloc[i]["BullFlag"]:
-                        entry_price = close_price
-                        stop_loss = entry_price * 0.98
-                        target_price = entry_price * 1.08
-                        buy_date = df.iloc[i]["Date"]
-                        strategy = (
-                            "MicroPullback"
-                            if df.iloc[i]["MicroPullback"]
-                            else "BullFlag"
-                        )
-                        transactions.append(
-                            (buy_date, ticker, f"BUY_{strategy}", entry_price)
-                        )
-                        in_position = True
-
-                if in_position:
-                    if close_price >= target_price or close_price <= stop_loss:
-                        exit_price = close_price
-                        sell_date = df.iloc[i]["Date"]
-                        transactions.append((sell_date, ticker, "SELL", exit_price))
-
-                        date_stats[date][ticker] = {
-                            "return": (exit_price - entry_price) / entry_price,
-                            "buy_date": buy_date,
-                            "sell_date": sell_date,
-                        }
-
-                        in_position = False
-                        entry_price, stop_loss, target_price = None, None, None
-                        buy_date, sell_date = None, None
+            trades = simulate(
+                df["Close"],
+                {"MicroPullback": df["MicroPullback"], "BullFlag": df["BullFlag"]},
+                {"MicroPullback": (0.02, 0.08), "BullFlag": (0.02, 0.08)},
+            )
+            dates = df["Date"].to_numpy()
+            for entry, exit, strategy, entry_price, exit_price in trades.rows():
+                buy_date = dates[entry]
+                transactions.append((buy_date, ticker, f"BUY_{strategy}", entry_price))
+                if exit is None:
+                    continue
+
+                sell_date = dates[exit]
+                transactions.append((sell_date, ticker, "SELL", exit_price))
+                date_stats[date][ticker] = {
+                    "return": (exit_price - entry_price) / entry_price,
+                    "buy_date": buy_date,
+                    "sell_date": sell_date,
+                }
 
             app.data[reqID] = df
             reqID += 1
@@ -9,13 +9,36 @@ import ta
 from scipy.stats import entropy
 from sklearn.linear_model import LinearRegression
 
+from backtesting.simulator import simulate, simulate_books
 from data.data_fetcher import histData, usTechStk
+from data.schema import compact_frame
+from indicators.feature_store import FeatureStore
+from indicators.panel import rolling, shift
 from strategies.micro_pull_back_breakout import compute_breakout_signal
 from strategies.micro_pull_back_ema import compute_micro_pullback_ema_strategy
 from strategies.micro_pullback import compute_micro_pullback
-from strategies.stockastic_bolinger_bands import \
-    compute_stochastic_bollinger_band
-from utils import compute_daily_vwap
+from strategies.stockastic_bolinger_bands import compute_stochastic_bollinger_band
+from utils import compute_session_vwap
+
+# Entry type -> signal column, in the order simultaneous signals are resolved
+ENTRY_SIGNALS = {
+    "EMA": "EMABuySignal",
+    "MicroPullback": "MicroPullback",
+    "Breakout": "Breakout",
+    "StochasticBollinger": "StochasticBollinger",
+}
+# Entry type -> (stop loss, target) as fractions of the entry price
+EXIT_RULES = {
+    "EMA": (0.03, 0.06),
+    "MicroPullback": (0.03, 0.04),
+    "Breakout": (0.03, 0.05),
+    "StochasticBollinger": (0.03, 0.05),
+}
+# Book holding the priority-resolved trades in multi-book mode
+COMBINED_BOOK = "Combined"
+# What a compact indicator frame keeps besides the bars: columns, then packed flags
+COMPACT_COLUMNS = ("RelativeVolume",)
+COMPACT_FLAGS = tuple(ENTRY_SIGNALS.values())
 
 # def compute_stochastic_bollinger_band(data: pd.DataFrame) -> pd.DataFrame:
 #     data = data.copy()
@@ -83,310 +106,384 @@ from utils import compute_daily_vwap
 #     return data[['DateTime', 'StochBollingerEntry']]
 
 
-def compute_profit_hunter_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-
-    def t3_ma(series, length=5, vfactor=0.7):
-        e1 = series.ewm(span=length, adjust=False).mean()
-        e2 = e1.ewm(span=length, adjust=False).mean()
-        e3 = e2.ewm(span=length, adjust=False).mean()
-        e4 = e3.ewm(span=length, adjust=False).mean()
-        e5 = e4.ewm(span=length, adjust=False).mean()
-        e6 = e5.ewm(span=length, adjust=False).mean()
-        c1 = -(vfactor**3)
-        c2 = 3 * vfactor**2 + 3 * vfactor**3
-        c3 = -6 * vfactor**2 - 3 * vfactor - 3 * vfactor**3
-        c4 = 1 + 3 * vfactor + vfactor**3 + 3 * vfactor**2
-        return c1 * e6 + c2 * e5 + c3 * e4 + c4 * e3
-
-    df["T3Short"] = t3_ma(df["Close"], length=5)
-    df["T3Long"] = t3_ma(df["Close"], length=8)
-    df["T3Crossover"] = (df["T3Short"] > df["T3Long"]) & (
-        df["T3Short"].shift(1) <= df["T3Long"].shift(1)
+def compute_profit_hunter_signals(df: pd.DataFrame, features=None) -> pd.DataFrame:
+    if features is None or not features.matches(df):
+        features = FeatureStore(df)
+    outputs = profit_hunter_outputs(features)
+    return pd.DataFrame({"DateTime": df["DateTime"], **outputs}, index=df.index)
+
+
+def profit_hunter_outputs(features) -> dict:
+    """
+    Profit hunter signal from read-only column views, without copying the bars.
+
+    Args:
+        features (FeatureStore): Store built on the bars.
+
+    Returns:
+        dict: {'ProfitHunter': bool array}.
+    """
+    close, volume = features.values("Close"), features.values("Volume")
+
+    t3_short = features.values(features.t3("Close", 5))
+    t3_long = features.values(features.t3("Close", 8))
+    t3_crossover = (t3_short > t3_long) & (shift(t3_short) <= shift(t3_long))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        minus_dm = np.abs(features.values(features.diff("Low")))
+        tr = features.true_range()
+
+        atr = features.values(features.rolling(tr, 14))
+        plus_di = 100 * (
+            features.values(features.rolling(features.diff("High"), 14, "sum")) / atr
+        )
+        minus_di = 100 * (rolling(minus_dm, 14, "sum") / atr)
+        dx = (np.abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
+        adx = rolling(dx, 14)
+        adx_strong = adx > 40  # raised from 25 to 30
+
+        ma20 = features.values(features.rolling("Close", 20))
+        std20 = features.values(features.rolling("Close", 20, "std"))
+        upper_bb = ma20 + 2 * std20
+        lower_bb = ma20 - 2 * std20
+        typical_price = features.typical_price()
+        tr_k = features.values(features.rolling(features.range(), 20))
+        upper_kc = features.values(features.rolling(typical_price, 20)) + 1.5 * tr_k
+        lower_kc = features.values(features.rolling(typical_price, 20)) - 1.5 * tr_k
+        boll_kelt_breakout = (upper_bb > upper_kc) & (lower_bb < lower_kc)
+
+        # Combine
+        profit_hunter_raw = t3_crossover & adx_strong & boll_kelt_breakout
+
+        # Final signal: momentum + volume + VWAP positioning + cooldown
+        volume_spike = volume > features.values(features.rolling("Volume", 80)) * 3
+        profit_hunter = (
+            profit_hunter_raw
+            & volume_spike
+            & (close > features.values("VWAP"))  # price above VWAP
+            & (close > shift(close))
+        )
+
+    return {"ProfitHunter": profit_hunter}
+
+
+def _attach(df, output):
+    """
+    ``df`` with the columns of a strategy's output that it lacks.
+
+    Strategies compute on a copy of their input and keep all of its rows and its
+    index, so their output is attached on the index, without a join on 'DateTime'.
+    Columns ``df`` already has (the shared breakout filters) hold the same values and
+    are kept as they are.
+    """
+    new = [column for column in output.columns if column not in df.columns]
+    return pd.concat([df, output[new]], axis=1)
+
+
+def compute_momentum_signals(df: pd.DataFrame, features=None) -> pd.DataFrame:
+    """
+    Compute every entry signal used by ``backtest`` for one ticker's prepared bars.
+
+    All strategies draw their indicators from one ``FeatureStore``, so shared
+    features (80-bar average volume, Bollinger statistics, ATR/RSI/ADX, ...) are
+    computed once per ticker, and their signals are attached to ``df`` on its index.
+
+    Args:
+        df (pd.DataFrame): Bars with 'DateTime', OHLCV and 'VWAP' columns, one row
+            per timestamp.
+        features (FeatureStore, optional): Store built on ``df``. Defaults to None,
+            which builds one.
+
+    Returns:
+        pd.DataFrame: ``df`` with the signal columns, rows with missing values dropped.
+    """
+    if features is None or not features.matches(df):
+        features = FeatureStore(df)
+
+    # df['Green'] = df['Close'] > df['Open']
+    # df['StrongMomentum'] = (
+    #     df['Green'].shift(1).fillna(False) &
+    #     df['Green'].shift(2).fillna(False) &
+    #     df['Green'].shift(3).fillna(False) &
+    #     (df['High'].shift(1) > df['High'].shift(2)) &
+    #     (df['High'].shift(2) > df['High'].shift(3))
+    # )
+
+    # df['ATR'] = df['High'].rolling(15).max() - df['Low'].rolling(15).min()
+    # df['Momentum'] = df['StrongMomentum'] & ((df['High'] - df['Low']) > 0.4 * df['ATR'])
+
+    # df['Pullback'] = (
+    #     (df['Close'] < df['Close'].shift(1)) &
+    #     ((df['Close'].shift(1) - df['Close']) / df['Close'].shift(1) <= 0.02)
+    # )
+    # df['PullbackAboveVWAP'] = df['Pullback'] & (df['Low'] > df['VWAP'])
+
+    df["AverageVolume"] = features.rolling("Volume", 80)
+    df["RelativeVolume"] = df["Volume"] / df["AverageVolume"]
+    # df['Close_to_VWAP'] = df['Close'] / df['VWAP']
+    # df['NotExtended'] = df['Close_to_VWAP'] < 5
+
+    # df['VWAP_Reclaim'] = (df['Low'] > df['VWAP']) & (df['Close'] > df['VWAP'])
+    df["VolumeSpike"] = (df["RelativeVolume"] > 5) & (df["Volume"] > 15000)
+
+    # df['MicroPullback'] = (
+    #     df['StrongMomentum'] &
+    #     df['Pullback'] &
+    #     df['VolumeSpike']
+    # )
+    df_micro_pullback = compute_micro_pullback(
+        df,
+        atr_window=15,
+        volume_window=80,
+        rel_volume_thresh=5,
+        vol_thresh=15000,
+        max_pullback_pct=0.02,
+        features=features,
     )
-
-    high = df["High"]
-    low = df["Low"]
-    close = df["Close"]
-    plus_dm = high.diff()
-    minus_dm = low.diff().abs()
-    tr = pd.concat(
-        [high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1
-    ).max(axis=1)
-
-    atr = tr.rolling(14).mean()
-    plus_di = 100 * (plus_dm.rolling(14).sum() / atr)
-    minus_di = 100 * (minus_dm.rolling(14).sum() / atr)
-    dx = (abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
-    adx = dx.rolling(14).mean()
-    df["ADX_Strong"] = adx > 40  # raised from 25 to 30
-
-    ma20 = df["Close"].rolling(20).mean()
-    std20 = df["Close"].rolling(20).std()
-    upper_bb = ma20 + 2 * std20
-    lower_bb = ma20 - 2 * std20
-    typical_price = (df["High"] + df["Low"] + df["Close"]) / 3
-    tr_k = (df["High"] - df["Low"]).rolling(20).mean()
-    upper_kc = typical_price.rolling(20).mean() + 1.5 * tr_k
-    lower_kc = typical_price.rolling(20).mean() - 1.5 * tr_k
-    df["BollKelt_Breakout"] = (upper_bb > upper_kc) & (lower_bb < lower_kc)
-
-    # Combine
-    df["ProfitHunterRaw"] = (
-        df["T3Crossover"] & df["ADX_Strong"] & df["BollKelt_Breakout"]
+    df = _attach(df, df_micro_pullback)
+
+    def increasing_trend_with_one_small_red(df):
+        small_reds = (df["Close"] < df["Open"]) & (
+            abs(df["Open"] - df["Close"]) / df["Open"] < 0.008
+        )
+        return small_reds.rolling(window=5).sum().shift(1) <= 1
+
+    df["AllowTrend"] = increasing_trend_with_one_small_red(df)
+    # 3. Breakout Candle Strength
+    df["Body"] = abs(df["Close"] - df["Open"])
+    df["Range"] = features.range()
+    df["StrongBreakoutCandle"] = (df["Body"] / df["Range"]) > 0.8
+
+    # 4. ATR Filter
+    atr = features.rolling(features.range(), 10)
+    df["ATR"] = atr
+    df["SufficientVolatility"] = df["ATR"] > features.median(atr)
+    df["PrevHigh5"] = features.shift(features.rolling("High", 5, "max"))
+    # 5. Final Breakout Condition with all filters
+    BREAKOUT_MULTIPLIER = 1.0
+    VWAP_MULTIPLIER = 1.08
+    df_break_out = compute_breakout_signal(df, features=features)
+    df = _attach(df, df_break_out)
+    df["Breakout"] = df["Breakout"] & df["VolumeSpike"]
+    # df['Breakout'] = (
+    #     (df['Close'] > df['PrevHigh5'] * BREAKOUT_MULTIPLIER) &
+    #     df['VolumeSpike'] &
+    #     (df['Close'] > df['VWAP'] * VWAP_MULTIPLIER) &
+    #     df['StrongBreakoutCandle'] &
+    #     #(df['ADX'] > 20) &
+    #     df['AllowTrend'] &
+    #     df['SufficientVolatility']
+    # )
+    # df['PrevHigh5'] = df['High'].rolling(window=4).max().shift(1)
+    # df['Breakout'] = (
+    #     (df['Close'] > df['PrevHigh5']) &
+    #     df['VolumeSpike'] &
+    #     (df['Close'] > 1.15 * df['VWAP']) &
+    #     df['AllowTrend']
+    # )
+
+    df_stoch_boll = compute_stochastic_bollinger_band(df, features=features)
+    df = _attach(df, df_stoch_boll)
+    df["StochasticBollinger"] = df["StochBollingerEntry"]
+
+    # === Profit Hunter ===
+    df_profit = compute_profit_hunter_signals(df, features=features)
+    df = _attach(df, df_profit)
+    # === Micro Pullback V2 ===
+    # df['VWAP_Diff'] = df['VWAP'] - df['Close']
+    # df['VWAP_GapTrend'] = df['VWAP_Diff'].rolling(window=3).apply(lambda x: all(earlier > later for earlier, later in zip(x, x[1:])), raw=True)
+    # df['VWAP_GapTrend'] = df['VWAP_GapTrend'].fillna(0).astype(bool)
+    # df['CloseNearVWAP'] = abs(df['Close'] - df['VWAP']) / df['VWAP'] < 0.1
+    # df['VWAPApproach'] = (
+    #     df['StrongMomentum'] &
+    #     (df['VWAP_Diff'] > 0) &
+    #     df['VWAP_GapTrend'] &
+    #     df['CloseNearVWAP'] &
+    #     df['VolumeSpike']
+    # )
+
+    # df['PriorGreen'] = (
+    #                         df['Green'].shift(5) & df['Green'].shift(4) & df['Green'].shift(3)
+    # )
+    # df['PriorHigherHighs'] = (
+    #     (df['Close'].shift(4) > df['Close'].shift(5)) &
+    #     (df['Close'].shift(3) > df['Close'].shift(4))
+    # )
+    # df['StrongMomentumPrior'] = df['PriorGreen'] & df['PriorHigherHighs']
+
+    # # 2. Pullback in most recent 3 candles (more flexible)
+    # df['LoosePullback'] = (
+    #     (df['Close'] < df['Close'].shift(1)) &
+    #     ((df['Close'].shift(1) - df['Close']) / df['Close'].shift(1) <= 0.05)
+    # )
+    # df['PullbackCount'] = df['LoosePullback'].rolling(window=3).sum()
+
+    # # 3. Entry/explosion on this candle
+    # df['Above90VWAP'] = df['Close'] > 0.9 * df['VWAP']
+    # df['VolumeTrend'] = df['Volume'].rolling(3).mean() > df['Volume'].rolling(10).mean()
+    # df['Explosion'] = (
+    #     (df['Close'] > df['Open']) &
+    #     ((df['Close'] - df['Open']) > 0.5 * df['ATR']) &
+    #     df['VolumeSpike'] &
+    #     df['Above90VWAP']
+    # )
+
+    # # 4. Final signal: momentum precedes pullback, pullback consolidation, then explosion
+    # df['MicroPullbackV2'] = (
+    #     df['StrongMomentumPrior'] &
+    #     (df['PullbackCount'] >= 1) &
+    #     (df['PullbackCount'] <= 3) &
+    #     df['Explosion'] &
+    #     df['NotExtended']
+    # )
+    df_ema = compute_micro_pullback_ema_strategy(
+        df, threshold=0.0003, volume_spike_factor=2, features=features
     )
-
-    # Final signal: momentum + volume + VWAP positioning + cooldown
-    df["ProfitHunter"] = (
-        df["ProfitHunterRaw"]
-        &
-        # df['StrongMomentum'] &
-        (df["Volume"] > df["Volume"].rolling(80).mean() * 3)  # volume spike
-        & (df["Close"] > df["VWAP"])  # price above VWAP
-        & (df["Close"] > df["Close"].shift(1))
+    df = _attach(df, df_ema)
+    return df.dropna()
+
+
+def trade_records(trades, dates, ticker):
+    """
+    Transactions and last closed trade's stats of one ticker's round trips.
+
+    Returns:
+        tuple: ``(transactions, stats)``; ``stats`` is None when no trade closed.
+    """
+    transactions, stats = [], None
+    for entry, exit, entry_type, entry_price, exit_price in trades.rows():
+        buy_date = dates[entry]
+        transactions.append((buy_date, "BUY", ticker, entry_price, entry_type))
+        if exit is None:
+            continue
+        sell_date = dates[exit]
+        transactions.append((sell_date, "SELL", ticker, exit_price, entry_type))
+        stats = {
+            "return": (exit_price - entry_price) / entry_price,
+            "buy_date": buy_date,
+            "sell_date": sell_date,
+            "type": entry_type,
+        }
+    return transactions, stats
+
+
+def backtest_ticker(bars, ticker, multi_book=False, compact=False):
+    """
+    Indicators and trades of one ticker's raw IB bars.
+
+    Args:
+        bars (pd.DataFrame): Bars as delivered by ``TradeApp.historicalData``.
+        ticker (str): Ticker symbol recorded in the transactions.
+        multi_book (bool, optional): Also trade each entry signal in its own book.
+            Defaults to False.
+        compact (bool, optional): Return the indicator frame pruned to the bars,
+            ``COMPACT_COLUMNS`` and the ``COMPACT_FLAGS`` in the compact schema of
+            ``data.schema.compact_frame``. Trading always uses the full-precision
+            frame. Defaults to False.
+
+    Raises:
+        ValueError: If two bars share a timestamp.
+
+    Returns:
+        tuple: ``(df, books)``: the indicator frame and a dict from book name to the
+            ``trade_records`` of that book.
+    """
+    df = bars.copy()
+
+    df["Volume"] = df["Volume"].astype(float)
+    df["DateTime"] = pd.to_datetime(
+        df["Date"].str.replace(" US/Eastern", "", regex=False)
     )
-    return df[["DateTime", "ProfitHunter"]]
+    if df["DateTime"].duplicated().any():
+        raise ValueError(f"{ticker}: duplicate bar timestamps")
+    compute_session_vwap(df)
+
+    df = compute_momentum_signals(df)
+
+    signals = {name: df[column] for name, column in ENTRY_SIGNALS.items()}
+    if multi_book:
+        trades = simulate_books(df["Close"], signals, EXIT_RULES, COMBINED_BOOK)
+    else:
+        trades = {COMBINED_BOOK: simulate(df["Close"], signals, EXIT_RULES)}
+    dates = df["Date"].to_numpy()
+    if compact:
+        df = compact_frame(df, COMPACT_COLUMNS, COMPACT_FLAGS)
+    return df, {
+        book: trade_records(book_trades, dates, ticker)
+        for book, book_trades in trades.items()
+    }
 
 
 def backtest(
-    selected_stocks: Dict[str, List[str]], app, ticker_event: threading.Event
+    selected_stocks: Dict[str, List[str]],
+    app,
+    ticker_event: threading.Event,
+    client=None,
+    multi_book: bool = False,
+    compact: bool = False,
 ) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], List[Tuple[str, str, str, float]]]:
-
-    date_stats = {}
-    transactions = collections.defaultdict(list)
+    """
+    Run the momentum strategy over every selected ticker and date.
+
+    Args:
+        selected_stocks (dict): Date (YYYYMMDD) to the tickers to trade that day.
+        app: IB app whose ``data`` receives each ticker's indicator frame by reqID.
+        ticker_event (threading.Event): Set by ``app`` when a history request ends.
+        client (optional): Batch fetcher with ``fetch_frames``; when None, bars are
+            requested one ticker at a time through ``app``.
+        multi_book (bool, optional): Also trade each entry signal in its own position
+            book, from the same indicator pass. Defaults to False.
+        compact (bool, optional): Keep compact indicator frames in ``app.data`` (see
+            ``backtest_ticker``). Defaults to False.
+
+    Returns:
+        tuple: ``(date_stats, transactions)``. With ``multi_book`` both are dicts from
+            book name (``COMBINED_BOOK`` for the priority-resolved trades, then each
+            key of ``ENTRY_SIGNALS``) to that book's ``date_stats`` and
+            ``transactions``.
+    """
+    books = [COMBINED_BOOK] + list(ENTRY_SIGNALS) if multi_book else [COMBINED_BOOK]
+    book_stats = {book: {} for book in books}
+    book_transactions = {book: collections.defaultdict(list) for book in books}
     reqID = 1000
 
     for date in selected_stocks.keys():
-        date_stats[date] = {}
-        for ticker in selected_stocks[date]:
-            ticker_event.clear()
-            histData(
-                app,
-                reqID,
-                usTechStk(ticker),
-                date + " 22:05:00 US/Eastern",
-                "5 D",
-                "1 min",
+        for book in books:
+            book_stats[book][date] = {}
+        if client is not None:
+            frames = client.fetch_frames(
+                selected_stocks[date], date + " 22:05:00 US/Eastern", "5 D", "1 min"
             )
-            ticker_event.wait()
+        for ticker in selected_stocks[date]:
+            if client is not None:
+                bars = frames.get(ticker)
+            else:
+                ticker_event.clear()
+                histData(
+                    app,
+                    reqID,
+                    usTechStk(ticker),
+                    date + " 22:05:00 US/Eastern",
+                    "5 D",
+                    "1 min",
+                )
+                ticker_event.wait()
+                bars = app.data.get(reqID)
 
-            if reqID not in app.data or app.data[reqID].empty:
+            if bars is None or bars.empty:
                 print(f"Warning: No data for {ticker} on {date}")
                 continue
 
-            df = app.data[reqID].copy()
-
-            df["Volume"] = df["Volume"].astype(float)
-            df["DateTime"] = pd.to_datetime(
-                df["Date"].str.replace(" US/Eastern", "", regex=False)
-            )
-            df["DateOnly"] = df["DateTime"].dt.date
-
-            df_vwap = (
-                df.groupby("DateOnly").apply(compute_daily_vwap).reset_index(drop=True)
-            )
-            df = df.merge(df_vwap, on="DateTime", how="left")
-
-            # df['Green'] = df['Close'] > df['Open']
-            # df['StrongMomentum'] = (
-            #     df['Green'].shift(1).fillna(False) &
-            #     df['Green'].shift(2).fillna(False) &
-            #     df['Green'].shift(3).fillna(False) &
-            #     (df['High'].shift(1) > df['High'].shift(2)) &
-            #     (df['High'].shift(2) > df['High'].shift(3))
-            # )
-
-            # df['ATR'] = df['High'].rolling(15).max() - df['Low'].rolling(15).min()
-            # df['Momentum'] = df['StrongMomentum'] & ((df['High'] - df['Low']) > 0.4 * df['ATR'])
-
-            # df['Pullback'] = (
-            #     (df['Close'] < df['Close'].shift(1)) &
-            #     ((df['Close'].shift(1) - df['Close']) / df['Close'].shift(1) <= 0.02)
-            # )
-            # df['PullbackAboveVWAP'] = df['Pullback'] & (df['Low'] > df['VWAP'])
-
-            df["AverageVolume"] = df["Volume"].rolling(window=80).mean()
-            df["RelativeVolume"] = df["Volume"] / df["AverageVolume"]
-            # df['Close_to_VWAP'] = df['Close'] / df['VWAP']
-            # df['NotExtended'] = df['Close_to_VWAP'] < 5
-
-            # df['VWAP_Reclaim'] = (df['Low'] > df['VWAP']) & (df['Close'] > df['VWAP'])
-            df["VolumeSpike"] = (df["RelativeVolume"] > 5) & (df["Volume"] > 15000)
-
-            # df['MicroPullback'] = (
-            #     df['StrongMomentum'] &
-            #     df['Pullback'] &
-            #     df['VolumeSpike']
-            # )
-            df_micro_pullback = compute_micro_pullback(
-                df,
-                atr_window=15,
-                volume_window=80,
-                rel_volume_thresh=5,
-                vol_thresh=15000,
-                max_pullback_pct=0.02,
-            )
-            df = df.merge(df_micro_pullback, on="DateTime", how="left")
-            df["MicroPullback"] = df["MicroPullback"].fillna(False)
-
-            def increasing_trend_with_one_small_red(df):
-                small_reds = (df["Close"] < df["Open"]) & (
-                    abs(df["Open"] - df["Close"]) / df["Open"] < 0.008
-                )
-                return small_reds.rolling(window=5).sum().shift(1) <= 1
-
-            df["AllowTrend"] = increasing_trend_with_one_small_red(df)
-            # 3. Breakout Candle Strength
-            df["Body"] = abs(df["Close"] - df["Open"])
-            df["Range"] = df["High"] - df["Low"]
-            df["StrongBreakoutCandle"] = (df["Body"] / df["Range"]) > 0.8
-
-            # 4. ATR Filter
-            df["ATR"] = (df["High"] - df["Low"]).rolling(window=10).mean()
-            df["SufficientVolatility"] = df["ATR"] > df["ATR"].median()
-            df["PrevHigh5"] = df["High"].rolling(window=5).max().shift(1)
-            # 5. Final Breakout Condition with all filters
-            BREAKOUT_MULTIPLIER = 1.0
-            VWAP_MULTIPLIER = 1.08
-            df_break_out = compute_breakout_signal(df)
-            df = df.merge(df_break_out, on="DateTime", how="left")
-            df["Breakout"] = df["Breakout"].fillna(False) & df["VolumeSpike"]
-            # df['Breakout'] = (
-            #     (df['Close'] > df['PrevHigh5'] * BREAKOUT_MULTIPLIER) &
-            #     df['VolumeSpike'] &
-            #     (df['Close'] > df['VWAP'] * VWAP_MULTIPLIER) &
-            #     df['StrongBreakoutCandle'] &
-            #     #(df['ADX'] > 20) &
-            #     df['AllowTrend'] &
-            #     df['SufficientVolatility']
-            # )
-            # df['PrevHigh5'] = df['High'].rolling(window=4).max().shift(1)
-            # df['Breakout'] = (
-            #     (df['Close'] > df['PrevHigh5']) &
-            #     df['VolumeSpike'] &
-            #     (df['Close'] > 1.15 * df['VWAP']) &
-            #     df['AllowTrend']
-            # )
-
-            df_stoch_boll = compute_stochastic_bollinger_band(df)
-            df = df.merge(df_stoch_boll, on="DateTime", how="left")
-            df["StochasticBollinger"] = df["StochBollingerEntry"].fillna(False)
-
-            # === Profit Hunter ===
-            df_profit = compute_profit_hunter_signals(df)
-            df = df.merge(df_profit, on="DateTime", how="left")
-            df["ProfitHunter"] = df["ProfitHunter"].fillna(False)
-            # === Micro Pullback V2 ===
-            # df['VWAP_Diff'] = df['VWAP'] - df['Close']
-            # df['VWAP_GapTrend'] = df['VWAP_Diff'].rolling(window=3).apply(lambda x: all(earlier > later for earlier, later in zip(x, x[1:])), raw=True)
-            # df['VWAP_GapTrend'] = df['VWAP_GapTrend'].fillna(0).astype(bool)
-            # df['CloseNearVWAP'] = abs(df['Close'] - df['VWAP']) / df['VWAP'] < 0.1
-            # df['VWAPApproach'] = (
-            #     df['StrongMomentum'] &
-            #     (df['VWAP_Diff'] > 0) &
-            #     df['VWAP_GapTrend'] &
-            #     df['CloseNearVWAP'] &
-            #     df['VolumeSpike']
-            # )
-
-            # df['PriorGreen'] = (
-            #                         df['Green'].shift(5) & df['Green'].shift(4) & df['Green'].shift(3)
-            # )
-            # df['PriorHigherHighs'] = (
-            #     (df['Close'].shift(4) > df['Close'].shift(5)) &
-            #     (df['Close'].shift(3) > df['Close'].shift(4))
-            # )
-            # df['StrongMomentumPrior'] = df['PriorGreen'] & df['PriorHigherHighs']
-
-            # # 2. Pullback in most recent 3 candles (more flexible)
-            # df['LoosePullback'] = (
-            #     (df['Close'] < df['Close'].shift(1)) &
-            #     ((df['Close'].shift(1) - df['Close']) / df['Close'].shift(1) <= 0.05)
-            # )
-            # df['PullbackCount'] = df['LoosePullback'].rolling(window=3).sum()
-
-            # # 3. Entry/explosion on this candle
-            # df['Above90VWAP'] = df['Close'] > 0.9 * df['VWAP']
-            # df['VolumeTrend'] = df['Volume'].rolling(3).mean() > df['Volume'].rolling(10).mean()
-            # df['Explosion'] = (
-            #     (df['Close'] > df['Open']) &
-            #     ((df['Close'] - df['Open']) > 0.5 * df['ATR']) &
-            #     df['VolumeSpike'] &
-            #     df['Above90VWAP']
-            # )
-
-            # # 4. Final signal: momentum precedes pullback, pullback consolidation, then explosion
-            # df['MicroPullbackV2'] = (
-            #     df['StrongMomentumPrior'] &
-            #     (df['PullbackCount'] >= 1) &
-            #     (df['PullbackCount'] <= 3) &
-            #     df['Explosion'] &
-            #     df['NotExtended']
-            # )
-            df_ema = compute_micro_pullback_ema_strategy(
-                df, threshold=0.0003, volume_spike_factor=2
-            )
-            df = df.merge(df_ema, on="DateTime", how="left")
-            df["EMABuySignal"] = df["EMABuySignal"].fillna(False)
-            df.dropna(inplace=True)
-
-            in_position = False
-            entry_price, stop_loss, target_price = None, None, None
-            buy_date, sell_date, entry_type = None, None, None
-
-            for i in range(len(df)):
-                row = df.iloc[i]
-                close_price = row["Close"]
-
-                if not in_position:
-                    if row["EMABuySignal"]:
-                        entry_type = "EMA"
-                        stop_loss_pct = 0.03
-                        target_pct = 0.06
-                    elif row["MicroPullback"]:
-                        entry_type = "MicroPullback"
-                        stop_loss_pct = 0.03
-                        target_pct = 0.04
-                    elif row["Breakout"]:
-                        entry_type = "Breakout"
-                        stop_loss_pct = 0.03
-                        target_pct = 0.05
-                    elif row["StochasticBollinger"]:
-                        entry_type = "StochasticBollinger"
-                        stop_loss_pct = 0.03
-                        target_pct = 0.05
-
-                    else:
-                        continue
-
-                    entry_price = close_price
-                    stop_loss = entry_price * (1 - stop_loss_pct)
-                    target_price = entry_price * (1 + target_pct)
-                    buy_date = row["Date"]
-                    transactions[reqID].append(
-                        (buy_date, "BUY", ticker, entry_price, entry_type)
-                    )
-                    in_position = True
-
-                else:
-                    if close_price >= target_price or close_price <= stop_loss:
-                        exit_price = close_price
-                        sell_date = row["Date"]
-                        transactions[reqID].append(
-                            (sell_date, "SELL", ticker, exit_price, entry_type)
-                        )
-                        date_stats[date][ticker] = {
-                            "return": (exit_price - entry_price) / entry_price,
-                            "buy_date": buy_date,
-                            "sell_date": sell_date,
-                            "type": entry_type,
-                        }
-
-                        in_position = False
-                        entry_price, stop_loss, target_price = None, None, None
-                        buy_date, sell_date, entry_type = None, None, None
+            df, records = backtest_ticker(bars, ticker, multi_book, compact)
+            for book, (rows, stats) in records.items():
+                if rows:
+                    book_transactions[book][reqID].extend(rows)
+                if stats is not None:
+                    book_stats[book][date][ticker] = stats
 
             app.data[reqID] = df
             reqID += 1
 
-    return date_stats, transactions
+    if multi_book:
+        return book_stats, book_transactions
+    return book_stats[COMBINED_BOOK], book_transactions[COMBINED_BOOK]
@@ -3,14 +3,21 @@ from typing import Dict, List, Tuple
 
 import pandas as pd
 
+from backtesting.simulator import simulate
 from data.data_fetcher import histData, usTechStk
 
 
 def backtest(
-    selected_stocks: Dict[str, List[str]], app, ticker_event: threading.Event
+    selected_stocks: Dict[str, List[str]],
+    app,
+    ticker_event: threading.Event,
+    client=None,
 ) -> Tuple[Dict[str, Dict[str, Dict[str, float]]], List[Tuple[str, str, str, float]]]:
     """
     Backtest a micro pullback strategy ensuring trades occur only with high relative volume (RVOL).
+
+    Pass an ``AsyncHistClient`` as ``client`` to fetch each date's tickers concurrently
+    instead of waiting on ``ticker_event`` one request at a time.
     """
 
     date_stats = {}
@@ -19,23 +26,31 @@ def backtest(
 
     for date in selected_stocks.keys():
         date_stats[date] = {}
-        for ticker in selected_stocks[date]:
-            ticker_event.clear()
-            histData(
-                app,
-                reqID,
-                usTechStk(ticker),
-                date + " 22:05:00 US/Eastern",
-                "10 D",
-                "1 min",
+        if client is not None:
+            frames = client.fetch_frames(
+                selected_stocks[date], date + " 22:05:00 US/Eastern", "10 D", "1 min"
             )
-            ticker_event.wait()
-
-            if reqID not in app.data or app.data[reqID].empty:
+        for ticker in selected_stocks[date]:
+            if client is not None:
+                bars = frames.get(ticker)
+            else:
+                ticker_event.clear()
+                histData(
+                    app,
+                    reqID,
+                    usTechStk(ticker),
+                    date + " 22:05:00 US/Eastern",
+                    "10 D",
+                    "1 min",
+                )
+                ticker_event.wait()
+                bars = app.data.get(reqID)
+
+            if bars is None or bars.empty:
                 print(f"Warning: No data for {ticker} on {date}")
                 continue
 
-            df = app.data[reqID].copy()
+            df = bars.copy()
             df["Volume"] = df["Volume"].astype(float)  # Ensure Volume is float
 
             # **Momentum Identification**
@@ -70,41 +85,27 @@ def backtest(
 
             df.dropna(inplace=True)
 
-            in_position = False  # Track if a trade is open
-            entry_price, stop_loss, target_price = None, None, None
-            buy_date, sell_date = None, None
-
-            for i in range(len(df)):
-                close_price = df.iloc[i]["Close"]
-
-                # **Entry Condition**: Ensure RVOL is high
-                if not in_position and df.iloc[i]["MicroPullback"]:
-                    entry_price = close_price
-                    stop_loss = entry_price * 0.98  # 2% Stop Loss
-                    target_price = entry_price * 1.05  # 2% Take Profit
-                    buy_date = df.iloc[i]["Date"]
-
-                    transactions.append((buy_date, ticker, "BUY", entry_price))
-                    in_position = True
-
-                # **Exit Conditions**: Close before starting new trade
-                if in_position:
-                    if close_price >= target_price or close_price <= stop_loss:
-                        exit_price = close_price
-                        sell_date = df.iloc[i]["Date"]
-                        transactions.append((sell_date, ticker, "SELL", exit_price))
-
-                        # **Record trade stats**
-                        date_stats[date][ticker] = {
-                            "return": (exit_price - entry_price) / entry_price,
-                            "buy_date": buy_date,
-                            "sell_date": sell_date,
-                        }
-
-                        # **Reset for next trade**
-                        in_position = False
-                        entry_price, stop_loss, target_price = None, None, None
-                        buy_date, sell_date = None, None
+            # **Entry**: micro pullback with high RVOL; 2% stop loss, 5% take profit
+            trades = simulate(
+                df["Close"],
+                {"MicroPullback": df["MicroPullback"]},
+                {"MicroPullback": (0.02, 0.05)},
+            )
+            dates = df["Date"].to_numpy()
+            for entry, exit, _, entry_price, exit_price in trades.rows():
+                buy_date = dates[entry]
+                transactions.append((buy_date, ticker, "BUY", entry_price))
+                if exit is None:
+                    continue
+
+                # **Exit**: first close at the target or stop
+                sell_date = dates[exit]
+                transactions.append((sell_date, ticker, "SELL", exit_price))
+                date_stats[date][ticker] = {
+                    "return": (exit_price - entry_price) / entry_price,
+                    "buy_date": buy_date,
+                    "sell_date": sell_date,
+                }
 
             app.data[reqID] = df
             reqID += 1
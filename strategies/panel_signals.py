@@ -0,0 +1,213 @@
+"""
+Panel (time x ticker) versions of the per-ticker entry signals.
+
+Each function evaluates one strategy for every ticker of a ``data.panel.Panel`` at
+once and returns a (time x ticker) boolean array equal to the signal the per-ticker
+function computes on that ticker's own frame. Every window and shift is passed the
+panel's ``present`` mask, so it runs over the ticker's own bars even where the ticker
+has no bar at some panel timestamps (see ``indicators.panel``).
+"""
+
+import numpy as np
+
+from indicators.panel import (
+    as_float,
+    column_median,
+    diff,
+    rolling,
+    shift,
+    wilder_adx,
+    wilder_atr,
+    wilder_rsi,
+)
+
+
+def panel_volume_spike(panel, volume_window=80, rel_volume_thresh=5, vol_thresh=15000):
+    """Relative-volume spike as computed by the momentum backtest ('VolumeSpike')."""
+    average_volume = rolling(panel.volume, volume_window, present=panel.present)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative_volume = panel.volume / average_volume
+    return (relative_volume > rel_volume_thresh) & (panel.volume > vol_thresh)
+
+
+def panel_micro_pullback(
+    panel,
+    atr_window=15,
+    volume_window=80,
+    rel_volume_thresh=5,
+    vol_thresh=15000,
+    max_pullback_pct=0.015,
+):
+    """
+    ``compute_micro_pullback`` for every ticker of ``panel``.
+
+    Takes the same parameters; ``atr_window`` only feeds diagnostic columns in the
+    per-ticker version and does not change the signal.
+
+    Returns:
+        np.ndarray: (time x ticker) 'MicroPullback' flags.
+    """
+    open_, high, close = panel.open, panel.high, panel.close
+    present = panel.present
+
+    green = close > open_
+    prev_high = [shift(high, k, present=present) for k in (1, 2, 3)]
+    strong_momentum = (
+        shift(green, 1, present=present)
+        & shift(green, 2, present=present)
+        & shift(green, 3, present=present)
+        & (prev_high[0] > prev_high[1])
+        & (prev_high[1] > prev_high[2])
+    )
+
+    prev_close = shift(close, present=present)
+    with np.errstate(invalid="ignore"):
+        pullback = (close < prev_close) & (
+            (prev_close - close) / prev_close <= max_pullback_pct
+        )
+    volume_spike = panel_volume_spike(
+        panel, volume_window, rel_volume_thresh, vol_thresh
+    )
+    return strong_momentum & pullback & volume_spike
+
+
+def panel_breakout_signal(
+    panel,
+    volume_spike=None,
+    breakout_multiplier=1.0,
+    vwap_multiplier=1.1,
+    rsi_overbought=85,
+):
+    """
+    ``compute_breakout_signal`` for every ticker of ``panel``.
+
+    Args:
+        panel (Panel): Aligned bars.
+        volume_spike (np.ndarray, optional): (time x ticker) 'VolumeSpike' flags the
+            per-ticker version reads from its input frame. Defaults to None, which uses
+            ``panel_volume_spike`` with the momentum backtest's settings.
+
+    Returns:
+        np.ndarray: (time x ticker) 'Breakout' flags.
+    """
+    open_, high, low, close = panel.open, panel.high, panel.low, panel.close
+    present = panel.present
+    if volume_spike is None:
+        volume_spike = panel_volume_spike(panel)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        small_reds = (close < open_) & (np.abs(open_ - close) / open_ < 0.008)
+        red_count = rolling(as_float(small_reds, present), 5, "sum", present=present)
+        allow_trend = shift(red_count, present=present) <= 1
+
+        candle_range = high - low
+        strong_candle = (np.abs(close - open_) / candle_range) > 0.8
+
+        atr = rolling(candle_range, 10, present=present)
+        sufficient_volatility = atr > column_median(atr)
+        prev_high5 = shift(rolling(high, 5, "max", present=present), present=present)
+
+        delta = diff(close, present=present)
+        gain = rolling(np.where(delta < 0, 0.0, delta), 14, present=present)
+        loss = -rolling(np.where(delta > 0, 0.0, delta), 14, present=present)
+        rsi = 100 - (100 / (1 + gain / (loss + 1e-10)))
+
+        return (
+            (close > prev_high5 * breakout_multiplier)
+            & (close < panel.vwap * vwap_multiplier)
+            & (rsi < rsi_overbought)
+            & volume_spike
+            & strong_candle
+            & allow_trend
+            & sufficient_volatility
+        )
+
+
+def panel_stochastic_bollinger_band(
+    panel,
+    volume_multiplier: float = 1.5,
+    bb_width_threshold: float = 0.015,
+    adx_threshold: float = 20,
+    rsi_threshold: float = 30,
+    atr_multiplier: float = 1.0,
+):
+    """
+    ``compute_stochastic_bollinger_band`` for every ticker of ``panel``.
+
+    Returns:
+        np.ndarray: (time x ticker) 'StochBollingerEntry' flags.
+    """
+    open_, high, low, close = panel.open, panel.high, panel.low, panel.close
+    present = panel.present
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        high_14 = rolling(high, 14, "max", present=present)
+        low_14 = rolling(low, 14, "min", present=present)
+        k = 100 * ((close - low_14) / (high_14 - low_14))
+        d = rolling(k, 3, present=present)
+
+        ma20 = rolling(close, 20, present=present)
+        std20 = rolling(close, 20, "std", present=present)
+        upper_bb = ma20 + 2 * std20
+        lower_bb = ma20 - 2 * std20
+        bb_width = (upper_bb - lower_bb) / ma20
+
+        rsi = wilder_rsi(close, 14)
+        adx = wilder_adx(high, low, close, 14)
+        atr = wilder_atr(high, low, close, 14)
+        atr_avg = rolling(atr, 20, present=present)
+
+        average_volume = rolling(panel.volume, 20, present=present)
+        volume_spike = panel.volume > volume_multiplier * average_volume
+
+        candle_range = high - low
+        bullish_candle = (
+            (close > open_)
+            & ((close - low) > 0.6 * candle_range)
+            & (np.abs(close - open_) > 0.5 * candle_range)
+        )
+
+        prev_k = shift(k, present=present)
+        stoch_cross = (k > d) & (prev_k <= shift(d, present=present)) & (k > prev_k)
+        bb_reversal = (
+            (shift(close, present=present) < shift(lower_bb, present=present))
+            & (close > lower_bb)
+            & (bb_width > bb_width_threshold)
+        )
+        break_prev_high = close > shift(high, present=present)
+
+        return (
+            stoch_cross
+            & bb_reversal
+            & volume_spike
+            & (rsi < rsi_threshold)
+            & break_prev_high
+            & (adx > adx_threshold)
+            & (atr > atr_multiplier * atr_avg)
+            & bullish_candle
+        )
+
+
+def compute_panel_signals(panel):
+    """
+    Micro pullback, breakout and stochastic Bollinger signals for a whole universe,
+    with the settings ``micro_pullback_momentum.backtest`` uses.
+
+    Returns:
+        dict: 'MicroPullback', 'Breakout' and 'StochasticBollinger' (time x ticker)
+            boolean DataFrames. ``panel.to_frames(**signals)`` splits them per ticker.
+    """
+    volume_spike = panel_volume_spike(panel)
+    signals = {
+        "MicroPullback": panel_micro_pullback(
+            panel,
+            atr_window=15,
+            volume_window=80,
+            rel_volume_thresh=5,
+            vol_thresh=15000,
+            max_pullback_pct=0.02,
+        ),
+        "Breakout": panel_breakout_signal(panel, volume_spike),
+        "StochasticBollinger": panel_stochastic_bollinger_band(panel),
+    }
+    return {name: panel.frame(values) for name, values in signals.items()}
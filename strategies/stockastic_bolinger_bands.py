@@ -2,7 +2,9 @@ from typing import Optional
 
 import numpy as np
 import pandas as pd
-import ta
+
+from indicators.feature_store import FeatureStore
+from indicators.panel import rolling, shift
 
 
 def compute_stochastic_bollinger_band(
@@ -12,70 +14,92 @@ def compute_stochastic_bollinger_band(
     adx_threshold: float = 20,
     rsi_threshold: float = 30,
     atr_multiplier: float = 1.0,
+    features: Optional[FeatureStore] = None,
 ) -> pd.DataFrame:
-    data = data.copy()
-
-    # ====== Technical Indicators ======
-    high_14 = data["High"].rolling(window=14).max()
-    low_14 = data["Low"].rolling(window=14).min()
-    data["%K"] = 100 * ((data["Close"] - low_14) / (high_14 - low_14))
-    data["%D"] = data["%K"].rolling(window=3).mean()
-
-    data["MA20"] = data["Close"].rolling(window=20).mean()
-    data["STD20"] = data["Close"].rolling(window=20).std()
-    data["UpperBB"] = data["MA20"] + 2 * data["STD20"]
-    data["LowerBB"] = data["MA20"] - 2 * data["STD20"]
-    data["BB_Width"] = (data["UpperBB"] - data["LowerBB"]) / data["MA20"]
-
-    data["RSI"] = ta.momentum.RSIIndicator(data["Close"], window=14).rsi()
-    adx = ta.trend.ADXIndicator(data["High"], data["Low"], data["Close"], window=14)
-    data["ADX"] = adx.adx()
-    atr = ta.volatility.AverageTrueRange(
-        data["High"], data["Low"], data["Close"], window=14
-    )
-    data["ATR"] = atr.average_true_range()
-    data["ATR_avg"] = data["ATR"].rolling(window=20).mean()
-
-    data["avg_volume"] = data["Volume"].rolling(window=20).mean()
-    data["volume_spike"] = data["Volume"] > volume_multiplier * data["avg_volume"]
-
-    # ====== Candlestick Features ======
-    candle_range = data["High"] - data["Low"]
-    candle_body = abs(data["Close"] - data["Open"])
-    data["BullishCandle"] = (
-        (data["Close"] > data["Open"])
-        & ((data["Close"] - data["Low"]) > 0.6 * candle_range)
-        & (candle_body > 0.5 * candle_range)
+    if features is None or not features.matches(data):
+        features = FeatureStore(data)
+    outputs = stochastic_bollinger_outputs(
+        features,
+        volume_multiplier,
+        bb_width_threshold,
+        adx_threshold,
+        rsi_threshold,
+        atr_multiplier,
     )
+    return pd.DataFrame({"DateTime": data["DateTime"], **outputs}, index=data.index)
 
-    # ====== Entry Conditions ======
-    data["StochCross"] = (
-        (data["%K"] > data["%D"])
-        & (data["%K"].shift(1) <= data["%D"].shift(1))
-        & (data["%K"] > data["%K"].shift(1))
-    )
 
-    data["BB_Reversal"] = (
-        (data["Close"].shift(1) < data["LowerBB"].shift(1))
-        & (data["Close"] > data["LowerBB"])
-        & (data["BB_Width"] > bb_width_threshold)
-    )
+def stochastic_bollinger_outputs(
+    features: FeatureStore,
+    volume_multiplier: float = 1.5,
+    bb_width_threshold: float = 0.015,
+    adx_threshold: float = 20,
+    rsi_threshold: float = 30,
+    atr_multiplier: float = 1.0,
+) -> dict:
+    """
+    Stochastic/Bollinger entry signal from read-only column views, without copying
+    the bars.
 
-    data["BreakPrevHigh"] = data["Close"] > data["High"].shift(1)
-
-    data["RSI_OK"] = data["RSI"] < rsi_threshold
-    data["StrongTrend"] = data["ADX"] > adx_threshold
-    data["Volatility_OK"] = data["ATR"] > atr_multiplier * data["ATR_avg"]
-
-    data["StochBollingerEntry"] = (
-        data["StochCross"]
-        & data["BB_Reversal"]
-        & data["volume_spike"]
-        & data["RSI_OK"]
-        & data["BreakPrevHigh"]
-        & data["StrongTrend"]
-        & data["Volatility_OK"]
-        & data["BullishCandle"]
-    )
+    Args:
+        features (FeatureStore): Store built on the bars.
+
+    Returns:
+        dict: {'StochBollingerEntry': bool array}.
+    """
+    open_, high = features.values("Open"), features.values("High")
+    low, close = features.values("Low"), features.values("Close")
+    volume = features.values("Volume")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # ====== Technical Indicators ======
+        high_14 = features.values(features.rolling("High", 14, "max"))
+        low_14 = features.values(features.rolling("Low", 14, "min"))
+        k = 100 * ((close - low_14) / (high_14 - low_14))
+        d = rolling(k, 3)
+
+        ma20 = features.values(features.rolling("Close", 20))
+        std20 = features.values(features.rolling("Close", 20, "std"))
+        lower_bb = ma20 - 2 * std20
+        bb_width = ((ma20 + 2 * std20) - lower_bb) / ma20
+
+        rsi = features.values(features.rsi(14))
+        adx = features.values(features.adx(14))
+        atr = features.values(features.atr(14))
+        atr_avg = features.values(features.rolling(features.atr(14), 20))
+
+        avg_volume = features.values(features.rolling("Volume", 20))
+        volume_spike = volume > volume_multiplier * avg_volume
+
+        # ====== Candlestick Features ======
+        candle_range = high - low
+        candle_body = np.abs(close - open_)
+        bullish_candle = (
+            (close > open_)
+            & ((close - low) > 0.6 * candle_range)
+            & (candle_body > 0.5 * candle_range)
+        )
+
+        # ====== Entry Conditions ======
+        stoch_cross = (k > d) & (shift(k) <= shift(d)) & (k > shift(k))
+
+        bb_reversal = (
+            (shift(close) < shift(lower_bb))
+            & (close > lower_bb)
+            & (bb_width > bb_width_threshold)
+        )
+
+        break_prev_high = close > shift(high)
+
+        entry = (
+            stoch_cross
+            & bb_reversal
+            & volume_spike
+            & (rsi < rsi_threshold)
+            & break_prev_high
+            & (adx > adx_threshold)
+            & (atr > atr_multiplier * atr_avg)
+            & bullish_candle
+        )
 
-    return data[["DateTime", "StochBollingerEntry"]]
+    return {"StochBollingerEntry": entry}
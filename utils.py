@@ -1,7 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# Regular trading hours (US/Eastern) used by the RTH-only VWAP
+RTH_OPEN = "09:30"
+RTH_CLOSE = "16:00"
+
+
 def compute_daily_vwap(df):
-    df = df.copy()
-    df["Typical_Price"] = (df["High"] + df["Low"] + df["Close"]) / 3
-    df["Cumulative_PV"] = (df["Typical_Price"] * df["Volume"]).cumsum()
-    df["Cumulative_Volume"] = df["Volume"].cumsum()
-    df["VWAP"] = df["Cumulative_PV"] / df["Cumulative_Volume"]
-    return df[["DateTime", "VWAP"]]
+    high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+    typical_price = (high + low + close) / 3
+    volume = pd.Series(df["Volume"].to_numpy(), copy=False)
+    cumulative_pv = (typical_price * volume).cumsum()
+    vwap = (cumulative_pv / volume.cumsum()).to_numpy()
+    return pd.DataFrame({"DateTime": df["DateTime"], "VWAP": vwap}, index=df.index)
+
+
+def _minute_of_day(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _session_cumsum(values, sessions):
+    """Cumulative sum of ``values`` that restarts whenever the session code changes."""
+    return (
+        pd.Series(values, copy=False).groupby(sessions, sort=False).cumsum().to_numpy()
+    )
+
+
+def compute_session_vwap(
+    df,
+    anchor=None,
+    rth_only=False,
+    band_stds=(),
+    extra_anchors=(),
+    by=None,
+    column="VWAP",
+):
+    """
+    Vectorized session VWAP written into ``df`` in place.
+
+    Session resets are handled by running cumulative sums keyed on an integer session
+    code (trading day, plus ticker for panels) in a single pass over the arrays, so
+    there is no per-day ``groupby.apply``, no per-group copy and no merge back onto the
+    bars. Values match ``compute_daily_vwap`` to floating-point rounding.
+
+    Args:
+        df (pd.DataFrame): Bars with 'DateTime', 'High', 'Low', 'Close' and 'Volume' columns.
+        anchor (str, optional): Time of day ("HH:MM") the VWAP starts accumulating from, e.g.
+            "04:00" for a premarket-anchored VWAP. Bars before the anchor get NaN. Defaults to
+            None, which anchors at the first bar of each day (same as ``compute_daily_vwap``).
+        rth_only (bool, optional): Only accumulate bars inside regular trading hours; other
+            bars get NaN. Defaults to False.
+        band_stds (tuple, optional): Standard-deviation multipliers for VWAP bands, e.g. (1, 2)
+            writes '<column>_Upper1', '<column>_Lower1', ... Defaults to ().
+        extra_anchors (tuple, optional): Additional "HH:MM" anchors, each written as
+            '<column>_HHMM'. Defaults to ().
+        by (str, optional): Column identifying the ticker in a multi-ticker panel. Defaults to None.
+        column (str, optional): Name of the VWAP column. Defaults to "VWAP".
+
+    Returns:
+        pd.DataFrame: ``df`` itself, with the VWAP (and band) columns added.
+    """
+    stamps = df["DateTime"].to_numpy(dtype="datetime64[ns]")
+    days = stamps.astype("datetime64[D]")
+    minute = (stamps - days).astype("timedelta64[m]").astype(np.int64)
+
+    # One integer code per (ticker, trading day); sessions need not be contiguous
+    sessions = days.view(np.int64)
+    if by is not None:
+        sessions = pd.factorize(df[by])[0] * 1_000_000 + sessions
+
+    high = df["High"].to_numpy(dtype=np.float64)
+    low = df["Low"].to_numpy(dtype=np.float64)
+    close = df["Close"].to_numpy(dtype=np.float64)
+    typical = (high + low + close) / 3
+    volume = df["Volume"].to_numpy(dtype=np.float64)
+
+    rth = np.ones(len(df), dtype=bool)
+    if rth_only:
+        rth = (minute >= _minute_of_day(RTH_OPEN)) & (
+            minute < _minute_of_day(RTH_CLOSE)
+        )
+
+    def anchored(anchor_time, with_bands):
+        active = rth.copy()
+        if anchor_time is not None:
+            active &= minute >= _minute_of_day(anchor_time)
+        # Inactive bars contribute nothing to the running sums and get NaN
+        weight = np.where(active, volume, 0.0)
+        cum_volume = _session_cumsum(weight, sessions)
+        cum_pv = _session_cumsum(weight * typical, sessions)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(active, cum_pv / cum_volume, np.nan)
+        if not with_bands:
+            return vwap, None
+
+        # Centre prices on each session's first price so the variance does not
+        # lose precision to cancellation in E[p^2] - E[p]^2.
+        centre = pd.Series(typical).groupby(sessions, sort=False).transform("first")
+        shifted = typical - centre.to_numpy()
+        cum_p2 = _session_cumsum(weight * shifted * shifted, sessions)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = cum_pv / cum_volume - centre.to_numpy()
+            variance = cum_p2 / cum_volume - mean * mean
+        return vwap, np.sqrt(np.clip(variance, 0, None))
+
+    vwap, std = anchored(anchor, bool(band_stds))
+    df[column] = vwap
+    for k in band_stds:
+        df[f"{column}_Upper{k}"] = vwap + k * std
+        df[f"{column}_Lower{k}"] = vwap - k * std
+    for anchor_time in extra_anchors:
+        df[f"{column}_{anchor_time.replace(':', '')}"] = anchored(anchor_time, False)[0]
+    return df